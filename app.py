@@ -1,9 +1,7 @@
 import streamlit as st
 from datetime import date
-from src.database import init_db, SessionLocal
-from views import profile, reports
-from src.logic_eligibility import evaluate_cas_eligibility
-from src.logic_fixation import calculate_fixation
+from views import profile, reports, cache, jobs, debug
+from src import querystats, tracing
 
 # Config
 st.set_page_config(
@@ -89,7 +87,12 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-init_db()
+# SQL queries and timing spans of this run (debug panel with ?debug=1)
+DEBUG = bool(st.query_params.get("debug"))
+query_log = querystats.collect()
+run_trace = tracing.start() if DEBUG else None
+
+cache.ensure_db()
 
 # Session State for Defaults
 if 'faculty_data' not in st.session_state:
@@ -112,84 +115,101 @@ if 'faculty_data' not in st.session_state:
 st.title("🎓 CAS Promotion & Arrears Dashboard")
 st.markdown("Automated Eligibility Check, Pay Fixation & Arrears Calculation for Engineering Faculty.")
 
-# Tabs System
-tab1, tab2, tab3 = st.tabs(["👤 Profile Entry", "✅ Eligibility & Fixation", "💰 Arrears Report"])
-
-with tab1:
-    st.markdown('<div class="css-card">', unsafe_allow_html=True)
-    profile.render_profile_form()
-    
-    # Continuum Logic Integration
+@tracing.traced("sync_continuum")
+def sync_continuum(show=False):
+    """
+    Runs the (cached) continuum simulation for the current profile and
+    publishes it as the baseline used by the Eligibility and Arrears tabs.
+    """
     if st.session_state['faculty_data'].get('name') and st.session_state['faculty_data'].get('initial_doj'):
-        from src.logic_continuum import calculate_pay_at_current_joining
-        from src.database import SessionLocal
-        
         fd = st.session_state['faculty_data']
-        db = SessionLocal()
         
-        # Run Simulation
-        continuum_res = calculate_pay_at_current_joining(
-            initial_doj=fd['initial_doj'],
-            current_doj=fd['date_of_joining'],
-            entry_qual=fd['entry_qualification'],
-            db=db
+        # Run Simulation (cached on inputs + master data version)
+        continuum_res = cache.continuum(
+            fd['initial_doj'],
+            fd['date_of_joining'],
+            fd['entry_qualification'],
+            cache.master_version()
         )
-        db.close()
         
         if "Error" not in continuum_res:
-            st.info(f"ℹ️ **Continuum Simulation**: Based on your initial joining date of **{fd['initial_doj']}**, "
-                    f"your calculated entry pay at this institute on **{fd['date_of_joining']}** should be "
-                    f"**Level {continuum_res['Joining_Level']}** at **Basic Pay ₹{continuum_res['Joining_Basic']:,}**.")
+            if show:
+                st.info(f"ℹ️ **Continuum Simulation**: Based on your initial joining date of **{fd['initial_doj']}**, "
+                        f"your calculated entry pay at this institute on **{fd['date_of_joining']}** should be "
+                        f"**Level {continuum_res['Joining_Level']}** at **Basic Pay ₹{continuum_res['Joining_Basic']:,}**.")
+                if continuum_res.get('Pay_Commission', 7) < 7:
+                    st.caption(f"Pay drawn on that date (pre-revised): {continuum_res['Joining_Pay']}; "
+                               f"the basic above is its 7th CPC equivalent.")
             
             # Store Calculation for Tab 2 usage
             st.session_state['continuum_data'] = continuum_res
             # Update Total Past Years (Continuum Logic overrides manual input effectively)
             st.session_state['faculty_data']['past_service_years'] = continuum_res['Total_Past_Years']
-            
+
+@tracing.traced("evaluate_baseline")
+def evaluate_baseline():
+    """
+    Eligibility on the continuum baseline. Shared by the Eligibility tab and
+    the Arrears tab (whose defaults come from it), so either can open first.
+    """
+    sync_continuum()
+    data = st.session_state['faculty_data'].copy()
+    
+    # OVERRIDE with Continuum Data if available
+    # User requested: "pass this... as the new baseline"
+    if 'continuum_data' in st.session_state:
+        c_data = st.session_state['continuum_data']
+        data['current_level'] = c_data['Joining_Level']
+        data['current_basic'] = c_data['Joining_Basic']
+        # Note: We are checking eligibility FROM the joining date now?
+        # logic_eligibility uses data['current_level'] to find NEXT level.
+        # If we pass Joining Level, we are checking "What is the Next Level after Joining?".
+    
+    # Determine target level
+    levels = ["10", "11", "12", "13A1", "14"]
+    try:
+        curr_idx = levels.index(str(data['current_level']))
+        target = levels[min(curr_idx+1, len(levels)-1)]
+    except:
+        target = "11"
+        
+    res = cache.eligibility(data, target)
+    
+    if res['eligible']:
+        # Store for Arrears View
+        st.session_state['arrears_config'] = {
+            'start_date': res['due_date'],
+            'target_level': res['target_level']
+        }
+    return data, res
+
+@tracing.traced("tab: profile")
+def render_profile_tab():
+    st.markdown('<div class="css-card">', unsafe_allow_html=True)
+    profile.render_profile_form()
+    
+    sync_continuum(show=True)
+
     st.markdown('</div>', unsafe_allow_html=True)
 
-with tab2:
+@tracing.traced("tab: eligibility")
+def render_eligibility_tab():
     st.markdown('<div class="css-card">', unsafe_allow_html=True)
     st.header("Checking Eligibility & Pay Fixation")
     
     if 'faculty_data' in st.session_state and st.session_state['faculty_data'].get('name'):
-        data = st.session_state['faculty_data'].copy()
-        
-        # OVERRIDE with Continuum Data if available
-        # User requested: "pass this... as the new baseline"
+        data, res = evaluate_baseline()
         if 'continuum_data' in st.session_state:
-            c_data = st.session_state['continuum_data']
-            data['current_level'] = c_data['Joining_Level']
-            data['current_basic'] = c_data['Joining_Basic']
-            # Note: We are checking eligibility FROM the joining date now?
-            # logic_eligibility uses data['current_level'] to find NEXT level.
-            # If we pass Joining Level, we are checking "What is the Next Level after Joining?".
             st.caption(f"Using Calculated Baseline: Level {data['current_level']} | Basic {data['current_basic']}")
             
         st.info(f"Evaluating Profile for: **{data['name']}**")
         
-        # Determine target level
-        levels = ["10", "11", "12", "13A1", "14"]
-        try:
-            curr_idx = levels.index(str(data['current_level']))
-            target = levels[min(curr_idx+1, len(levels)-1)]
-        except:
-            target = "11"
-            
-        res = evaluate_cas_eligibility(data, target)
-        
         if res['eligible']:
             st.success(f"✅ Eligible for Promotion to Level {res['target_level']}")
             
             c1, c2 = st.columns(2)
             c1.metric(" Promotion Due Date", str(res['due_date']))
             
-            # Store for Arrears View
-            st.session_state['arrears_config'] = {
-                'start_date': res['due_date'],
-                'target_level': res['target_level']
-            }
-            
             if res['flags']:
                 st.warning(f"Exemptions Applied: {', '.join(res['flags'])}")
                 
@@ -197,8 +217,7 @@ with tab2:
             st.divider()
             st.subheader("Indicative Pay Fixation")
             
-            db = SessionLocal()
-            fix = calculate_fixation(data['current_basic'], data['current_level'], res['target_level'], db)
+            fix = cache.fixation(data['current_basic'], data['current_level'], res['target_level'], cache.master_version())
             
             if "new_basic" in fix:
                 fc1, fc2 = st.columns(2)
@@ -206,8 +225,7 @@ with tab2:
                 fc2.metric("Fixed Pay (On Due Date)", f"₹ {fix['new_basic']:,}", delta=f"Cell {fix['new_cell']}")
                 
                 # Projection Logic
-                from src.logic_fixation import calculate_projected_pay
-                proj = calculate_projected_pay(fix['new_basic'], res['target_level'], res['due_date'], db)
+                proj = cache.projection(fix['new_basic'], res['target_level'], res['due_date'], cache.master_version(), date.today())
                 
                 st.divider()
                 st.subheader("Projected Current Pay (Today)")
@@ -222,8 +240,6 @@ with tab2:
             else:
                 st.error(fix.get("error", "Fixation Calculation Failed"))
             
-            db.close()
-            
         else:
             st.error(f"❌ Pending Requirement: {res['reason']}")
             if res['due_date']:
@@ -239,32 +255,42 @@ with tab2:
             st.subheader("🔁 Cumulative CAS Simulation (Backlog)")
             st.info("Since you indicated no past promotions, we simulated your career path to identify pending backlog promotions.")
             
-            from src.logic_cumulative import evaluate_cumulative_promotions
-            from src.database import SessionLocal
-            
-            db = SessionLocal()
             try:
-                events, final_lvl, final_basic = evaluate_cumulative_promotions(fd, db)
+                events, final_lvl, final_basic = cache.cumulative(fd, cache.master_version(), date.today(),
+                                                                    st.session_state.get('profile_id'))
                 
                 if events:
                     st.write("### Identified Promotion Backlog")
                     st.table(events)
                     st.success(f"Based on simulation, your **Current Status** should be **Level {final_lvl}** with Basic **₹{final_basic:,}**.")
+
+                    # Arrears across all backlog promotions, due basic re-fixed at each one
+                    try:
+                        backlog = cache.backlog_arrears(fd, cache.master_version(), date.today(),
+                                                        st.session_state.get('profile_id'))
+                    except ValueError as e:
+                        backlog = None
+                        st.warning(f"Backlog arrears not computed: {e}")
+                    if backlog:
+                        from src.arrears_ledger import display_frame
+                        st.metric("Backlog Arrears (All Promotions)", f"₹ {backlog.total_arrears():,.0f}")
+                        with st.expander(f"View Backlog Arrears Ledger ({backlog[0]['Month']} to {backlog[-1]['Month']})"):
+                            st.dataframe(display_frame(backlog.to_frame()))
                 else:
                     st.warning("Simulation ran but found no eligible promotions in the backlog period.")
             except Exception as e:
                 st.error(f"Simulation Error: {e}")
-            finally:
-                db.close()
     else:
         st.warning("Please complete and save the Profile in the 'Profile Entry' tab first.")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-with tab3:
+@tracing.traced("tab: arrears")
+def render_arrears_tab():
     st.markdown('<div class="css-card">', unsafe_allow_html=True)
     # Wrapper for reports to look integrated
     if 'faculty_data' in st.session_state and st.session_state['faculty_data'].get('name'):
+        evaluate_baseline()
         # TEMPORARY CONTEXT OVERRIDE for Arrears Engine
         # User requested to pass Continuum Baseline to Logic Arrears
         original_data = st.session_state['faculty_data'].copy()
@@ -284,3 +310,25 @@ with tab3:
     else:
         st.warning("Please complete the Profile Entry first.")
     st.markdown('</div>', unsafe_allow_html=True)
+
+# Tabs System
+# Tab state is tracked (key + on_change) so only the open tab's body runs;
+# the heavy engines behind the other two tabs cost nothing on this rerun.
+tab1, tab2, tab3, tab4 = st.tabs(["👤 Profile Entry", "✅ Eligibility & Fixation", "💰 Arrears Report", "🗂️ Batch Jobs"],
+                                 key="main_tab", on_change="rerun")
+
+if tab1.open:
+    with tab1:
+        render_profile_tab()
+if tab2.open:
+    with tab2:
+        render_eligibility_tab()
+if tab3.open:
+    with tab3:
+        render_arrears_tab()
+if tab4.open:
+    with tab4:
+        jobs.show()
+
+if DEBUG:
+    debug.show(query_log, run_trace)
@@ -0,0 +1,233 @@
+"""
+Benchmark suite for the engines, on synthetic workloads.
+
+Times each public engine entry point at several sizes (ledger length in
+months, roster size in faculty), writes the results as JSON and compares
+them against the stored baseline in scripts/bench_baseline.json. A case
+is flagged as a regression when it is slower than the baseline by more
+than the tolerance (and by more than the noise floor).
+
+Usage (from the repo root, so cas_app.db and data/ resolve):
+    python scripts/benchmark.py                      # compare against baseline
+    python scripts/benchmark.py --out bench.json     # also write the results
+    python scripts/benchmark.py --only arrears       # cases whose name contains "arrears"
+    python scripts/benchmark.py --record --only arrears/   # re-record those cases
+
+Re-recording policy: the baseline is only worth anything if it is not
+rewritten alongside the code it is meant to catch. Re-record a case only in
+the commit that makes (and claims) a speedup for that case, and only that
+case; never re-record in a commit that also touches other engines. So
+--record needs --only, and it refuses to record a case that is slower than
+its current baseline beyond the tolerance. A deliberate slowdown or a
+changed workload needs --accept-slower, and the commit should say why.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "scripts", "bench_baseline.json")
+sys.path.insert(0, ROOT)
+
+LEDGER_MONTHS = [12, 120, 360]
+ROSTER_SIZES = [100, 1000]
+SEED = 2016
+
+# A case regresses when slower than baseline x (1 + TOLERANCE) and by more than NOISE_FLOOR_S
+TOLERANCE = 0.25
+NOISE_FLOOR_S = 0.002
+
+# Synthetic careers are simulated up to a fixed date so workloads don't drift day to day
+AS_OF = datetime.date(2026, 7, 1)
+
+# -------------------------------------------------------------------
+# SYNTHETIC WORKLOADS
+# -------------------------------------------------------------------
+
+def synthetic_pay_inputs(master, n, seed=SEED):
+    """n (basic, level, target_level) triples on valid pay matrix cells."""
+    rng = random.Random(seed)
+    pairs = [("10", "11"), ("11", "12"), ("12", "13A1"), ("13A1", "14")]
+    out = []
+    for _ in range(n):
+        level, target = rng.choice(pairs)
+        out.append((rng.choice(master.pay_options(level)[:10]), level, target))
+    return out
+
+# -------------------------------------------------------------------
+# CASES
+# Each case builder returns a zero-argument callable doing one timed run.
+# -------------------------------------------------------------------
+
+def _arrears_ledger(master, months):
+    from src.logic_arrears import calculate_monthly_arrears
+    start = datetime.date(2024, 7, 1) - datetime.timedelta(days=int(months * 30.44))
+    start = start.replace(day=1)
+    end = datetime.date(2024, 6, 30)
+    da_df = master.da_history_df()
+    return lambda: calculate_monthly_arrears(
+        start_date=start, end_date=end,
+        initial_drawn_basic=master.pay_options("12")[0], initial_due_basic=master.pay_options("13A1")[0],
+        drawn_level="12", target_level="13A1", city_class="X (Metro)",
+        da_history_df=da_df
+    )
+
+def build_cases(db, master):
+    from src.logic_fixation import calculate_fixation, calculate_projected_pay
+    from src.logic_continuum import calculate_pay_at_current_joining
+    from src.logic_cumulative import evaluate_cumulative_promotions
+    from src.logic_eligibility import evaluate_cas_eligibility
+    from src.batch import next_level
+    from src.reports_generator import generate_arrears_pdf
+    from src.synthetic import generate_profiles
+
+    cases = {}
+    for months in LEDGER_MONTHS:
+        cases[f"arrears/months={months}"] = (_arrears_ledger(master, months), 1)
+
+        ledger_df = _arrears_ledger(master, months)()
+        profile = {"name": "Bench Faculty", "current_level": "12", "city_class": "X (Metro)"}
+        cases[f"arrears_pdf/months={months}"] = (
+            lambda df=ledger_df, p=profile: generate_arrears_pdf(p, df, datetime.date(2020, 7, 1), "13A1"), 1)
+
+    for n in ROSTER_SIZES:
+        pay = synthetic_pay_inputs(master, n)
+        faculty = list(generate_profiles(n, SEED, master, today=AS_OF))
+        cases[f"fixation/roster={n}"] = (
+            lambda pay=pay: [calculate_fixation(b, lvl, tgt, db) for b, lvl, tgt in pay], n)
+        cases[f"projected_pay/roster={n}"] = (
+            lambda pay=pay: [calculate_projected_pay(b, lvl, datetime.date(2010, 7, 1), db) for b, lvl, _ in pay], n)
+        cases[f"continuum/roster={n}"] = (
+            lambda fs=faculty: [calculate_pay_at_current_joining(f['initial_doj'], f['date_of_joining'],
+                                                                 f['entry_qualification'], db) for f in fs], n)
+        cases[f"cumulative/roster={n}"] = (
+            lambda fs=faculty: [evaluate_cumulative_promotions(f, db) for f in fs], n)
+        cases[f"eligibility/roster={n}"] = (
+            lambda fs=faculty: [evaluate_cas_eligibility(f, next_level(f['current_level'])) for f in fs], n)
+    return cases
+
+# -------------------------------------------------------------------
+# RUN / COMPARE
+# -------------------------------------------------------------------
+
+def time_case(fn, repeat):
+    """Best-of-`repeat` wall time in seconds, after one untimed warm-up run."""
+    fn()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(only=None, repeat=3):
+    from src.database import init_db, SessionLocal
+    from src.master_data import load_master_data
+
+    init_db()
+    db = SessionLocal()
+    try:
+        master = load_master_data(db)
+        results = {}
+        for name, (fn, items) in build_cases(db, master).items():
+            if only and not any(o in name for o in only):
+                continue
+            seconds = time_case(fn, repeat)
+            results[name] = {"seconds": round(seconds, 6), "items": items,
+                             "per_item_ms": round(seconds * 1000 / items, 4)}
+            print(f"  {name:<28} {seconds * 1000:>10.2f} ms  ({results[name]['per_item_ms']} ms/item)")
+        return {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "master_version": master.version,
+            "repeat": repeat,
+            "cases": results,
+        }
+    finally:
+        db.close()
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Returns a list of (case, baseline_s, current_s, ratio) for regressed cases."""
+    regressions = []
+    for name, cur in results['cases'].items():
+        base = baseline.get('cases', {}).get(name)
+        if not base:
+            continue
+        b, c = base['seconds'], cur['seconds']
+        if c > b * (1 + tolerance) and c - b > NOISE_FLOOR_S:
+            regressions.append((name, b, c, c / b if b else float('inf')))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (best is kept)")
+    parser.add_argument("--only", action="append", help="run only cases whose name contains this (repeatable)")
+    parser.add_argument("--out", help="write the results JSON here")
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help=f"allowed slowdown before flagging (default: baseline's or {TOLERANCE})")
+    parser.add_argument("--record", action="store_true",
+                        help="write the selected cases' results into the baseline (needs --only)")
+    parser.add_argument("--accept-slower", action="store_true",
+                        help="with --record: record cases even if they regressed against the baseline")
+    args = parser.parse_args()
+    if args.record and not args.only:
+        parser.error("--record needs --only: re-record just the cases this change speeds up")
+    if args.accept_slower and not args.record:
+        parser.error("--accept-slower only applies to --record")
+
+    print("Engine benchmarks (best of %d):" % args.repeat)
+    results = run(args.only, args.repeat)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Results -> {args.out}")
+
+    if args.record:
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH) as f:
+                baseline = json.load(f)
+        tolerance = args.tolerance if args.tolerance is not None else baseline.get('tolerance', TOLERANCE)
+        # Recording over a regression would hide it
+        regressions = compare(results, baseline, tolerance)
+        if regressions and not args.accept_slower:
+            print(f"Not recording: {len(regressions)} case(s) slower than baseline by more than {tolerance:.0%}:")
+            for name, b, c, ratio in regressions:
+                print(f"  {name:<28} {b * 1000:>10.2f} ms -> {c * 1000:>10.2f} ms  (x{ratio:.2f})")
+            print("Fix the slowdown, or pass --accept-slower and say why in the commit.")
+            return 1
+        cases = baseline.get('cases', {})
+        cases.update(results['cases'])
+        results = dict(results, cases=dict(sorted(cases.items())), tolerance=tolerance)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Recorded baseline -> {os.path.relpath(BASELINE_PATH, ROOT)}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No baseline recorded yet (run with --record)")
+        return 0
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+    tolerance = args.tolerance if args.tolerance is not None else baseline.get('tolerance', TOLERANCE)
+
+    regressions = compare(results, baseline, tolerance)
+    if regressions:
+        print(f"FAIL: {len(regressions)} case(s) slower than baseline by more than {tolerance:.0%}:")
+        for name, b, c, ratio in regressions:
+            print(f"  {name:<28} {b * 1000:>10.2f} ms -> {c * 1000:>10.2f} ms  (x{ratio:.2f})")
+        return 1
+    print(f"OK (within {tolerance:.0%} of baseline {baseline.get('timestamp', '')})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
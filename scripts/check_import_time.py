@@ -0,0 +1,111 @@
+"""
+Startup import-time budget for the dashboard.
+
+Runs `python -X importtime` over the modules app.py imports (with
+streamlit pre-imported, since its cost is outside our control), and
+fails if:
+  - the median import time of our modules exceeds the recorded budget, or
+  - a dependency that should load lazily (pandas, fpdf, ...) is pulled in.
+
+Usage (from the repo root):
+    python scripts/check_import_time.py            # check against budget
+    python scripts/check_import_time.py --record   # re-record the budget
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_PATH = os.path.join(ROOT, "scripts", "import_budget.json")
+
+# Mirrors the imports at the top of app.py
+APP_MODULES = ["views.profile", "views.reports", "views.cache", "views.jobs", "views.debug", "src.querystats"]
+PRELOAD = ["streamlit"]
+DEFAULT_LAZY = ["pandas", "numpy", "fpdf", "dateutil", "openpyxl", "pyarrow"]
+
+# Recorded budget = measured median x HEADROOM, to absorb machine noise
+HEADROOM = 1.5
+
+def measure_once():
+    """Returns (our_import_ms, set_of_imported_top_level_packages)."""
+    code = "; ".join(f"import {m}" for m in PRELOAD + APP_MODULES)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+
+    preload_done = False
+    total_us = 0
+    imported = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue # header row
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        imported.add(name.split(".")[0])
+        if depth == 0:
+            if name in PRELOAD:
+                preload_done = True
+            elif preload_done:
+                total_us += int(cumulative)
+    return total_us / 1000.0, imported
+
+def measure(runs):
+    samples, imported = [], set()
+    for _ in range(runs):
+        ms, mods = measure_once()
+        samples.append(ms)
+        imported |= mods
+    return statistics.median(samples), imported
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--record", action="store_true", help="write the current timing as the new budget")
+    args = parser.parse_args()
+
+    budget = {}
+    if os.path.exists(BUDGET_PATH):
+        with open(BUDGET_PATH) as f:
+            budget = json.load(f)
+    lazy = budget.get("lazy_modules", DEFAULT_LAZY)
+
+    median_ms, imported = measure(args.runs)
+    print(f"App import time (median of {args.runs}): {median_ms:.1f} ms")
+
+    eager = sorted(set(lazy) & imported)
+    if args.record:
+        budget = {
+            "budget_ms": round(median_ms * HEADROOM, 1),
+            "measured_ms": round(median_ms, 1),
+            "lazy_modules": lazy,
+        }
+        with open(BUDGET_PATH, "w") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"Recorded budget: {budget['budget_ms']} ms -> {os.path.relpath(BUDGET_PATH, ROOT)}")
+        if eager:
+            print(f"Warning: imported eagerly at startup: {', '.join(eager)}")
+        return 0
+
+    failed = False
+    if eager:
+        print(f"FAIL: imported eagerly at startup: {', '.join(eager)}")
+        failed = True
+    if "budget_ms" in budget and median_ms > budget["budget_ms"]:
+        print(f"FAIL: {median_ms:.1f} ms exceeds budget of {budget['budget_ms']} ms")
+        failed = True
+    if not failed:
+        print(f"OK (budget {budget.get('budget_ms', 'not recorded')} ms)")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Columnar arrears ledger.
+
+One preallocated numpy array per column instead of a dict per month. The
+engines (engine.monthly_arrears / backlog_arrears) fill the month and basic
+columns in place and price the rest in one vectorized pass. Months are
+stored as an integer index (src/months.py: months since Jan-1970, the
+ordinal of a pandas monthly Period) and only formatted for display.
+
+`to_frame()` wraps the arrays in a DataFrame without copying them. Indexing
+or iterating a ledger still yields the old per-month dicts with "Jul-2019"
+labels, for code that reads rows.
+"""
+import numpy as np
+from src.months import MONTH_FORMAT, month_date, month_label
+
+# DataFrame column -> ledger attribute, in display order
+COLUMNS = {
+    "Month": "month",
+    "Drawn Basic": "drawn_basic",
+    "Due Basic": "due_basic",
+    "DA Rate %": "da_rate",
+    "Diff Basic": "diff_basic",
+    "Diff DA": "diff_da",
+    "Diff HRA": "diff_hra",
+    "Diff TA": "diff_ta",
+    "Total Arrears": "total",
+}
+
+class ArrearsLedger:
+    """
+    Drawn vs due pay per month as typed columns. `due_level` (level index
+    into `levels`) is only kept by the backlog ledger. `da_percent` is the
+    exact DA % each month was priced at (`da_rate` is the truncated display
+    column).
+    """
+    def __init__(self, n, levels=None):
+        self.month = np.zeros(n, dtype=np.int64)
+        self.drawn_basic = np.zeros(n, dtype=np.int64)
+        self.due_basic = np.zeros(n, dtype=np.int64)
+        self.da_rate = np.zeros(n, dtype=np.int64)
+        self.da_percent = np.zeros(n)
+        self.diff_basic = np.zeros(n, dtype=np.int64)
+        self.diff_da = np.zeros(n, dtype=np.int64)
+        self.diff_hra = np.zeros(n, dtype=np.int64)
+        self.diff_ta = np.zeros(n, dtype=np.int64)
+        self.total = np.zeros(n, dtype=np.int64)
+        self.levels = levels
+        self.due_level = np.zeros(n, dtype=np.int8) if levels is not None else None
+
+    def price(self, da, hra, drawn_ta=0, due_ta=0):
+        """
+        Fills the DA / HRA / TA difference columns from the basics, given
+        per-month DA and HRA fractions and per-month TA of each side (no DA
+        on TA). Rounds half to even, like engine.month_record.
+        """
+        self.da_percent[:] = np.round(np.multiply(da, 100), 6)
+        self.da_rate[:] = da * 100 # truncated, as int(da_rate * 100)
+        np.subtract(self.due_basic, self.drawn_basic, out=self.diff_basic)
+        self.diff_da[:] = np.rint(self.due_basic * da) - np.rint(self.drawn_basic * da)
+        self.diff_hra[:] = np.rint(self.due_basic * hra) - np.rint(self.drawn_basic * hra)
+        self.diff_ta[:] = np.subtract(due_ta, drawn_ta)
+        np.add(self.diff_basic, self.diff_da, out=self.total)
+        self.total += self.diff_hra
+        self.total += self.diff_ta
+        return self
+
+    def __len__(self):
+        return len(self.month)
+
+    def total_arrears(self) -> int:
+        return int(self.total.sum())
+
+    def month_dates(self) -> list:
+        return [month_date(m) for m in self.month.tolist()]
+
+    def month_labels(self, fmt=MONTH_FORMAT) -> list:
+        return [month_label(m, fmt) for m in self.month.tolist()]
+
+    def __getitem__(self, i) -> dict:
+        row = {col: int(getattr(self, attr)[i]) for col, attr in COLUMNS.items()}
+        row["Month"] = month_label(int(self.month[i]))
+        if self.due_level is not None:
+            row["Due Level"] = self.levels[self.due_level[i]]
+        return row
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def records(self) -> list:
+        """The ledger as the old list of per-month dicts (e.g. for JSON)."""
+        return list(self)
+
+    def to_frame(self):
+        """
+        DataFrame over the column arrays (no copies): Month is a monthly
+        Period column; format it with display_frame before showing it.
+        """
+        import pandas as pd
+        data = {col: getattr(self, attr) for col, attr in COLUMNS.items()}
+        data["Month"] = pd.arrays.PeriodArray(self.month, dtype=pd.PeriodDtype("M"))
+        if self.due_level is not None:
+            data["Due Level"] = pd.Categorical.from_codes(self.due_level, categories=self.levels)
+        return pd.DataFrame(data, copy=False)
+
+def display_frame(df, fmt=MONTH_FORMAT):
+    """A copy of a ledger DataFrame with Month as text labels, for tables, CSV and PDF."""
+    out = df.copy()
+    if "Month" in out and hasattr(out["Month"], "dt"):
+        out["Month"] = out["Month"].dt.strftime(fmt)
+    return out
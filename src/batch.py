@@ -0,0 +1,154 @@
+import datetime
+import time
+from contextlib import contextmanager
+from src import engine, tracing
+from src.arrears_ledger import ArrearsLedger
+from src.logic_eligibility import evaluate_cas_eligibility
+from src.months import julys_between
+
+LEVELS = ["10", "11", "12", "13A1", "14"]
+
+def next_level(level) -> str:
+    try:
+        return LEVELS[min(LEVELS.index(str(level)) + 1, len(LEVELS) - 1)]
+    except ValueError:
+        return "11"
+
+@contextmanager
+def _stage(timings, name):
+    with tracing.span(name):
+        if timings is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+def _arrears_summary(data, baseline, target, due_date, end_date, master, ledgers=None) -> dict:
+    # Drawn basic at the due date: roll the baseline back by the increments since
+    drawn_basic = int(baseline['current_basic'])
+    years_back = julys_between(due_date, datetime.date.today())
+    if years_back > 0:
+        hist = engine.historical_basic(master, drawn_basic, baseline['current_level'], years_back)
+        drawn_basic = hist.get('historical_basic', drawn_basic)
+    due_fix = engine.fixation(master, drawn_basic, baseline['current_level'], target)
+    if "new_basic" in due_fix:
+        ledger = engine.monthly_arrears(
+            master,
+            start_date=due_date,
+            end_date=end_date,
+            initial_drawn_basic=drawn_basic,
+            initial_due_basic=due_fix['new_basic'],
+            drawn_level=baseline['current_level'],
+            target_level=target,
+            city_class=data['city_class']
+        )
+        if ledgers is not None:
+            ledgers['arrears'] = {"start_date": due_date, "end_date": end_date, "drawn_level": baseline['current_level'],
+                                  "target_level": target, "ledger": ledger}
+        return {"arrears_months": len(ledger), "total_arrears": ledger.total_arrears()}
+    return {}
+
+def backlog_ledger(data: dict, master, events, end_date=None) -> ArrearsLedger:
+    """
+    Backlog arrears ledger over the cumulative promotion events of a profile
+    still pending above its current level (engine.pending_events), from
+    engine.backlog_start. The drawn basic in that month is the current basic
+    rolled back by the increments up to `end_date`; ValueError if the
+    current basic is not a matrix cell or has fewer cells below it than
+    increments to roll back (the drawn pay then isn't known).
+    """
+    drawn_level = str(data['current_level'])
+    events = engine.pending_events(master, events, drawn_level)
+    if not events:
+        return ArrearsLedger(0, list(master.pay_matrix))
+    end_date = end_date or datetime.date.today()
+    start = engine.backlog_start(master, events)
+    drawn_basic = int(data['current_basic'])
+    years_back = julys_between(start, end_date)
+    if years_back > 0:
+        cell = master.cell_of(drawn_level, drawn_basic)
+        if cell is None:
+            raise ValueError(f"Current basic ₹{drawn_basic:,} is not a Level {drawn_level} pay matrix cell")
+        if cell <= years_back:
+            raise ValueError(f"Current basic ₹{drawn_basic:,} is cell {cell} of Level {drawn_level}, "
+                             f"too low for {years_back} increments since {start:%b-%Y}")
+        drawn_basic = engine.historical_basic(master, drawn_basic, drawn_level, years_back)['historical_basic']
+    return engine.backlog_arrears(master, events, end_date, drawn_basic, drawn_level, data['city_class'])
+
+@tracing.traced("evaluate_profile")
+def evaluate_profile(data: dict, master, end_date=None, timings=None, ledgers=None, pay_ledger=None) -> dict:
+    """
+    Runs the dashboard pipeline for one faculty_data dict, headless:
+    continuum -> eligibility -> fixation/projection -> arrears, plus the
+    cumulative backlog for profiles without past promotions.
+    Mirrors what the Eligibility and Arrears tabs show for the profile.
+    Pure: only the in-memory `master` is read, never the database.
+    If `timings` is a dict, seconds spent per stage are added to it.
+    If `ledgers` is a dict, the month ledgers behind the arrears totals are
+    stored in it by kind ('arrears', 'backlog'), for src/ledger_store.py.
+    A stored `pay_ledger` (src/pay_ledger.py) stands in for the cumulative
+    simulation when it can answer for today.
+    """
+    end_date = end_date or datetime.date.today()
+    row = {"name": data['name'], "institute_type": data.get('institute_type'),
+           "city_class": data.get('city_class'), "current_level": data['current_level'],
+           "current_basic": data['current_basic']}
+
+    # 1. Continuum baseline
+    baseline = data.copy()
+    if data.get('initial_doj'):
+        with _stage(timings, "continuum"):
+            cont = engine.pay_at_current_joining(master, data['initial_doj'], data['date_of_joining'],
+                                                 data.get('entry_qualification'))
+        if "Error" not in cont:
+            baseline['current_level'] = cont['Joining_Level']
+            baseline['current_basic'] = cont['Joining_Basic']
+            baseline['past_service_years'] = cont['Total_Past_Years']
+    row.update(joining_level=baseline['current_level'], joining_basic=baseline['current_basic'])
+
+    # 2. Eligibility
+    with _stage(timings, "eligibility"):
+        elig = evaluate_cas_eligibility(baseline, next_level(baseline['current_level']))
+    row.update(eligible=elig['eligible'], target_level=elig.get('target_level'),
+               due_date=elig.get('due_date'), reason=elig.get('reason'),
+               flags="; ".join(elig.get('flags', [])))
+
+    # 3. Fixation, projection and arrears from the due date
+    if elig['eligible']:
+        target = elig['target_level']
+        with _stage(timings, "fixation"):
+            fix = engine.fixation(master, baseline['current_basic'], baseline['current_level'], target)
+            if "new_basic" in fix:
+                proj = engine.projected_pay(master, fix['new_basic'], target, elig['due_date'])
+        if "new_basic" in fix:
+            row.update(fixed_basic=fix['new_basic'], projected_basic=proj['projected_basic'])
+
+        due_date = elig['due_date']
+        if due_date <= end_date:
+            with _stage(timings, "arrears"):
+                row.update(_arrears_summary(data, baseline, target, due_date, end_date, master, ledgers))
+
+    # 4. Cumulative backlog (profiles without recorded CAS promotions)
+    if not data.get('has_past_promotions') and data.get('initial_doj'):
+        with _stage(timings, "cumulative"):
+            # Simulated up to today, as on the dashboard
+            stored = pay_ledger.cumulative(datetime.date.today()) if pay_ledger is not None else None
+            events, final_lvl, final_basic = stored or engine.cumulative_promotions(master, data)
+        row.update(backlog_promotions=len(events), backlog_level=final_lvl, backlog_basic=final_basic)
+        if events:
+            try:
+                with _stage(timings, "backlog"):
+                    ledger = backlog_ledger(data, master, events, end_date)
+            except ValueError as e:
+                row.update(backlog_error=str(e))
+            else:
+                row.update(backlog_arrears=ledger.total_arrears())
+                if ledgers is not None and len(ledger):
+                    ledgers['backlog'] = {"start_date": ledger.month_dates()[0], "end_date": end_date,
+                                          "drawn_level": str(data['current_level']), "target_level": final_lvl,
+                                          "ledger": ledger}
+
+    return row
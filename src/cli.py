@@ -0,0 +1,166 @@
+"""
+Headless roster run: continuum, eligibility, fixation/projection and
+arrears for every faculty row of a roster file, without Streamlit.
+
+The roster is read as it is evaluated: at most WINDOW_PER_WORKER chunks
+per worker are in flight. A row that can't be read as a profile becomes an
+error row in the output instead of stopping the run.
+
+Usage (from the repo root, so cas_app.db and data/ resolve):
+    python -m src.cli roster.csv --out out/ --workers 4 --format parquet
+
+--format parquet needs pyarrow (pip install pyarrow), which is not in
+requirements.txt.
+"""
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+CHUNK_SIZE = 200 # rows per worker task
+WINDOW_PER_WORKER = 2 # chunks submitted ahead per worker process
+
+# Per-process master data, handed over by the parent via _init_worker
+# so workers never open the database
+_master = None
+_trace_origin = None # parent's trace origin when --trace is on
+
+def _init_worker(master, trace_origin=None):
+    global _master, _trace_origin
+    _master = master
+    _trace_origin = trace_origin
+
+def _evaluate_chunk(args):
+    """
+    Evaluates a list of raw roster records, as (row number, record); returns
+    (rows, per-stage seconds, trace events).
+    """
+    from src import tracing
+    from src.batch import evaluate_profile
+    from src.profile_store import normalize_roster_row
+    chunk, end_date = args
+    rows, timings = [], {}
+    trace = tracing.Trace(_trace_origin) if _trace_origin is not None else None
+    with tracing.tracing(trace) if trace else nullcontext():
+        for n, raw in chunk:
+            try:
+                data = normalize_roster_row(raw)
+                rows.append(evaluate_profile(data, _master, end_date=end_date, timings=timings))
+            except Exception as e:
+                rows.append({"name": raw.get('name'), "error": f"Row {n}: {e}"})
+    return rows, timings, trace.events if trace else []
+
+def _chunks(iterable, size, end_date):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk, end_date
+            chunk = []
+    if chunk:
+        yield chunk, end_date
+
+def run(roster_path, out_dir, workers=1, fmt="csv", end_date=None, chunk_size=CHUNK_SIZE, trace_path=None):
+    from src import tracing
+    from src.database import init_db, SessionLocal
+    from src.master_data import load_master_data
+    from src.profile_store import iter_roster_records
+
+    init_db()
+    db = SessionLocal()
+    try:
+        master = load_master_data(db)
+    finally:
+        db.close()
+    start = time.perf_counter()
+    rows, stage_seconds = [], {}
+    trace = tracing.Trace() if trace_path else None
+    trace_origin = trace.origin_ns if trace else None
+
+    def collect(results):
+        for chunk_rows, timings, events in results:
+            rows.extend(chunk_rows)
+            for k, v in timings.items():
+                stage_seconds[k] = stage_seconds.get(k, 0.0) + v
+            if trace:
+                trace.extend(events)
+
+    tasks = _chunks(iter_roster_records(roster_path), chunk_size, end_date)
+    if workers > 1:
+        # Bounded submission window (Executor.map would read the whole roster up front)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(master, trace_origin)) as pool:
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(_evaluate_chunk, task))
+                if len(pending) >= workers * WINDOW_PER_WORKER:
+                    collect([pending.popleft().result()])
+            collect(f.result() for f in pending)
+    else:
+        _init_worker(master, trace_origin)
+        collect(_evaluate_chunk(task) for task in tasks)
+    compute_seconds = time.perf_counter() - start
+    if trace:
+        trace.save(trace_path)
+
+    import pandas as pd
+    os.makedirs(out_dir, exist_ok=True)
+    df = pd.DataFrame(rows)
+    if fmt == "parquet":
+        out_path = os.path.join(out_dir, "roster_results.parquet")
+        df.to_parquet(out_path, index=False)
+    else:
+        out_path = os.path.join(out_dir, "roster_results.csv")
+        df.to_csv(out_path, index=False)
+    total_seconds = time.perf_counter() - start
+
+    summary = {
+        "roster": os.path.abspath(roster_path),
+        "output": os.path.abspath(out_path),
+        "rows": len(rows),
+        "errors": int(df['error'].notna().sum()) if 'error' in df else 0,
+        "workers": workers,
+        "compute_seconds": round(compute_seconds, 3),
+        "total_seconds": round(total_seconds, 3),
+        "rows_per_sec": round(len(rows) / compute_seconds, 1) if compute_seconds > 0 else None,
+        # CPU seconds summed over workers, so they can exceed wall time when parallel
+        "stage_seconds": {k: round(v, 3) for k, v in sorted(stage_seconds.items())},
+    }
+    with open(os.path.join(out_dir, "timing_summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("roster", help="roster CSV or XLSX (columns named like the profile fields)")
+    parser.add_argument("--out", default="out", help="output directory (default: out)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: CPU count; 1 runs in-process)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--end-date", type=datetime.date.fromisoformat, default=None,
+                        help="arrears computed up to this date (default: today)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--trace", metavar="PATH", default=None,
+                        help="write per-stage spans as Chrome trace JSON (chrome://tracing, ui.perfetto.dev)")
+    args = parser.parse_args(argv)
+    if args.format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        parser.error("--format parquet needs pyarrow, which is not installed (pip install pyarrow)")
+
+    summary = run(args.roster, args.out, workers=max(1, args.workers), fmt=args.format,
+                  end_date=args.end_date, chunk_size=args.chunk_size, trace_path=args.trace)
+    print(f"{summary['rows']:,} rows ({summary['errors']} errors) -> {summary['output']}")
+    print(f"{summary['compute_seconds']}s compute, {summary['total_seconds']}s total, "
+          f"{summary['rows_per_sec']} rows/s with {summary['workers']} worker(s)")
+    for stage, secs in summary['stage_seconds'].items():
+        print(f"  {stage:<12} {secs:>9.3f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
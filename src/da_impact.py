@@ -0,0 +1,198 @@
+"""
+Roster-wide DA revision impact.
+
+What each DA revision costs the institute: the extra DA it adds over the
+rate before it, plus the HRA step it triggers when DA crosses 25% / 50%
+(the master HRA slabs, as in calculate_monthly_arrears), on every faculty's
+monthly basic from the revision's first month to the end of the period.
+The costs of all revisions in a period add up to the roster's DA + HRA
+above the rate in force before the period (or at the start of the pay
+commission, for a period spanning one).
+
+Monthly basics come from `roster_basic_ledger` (current basic rolled back /
+forward one cell per July, in the current level), as a faculty x months
+array; each revision is then one array expression over the whole roster,
+summed by month, pay level and city class.
+
+Usage (from the repo root):
+    python -m src.da_impact --from 2016-01-01 --out da_impact.csv
+    python -m src.da_impact --roster roster.csv --by revision level
+"""
+import argparse
+import bisect
+import datetime
+import sys
+from src import engine
+from src.master_data import CellTable
+from src.months import month_index, month_date, julys_through
+from src.tracing import traced
+
+GROUP_COLUMNS = ["revision", "month", "level", "city_class"]
+
+# -------------------------------------------------------------------
+# ROSTER / BASIC LEDGERS
+# -------------------------------------------------------------------
+
+def load_roster(roster_path=None) -> list:
+    """(name, current_level, current_basic, city_class) dicts from a roster file, or every saved profile."""
+    if roster_path:
+        from src.profile_store import iter_roster
+        return [{k: d.get(k) for k in ('name', 'current_level', 'current_basic', 'city_class')}
+                for d in iter_roster(roster_path)]
+    from src.database import SessionLocal, UserProfile
+    db = SessionLocal()
+    try:
+        rows = db.query(UserProfile.name, UserProfile.current_level, UserProfile.current_basic,
+                        UserProfile.city_class).order_by(UserProfile.id).all()
+    finally:
+        db.close()
+    return [{"name": n, "current_level": lvl, "current_basic": b, "city_class": c} for n, lvl, b, c in rows]
+
+@traced("da_impact.roster_basic_ledger")
+def roster_basic_ledger(md, profiles, start_date, end_date, today=None) -> dict:
+    """
+    Monthly basic of every profile from start_date to end_date: the current
+    basic moved one cell back per July between the month and today (forward
+    for months after today), within the current level. Off-matrix basics
+    stay flat. Returns {'months': [first-of-month dates], 'basic': int64
+    array (profiles x months), 'level': [...], 'city_class': [...]}.
+    """
+    import numpy as np
+
+    today = today or datetime.date.today()
+    months = np.arange(month_index(start_date), month_index(end_date) + 1)
+    tables = CellTable(md)
+    n = len(profiles)
+    at, lo, hi = (np.empty(n, dtype=np.int64) for _ in range(3))
+    for i, p in enumerate(profiles):
+        at[i], lo[i], hi[i] = tables.locate(p['current_level'], int(p['current_basic'] or 0))
+    flat = np.array(tables.values, dtype=np.int64)
+
+    steps = julys_through(months) - julys_through(month_index(today))
+    basic = flat[np.clip(at[:, None] + steps[None, :], lo[:, None], hi[:, None])]
+    return {
+        "months": [month_date(m) for m in months.tolist()],
+        "basic": basic,
+        "level": [str(p['current_level']) for p in profiles],
+        "city_class": [p['city_class'] or "" for p in profiles],
+    }
+
+# -------------------------------------------------------------------
+# REVISIONS
+# -------------------------------------------------------------------
+
+def da_revisions(months, da_rates) -> list:
+    """
+    DA revisions taking effect within a month grid: (month position, effective
+    date, old rate %, new rate %), with rates sampled on the 1st of each month
+    like the arrears engines. `da_rates` is a list of (effective_date, rate %)
+    or (effective_date, rate %, pay_commission); a switch of pay commission
+    (6th CPC 119% -> 7th CPC 0% on 2016-01-01) re-bases DA and is not a revision.
+    """
+    rate_on = engine.da_lookup(da_rates)
+    commission_on = engine.da_lookup([(r[0], r[2] if len(r) > 2 else None) for r in da_rates])
+    dates = sorted(r[0] for r in da_rates)
+    revisions = []
+    before = months[0] - datetime.timedelta(days=1)
+    prev, prev_pc = rate_on(before), commission_on(before)
+    for pos, month in enumerate(months):
+        rate, pc = rate_on(month), commission_on(month)
+        if rate != prev and pc == prev_pc:
+            effective = dates[bisect.bisect_right(dates, month) - 1]
+            revisions.append((pos, effective, prev, rate))
+        prev, prev_pc = rate, pc
+    return revisions
+
+@traced("da_impact.da_revision_impact")
+def da_revision_impact(md, ledger, da_rates=None):
+    """
+    Incremental DA and HRA cost of each DA revision over a basic ledger from
+    roster_basic_ledger, by month, level and city class. Returns a DataFrame
+    with one row per (revision, month, level, city_class) with a non-zero cost.
+    """
+    import numpy as np
+    import pandas as pd
+
+    da_rates = da_rates if da_rates is not None else md.da_rates
+    months, basic = ledger['months'], ledger['basic']
+
+    # Faculty -> (level, city class) group, as a one-hot matrix for the sums
+    keys = sorted(set(zip(ledger['level'], ledger['city_class'])))
+    group_of = {k: g for g, k in enumerate(keys)}
+    groups = np.array([group_of[k] for k in zip(ledger['level'], ledger['city_class'])], dtype=np.int64)
+    onehot = np.zeros((len(keys), len(groups)))
+    onehot[groups, np.arange(len(groups))] = 1.0
+    faculty = onehot.sum(axis=1).astype(np.int64)
+    code_ix = np.array([md.hra_index(md.city_code(c)) for c in ledger['city_class']], dtype=np.int64)
+
+    frames = []
+    for pos, effective, old, new in da_revisions(months, da_rates):
+        b = basic[:, pos:]
+        da = np.rint(b * (new / 100.0)) - np.rint(b * (old / 100.0))
+        hra_old = md.hra_rates(code_ix, old / 100.0)
+        hra_new = md.hra_rates(code_ix, new / 100.0)
+        hra = np.rint(b * hra_new[:, None]) - np.rint(b * hra_old[:, None])
+        # Integer-valued float sums are exact well beyond any roster's totals
+        da_sum, hra_sum = onehot @ da, onehot @ hra
+
+        g, m = np.meshgrid(np.arange(len(keys)), np.arange(b.shape[1]), indexing="ij")
+        frames.append(pd.DataFrame({
+            "revision": effective,
+            "old_rate": old,
+            "new_rate": new,
+            "month": [months[pos + j] for j in m.ravel()],
+            "level": [keys[i][0] for i in g.ravel()],
+            "city_class": [keys[i][1] for i in g.ravel()],
+            "faculty": faculty[g.ravel()],
+            "incremental_da": da_sum.ravel().astype(np.int64),
+            "incremental_hra": hra_sum.ravel().astype(np.int64),
+        }))
+
+    columns = GROUP_COLUMNS + ["old_rate", "new_rate", "faculty", "incremental_da", "incremental_hra", "total"]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    df = pd.concat(frames, ignore_index=True)
+    df['total'] = df['incremental_da'] + df['incremental_hra']
+    return df.loc[df['total'] != 0, columns].reset_index(drop=True)
+
+def summarize(impact, by):
+    """Sums an impact table over everything but the `by` columns (e.g. ['revision'], ['month', 'level'])."""
+    cols = ['incremental_da', 'incremental_hra', 'total']
+    if 'revision' in by:
+        keep = list(by) + ['old_rate', 'new_rate']
+        return impact.groupby(keep, as_index=False)[cols].sum()
+    return impact.groupby(list(by), as_index=False)[cols].sum()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.da_impact", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roster", default=None, help="roster CSV or XLSX (default: every saved profile)")
+    parser.add_argument("--from", dest="start", type=datetime.date.fromisoformat,
+                        default=datetime.date(2016, 1, 1), help="first month (default: 2016-01-01, 7th CPC)")
+    parser.add_argument("--to", dest="end", type=datetime.date.fromisoformat, default=None,
+                        help="last month (default: today)")
+    parser.add_argument("--by", nargs="+", choices=GROUP_COLUMNS, default=["revision"],
+                        help="columns to aggregate by (default: revision)")
+    parser.add_argument("--out", default=None, help="write the full impact table (CSV) here")
+    args = parser.parse_args(argv)
+
+    from src.database import init_db
+    from src.master_data import get_master_data
+    init_db()
+    master = get_master_data()
+    today = datetime.date.today()
+    profiles = load_roster(args.roster)
+    ledger = roster_basic_ledger(master, profiles, args.start, args.end or today, today)
+    impact = da_revision_impact(master, ledger)
+
+    summary = summarize(impact, args.by)
+    print(summary.to_string(index=False))
+    print(f"{len(profiles):,} faculty, {len(ledger['months'])} months: "
+          f"total DA + HRA from revisions ₹{int(impact['total'].sum()):,}")
+    if args.out:
+        impact.to_csv(args.out, index=False)
+        print(f"Impact table -> {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
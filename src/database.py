@@ -1,12 +1,20 @@
 import os
-import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, String, Date, Float, Boolean, ForeignKey
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, String, Date, DateTime, Float, Boolean, ForeignKey, Index, LargeBinary
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship
 from datetime import datetime
 
-# Database Setup
-DATABASE_URL = "sqlite:///cas_app.db"
+# Database Setup (CAS_DATABASE_URL points elsewhere, e.g. a scratch DB for the tests)
+DATABASE_URL = os.environ.get("CAS_DATABASE_URL", "sqlite:///cas_app.db")
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_conn, _):
+    # WAL lets the UI keep reading while background jobs write progress/results
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -36,6 +44,44 @@ class MasterTASlabs(Base):
     city_type = Column(String, nullable=False) # 'Metro' or 'Other'
     fixed_amount = Column(Integer, nullable=False)
 
+class MasterHRASlabs(Base):
+    __tablename__ = "master_hra_slabs"
+    id = Column(Integer, primary_key=True, index=True)
+    city_code = Column(String, nullable=False) # 'X', 'Y', 'Z'
+    min_da_rate = Column(Float, nullable=False) # Percentage, e.g. 25.0 means DA >= 25%
+    hra_rate = Column(Float, nullable=False) # Percentage of basic, e.g. 27.0
+
+class MasterPayScales5th(Base):
+    __tablename__ = "master_pay_scales_5th"
+    id = Column(Integer, primary_key=True, index=True)
+    designation = Column(String, nullable=False)
+    min_basic = Column(Integer, nullable=False)
+    increment_1 = Column(Integer, nullable=False) # e.g. 8000-275-13500: 275 up to stage_1_end
+    stage_1_end = Column(Integer, nullable=False)
+    increment_2 = Column(Integer, default=0) # 0 when the scale has one stage
+    stage_2_end = Column(Integer, default=0)
+    increment_3 = Column(Integer, default=0)
+    max_basic = Column(Integer, nullable=False)
+
+class MasterPayBands6th(Base):
+    __tablename__ = "master_pay_bands_6th"
+    id = Column(Integer, primary_key=True, index=True)
+    designation = Column(String, nullable=False)
+    pay_band_name = Column(String, nullable=False) # 'PB-3', 'PB-4'
+    min_band = Column(Integer, nullable=False)
+    max_band = Column(Integer, nullable=False)
+    agp = Column(Integer, nullable=False) # Academic Grade Pay
+    entry_pay_total = Column(Integer, nullable=False) # Band pay + AGP at entry
+
+class MasterCASScales(Base):
+    __tablename__ = "master_cas_scales"
+    id = Column(Integer, primary_key=True, index=True) # File order: the n-th row of each pay commission is the same CAS stage
+    pay_commission = Column(Integer, nullable=False) # 5 or 6
+    designation = Column(String, nullable=False)
+    scale = Column(String, nullable=False) # '8000-275-13500' or pay band '15600-39100'
+    min_basic = Column(Integer, nullable=False)
+    agp = Column(Integer, nullable=True)
+
 # -------------------------------------------------------------------
 # USER DATA MODELS
 # -------------------------------------------------------------------
@@ -44,17 +90,42 @@ class UserProfile(Base):
     __tablename__ = "user_profile"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
+    name_folded = Column(String, nullable=True) # casefold(name), used for indexed prefix search
     joining_date = Column(Date, nullable=False)
     institute_type = Column(String, nullable=False) # 'Govt', 'Aided'
     city_class = Column(String, nullable=False) # 'X', 'Y', 'Z'
-    qualifications = Column(String, nullable=True) # JSON or comma-separated
+    qualifications = Column(String, nullable=True) # Legacy: full profile JSON (pre-migration) or entry qualification
+
+    # Profile fields (formerly only inside the qualifications JSON)
+    initial_doj = Column(Date, nullable=True) # First approved service
+    entry_qualification = Column(String, nullable=True) # 'B.E./B.Tech', 'M.E./M.Tech', 'Ph.D.'
+    acquired_mtech_date = Column(Date, nullable=True)
+    acquired_phd_date = Column(Date, nullable=True)
+    promoted_level_11_date = Column(Date, nullable=True)
+    promoted_level_12_date = Column(Date, nullable=True)
+    current_level = Column(String, nullable=True)
+    current_basic = Column(Integer, nullable=True)
+    past_service_years = Column(Integer, default=0)
+    has_prior_service = Column(Boolean, default=False)
+    past_service_approved = Column(Boolean, default=False)
+    has_past_promotions = Column(Boolean, default=False)
 
     history = relationship("ServiceHistory", back_populates="user")
 
+    __table_args__ = (
+        # (name_folded, id) doubles as the keyset pagination order of the profile directory
+        Index("ix_user_profile_name_folded", "name_folded", "id"),
+        Index("ix_user_profile_institute_type", "institute_type", "name_folded"),
+        Index("ix_user_profile_current_level", "current_level", "name_folded"),
+        Index("ix_user_profile_joining_date", "joining_date"),
+        Index("ix_user_profile_entry_qualification", "entry_qualification"),
+        Index("ix_user_profile_acquired_phd_date", "acquired_phd_date"),
+    )
+
 class ServiceHistory(Base):
     __tablename__ = "service_history"
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("user_profile.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("user_profile.id"), nullable=False, index=True)
     designation = Column(String, nullable=False)
     from_date = Column(Date, nullable=False)
     to_date = Column(Date, nullable=True) # Null means current
@@ -63,6 +134,99 @@ class ServiceHistory(Base):
     
     user = relationship("UserProfile", back_populates="history")
 
+# -------------------------------------------------------------------
+# BACKGROUND JOBS
+# -------------------------------------------------------------------
+
+class BatchJob(Base):
+    __tablename__ = "batch_job"
+    id = Column(Integer, primary_key=True, index=True)
+    owner = Column(String, nullable=False) # Submitting session / user
+    kind = Column(String, nullable=False) # e.g. 'roster_evaluation'
+    params = Column(String, nullable=True) # JSON
+    status = Column(String, nullable=False, default="queued") # queued, running, done, failed, cancelled
+    total = Column(Integer, default=0)
+    done = Column(Integer, default=0)
+    cancel_requested = Column(Boolean, default=False)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    error = Column(String, nullable=True)
+    result = Column(LargeBinary, nullable=True) # CSV bytes
+    runner = Column(String, nullable=True) # 'host:pid' of the runner process executing it
+    heartbeat_at = Column(DateTime, nullable=True) # last sign of life from that runner
+
+    __table_args__ = (
+        Index("ix_batch_job_queue", "status", "owner", "created_at"),
+    )
+
+# -------------------------------------------------------------------
+# STORED ARREARS LEDGERS (see src/ledger_store.py)
+# -------------------------------------------------------------------
+
+class ArrearsStatement(Base):
+    __tablename__ = "arrears_statement"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("user_profile.id"), nullable=False)
+    kind = Column(String, nullable=False) # 'arrears' (next CAS due date) or 'backlog' (all backlog promotions)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    city_class = Column(String, nullable=False) # UI label, e.g. "X (Metro)"
+    drawn_level = Column(String, nullable=True)
+    target_level = Column(String, nullable=True)
+    total_arrears = Column(Integer, nullable=False, default=0)
+    da_version = Column(String, nullable=True) # MasterData.da_version the months were priced with
+    computed_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_arrears_statement_user", "user_id", "kind", unique=True),
+    )
+
+class ArrearsLedgerMonth(Base):
+    __tablename__ = "arrears_ledger_month"
+    id = Column(Integer, primary_key=True)
+    statement_id = Column(Integer, ForeignKey("arrears_statement.id"), nullable=False)
+    month = Column(Date, nullable=False) # 1st of the month
+    drawn_basic = Column(Integer, nullable=False)
+    due_basic = Column(Integer, nullable=False)
+    da_rate = Column(Float, nullable=False) # DA % applied
+    total_arrears = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        # Range scan for "every month on or after a DA change"
+        Index("ix_arrears_ledger_month", "month"),
+        Index("ix_arrears_ledger_statement", "statement_id", "month"),
+    )
+
+# -------------------------------------------------------------------
+# MATERIALIZED PAY LEDGERS (see src/pay_ledger.py)
+# -------------------------------------------------------------------
+
+class ProfilePayLedger(Base):
+    __tablename__ = "profile_pay_ledger"
+    user_id = Column(Integer, ForeignKey("user_profile.id"), primary_key=True)
+    start_month = Column(Date, nullable=True) # 1st of the first month; NULL for an empty ledger
+    months = Column(Integer, nullable=False, default=0)
+    as_of = Column(Date, nullable=False) # simulated up to this date
+    # Packed little-endian arrays, one value per month
+    level_idx = Column(LargeBinary, nullable=False) # int8, index into the master's levels
+    cell = Column(LargeBinary, nullable=False) # int16, 0 when off-matrix
+    basic = Column(LargeBinary, nullable=False) # int32
+    da_rate = Column(LargeBinary, nullable=False) # int32, DA % x 100
+    step_day = Column(LargeBinary, nullable=False) # int8, day of month of the simulation step
+    events = Column(String, nullable=False, default="[]") # JSON promotion events
+    inputs_key = Column(String, nullable=False) # hash of the simulation inputs + master version
+    da_version = Column(String, nullable=True)
+    computed_at = Column(DateTime, nullable=False)
+
+
+# DB stores the city code, the UI shows the label
+CITY_CLASS_LABELS = {"X": "X (Metro)", "Y": "Y (Urban)", "Z": "Z (Rural)"}
+
+def fold_name(name) -> str:
+    """Normalises a profile name for case-insensitive search."""
+    return " ".join(str(name or "").split()).casefold()
+
 
 # -------------------------------------------------------------------
 # DB INITIALIZATION & SEEDING
@@ -70,18 +234,105 @@ class ServiceHistory(Base):
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    migrate_db()
     seed_data()
 
+def migrate_db():
+    """
+    Brings an existing cas_app.db up to the current models.
+    create_all() only creates missing tables, so new columns and indexes
+    on existing tables are added here (SQLite ALTER TABLE ADD COLUMN).
+    """
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c['name'] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name not in existing:
+                    col_type = col.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}'))
+
+        # Backfill the search key for rows saved before it existed
+        rows = conn.execute(text("SELECT id, name FROM user_profile WHERE name_folded IS NULL")).fetchall()
+        if rows:
+            conn.execute(
+                text("UPDATE user_profile SET name_folded = :folded WHERE id = :id"),
+                [{"id": r[0], "folded": fold_name(r[1])} for r in rows]
+            )
+
+        _backfill_profile_columns(conn)
+
+    for table in Base.metadata.sorted_tables:
+        for idx in table.indexes:
+            idx.create(bind=engine, checkfirst=True)
+
+def _backfill_profile_columns(conn):
+    """Copies profile fields out of the legacy qualifications JSON into their own columns."""
+    import json
+
+    rows = conn.execute(text(
+        "SELECT p.id, p.qualifications, h.pay_level, h.basic_pay FROM user_profile p "
+        "LEFT JOIN service_history h ON h.user_id = p.id AND h.to_date IS NULL "
+        "WHERE p.current_level IS NULL"
+    )).fetchall()
+    if not rows:
+        return
+
+    def as_date(val):
+        try:
+            return datetime.strptime(val[:10], "%Y-%m-%d").date() if val else None
+        except (TypeError, ValueError):
+            return None
+
+    updates = []
+    for pid, blob, hist_level, hist_basic in rows:
+        try:
+            extra = json.loads(blob) if blob else {}
+        except ValueError:
+            extra = {"entry_qualification": blob} # Legacy plain string
+        if not isinstance(extra, dict):
+            extra = {}
+        updates.append({
+            "id": pid,
+            "initial_doj": as_date(extra.get('initial_doj')),
+            "entry_qualification": extra.get('entry_qualification'),
+            "acquired_mtech_date": as_date(extra.get('acquired_mtech_date')),
+            "acquired_phd_date": as_date(extra.get('acquired_phd_date')),
+            "promoted_level_11_date": as_date(extra.get('promoted_level_11_date')),
+            "promoted_level_12_date": as_date(extra.get('promoted_level_12_date')),
+            # ServiceHistory was the source of truth for current status
+            "current_level": str(hist_level or extra.get('current_level') or "10"),
+            "current_basic": int(hist_basic or extra.get('current_basic') or 57700),
+            "past_service_years": int(extra.get('past_service_years') or 0),
+            "has_prior_service": bool(extra.get('has_prior_service')),
+            "past_service_approved": bool(extra.get('past_service_approved')),
+            "has_past_promotions": bool(extra.get('has_past_promotions')),
+        })
+
+    cols = [k for k in updates[0] if k != "id"]
+    conn.execute(
+        text(f"UPDATE user_profile SET {', '.join(f'{c} = :{c}' for c in cols)} WHERE id = :id"),
+        updates
+    )
+
 def seed_data():
+    import pandas as pd
+
     db = SessionLocal()
     
+    data_dir = os.path.join(os.getcwd(), "data") # Assumes running from root
+
     # Check if data exists
     if db.query(MasterPayMatrix).first():
-        db.close()
+        # Master tables added after the database was first seeded
+        try:
+            if _seed_added_tables(db, data_dir):
+                db.commit()
+        finally:
+            db.close()
         return
 
     print("Seeding database from CSVs...")
-    data_dir = os.path.join(os.getcwd(), "data") # Assumes running from root
     
     try:
         # Seed Pay Matrix
@@ -125,6 +376,8 @@ def seed_data():
                 )
                 db.add(obj)
 
+        _seed_added_tables(db, data_dir)
+
         db.commit()
         print("Database seeded successfully.")
         
@@ -134,5 +387,50 @@ def seed_data():
     finally:
         db.close()
 
+def _int_or_none(v):
+    import pandas as pd
+    return int(v) if pd.notna(v) else None
+
+# Master tables added after the first seeding: (model, CSV file, CSV row -> columns)
+ADDED_MASTER_TABLES = [
+    (MasterHRASlabs, "hra_slabs.csv", lambda row: {
+        "city_code": str(row['city_code']).strip(),
+        "min_da_rate": float(row['min_da_rate']),
+        "hra_rate": float(row['hra_rate']),
+    }),
+    (MasterPayScales5th, "pay_scales_5th.csv", lambda row: {
+        "designation": str(row['designation']).strip(),
+        **{k: int(row[k]) for k in ('min_basic', 'increment_1', 'stage_1_end', 'increment_2',
+                                    'stage_2_end', 'increment_3', 'max_basic')},
+    }),
+    (MasterPayBands6th, "pay_bands_6th.csv", lambda row: {
+        "designation": str(row['designation']).strip(),
+        "pay_band_name": str(row['pay_band_name']).strip(),
+        **{k: int(row[k]) for k in ('min_band', 'max_band', 'agp', 'entry_pay_total')},
+    }),
+    (MasterCASScales, "cas_scales.csv", lambda row: {
+        "pay_commission": int(row['pay_comm']),
+        "designation": str(row['designation']).strip(),
+        "scale": str(row['scale']).strip(),
+        "min_basic": int(row['min_basic']),
+        "agp": _int_or_none(row['agp']),
+    }),
+]
+
+def _seed_added_tables(db, data_dir) -> int:
+    """Fills the ADDED_MASTER_TABLES that are still empty from their CSVs. Returns the rows added."""
+    import pandas as pd
+
+    added = 0
+    for model, filename, columns in ADDED_MASTER_TABLES:
+        path = os.path.join(data_dir, filename)
+        if db.query(model).first() or not os.path.exists(path):
+            continue
+        df = pd.read_csv(path)
+        for _, row in df.iterrows():
+            db.add(model(**columns(row)))
+        added += len(df)
+    return added
+
 if __name__ == "__main__":
     init_db()
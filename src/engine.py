@@ -0,0 +1,511 @@
+"""
+Pure engine core.
+
+Every function here takes an in-memory MasterData (src/master_data.py)
+and plain inputs, and never touches the database, so it can run in
+worker processes, services and tight loops. The logic_* modules keep
+their DB-session signatures as thin adapters over these functions.
+"""
+import bisect
+import datetime
+import numpy as np
+from src.arrears_ledger import ArrearsLedger
+from src.months import JULY, month_index, month_date, date_at, july_of, add_months, months_served
+from src.tracing import traced
+
+# -------------------------------------------------------------------
+# PAY MATRIX STEPS
+# -------------------------------------------------------------------
+
+def next_cell_exact(md, current_basic: int, level: str) -> int:
+    """Next cell in the level; unchanged if the basic is not a cell or is the last cell."""
+    cell = md.cell_of(level, current_basic)
+    if cell is None:
+        return current_basic
+    nxt = md.basic_at(level, cell + 1)
+    return nxt if nxt is not None else current_basic
+
+def next_cell_nearest(md, current_basic: int, level: str) -> int:
+    """Like next_cell_exact, but an off-matrix basic steps from the closest cell below it."""
+    cell = md.cell_of(level, current_basic)
+    if cell is None:
+        below = md.cell_at_or_below(level, current_basic)
+        if below is None:
+            return current_basic
+        cell = below[0]
+    nxt = md.basic_at(level, cell + 1)
+    return nxt if nxt is not None else current_basic
+
+def promotion_fixation(md, old_basic: int, old_level: str, target_level: str) -> int:
+    """Notional increment in the old level, then the first target cell >= notional pay."""
+    notional_pay = next_cell_nearest(md, old_basic, old_level)
+    target = md.cell_at_or_above(target_level, notional_pay)
+    if target:
+        return target[1]
+    # Fallback to first cell of target if notional is lower than start
+    first = md.first_cell(target_level)
+    if first:
+        return first[1]
+    return old_basic
+
+# Steps in whichever pay commission the simulation is on: the 7th CPC
+# matrix, or the compiled 5th / 6th CPC scales (src/pay_commissions.py)
+
+def _increment(md, pcs, pc, level, pay) -> int:
+    if pc == 7:
+        return next_cell_nearest(md, pay, level)
+    return pcs.increment(pc, level, pay)
+
+def _promotion_pay(md, pcs, pc, level, new_level, pay) -> int:
+    if pc == 7:
+        return promotion_fixation(md, pay, level, new_level)
+    return pcs.promote(pc, level, new_level, pay)
+
+def _revise_to(pcs, pc, target_pc, level, pay):
+    """(pc, pay) revised into each later pay commission up to target_pc."""
+    while pc < target_pc:
+        pay = pcs.revise(pc, level, pay)
+        pc += 1
+    return pc, pay
+
+def _basic_7th(pcs, pc, level, pay) -> int:
+    return pay if pc == 7 else pcs.to_7th(pc, level, pay)
+
+# -------------------------------------------------------------------
+# FIXATION / PROJECTION
+# -------------------------------------------------------------------
+
+@traced("engine.fixation")
+def fixation(md, current_basic: int, current_level: str, target_level: str) -> dict:
+    """7th CPC fixation on promotion (see logic_fixation.calculate_fixation)."""
+    curr_cell = md.cell_of(str(current_level), current_basic)
+    if curr_cell is None:
+        return {"error": "Current Basic Pay not found in Pay Matrix for this level."}
+
+    notional = md.basic_at(str(current_level), curr_cell + 1)
+    notional_pay = notional if notional is not None else current_basic
+
+    target = md.cell_at_or_above(str(target_level), notional_pay)
+    if target is None:
+        return {"error": "Target Pay Matrix cell not found (might be beyond matrix max)."}
+
+    return {
+        "old_basic": current_basic,
+        "old_level": current_level,
+        "notional_increment_pay": notional_pay,
+        "new_level": target_level,
+        "new_basic": target[1],
+        "new_cell": target[0]
+    }
+
+@traced("engine.projected_pay")
+def projected_pay(md, start_basic: int, level: str, start_date: datetime.date, today=None) -> dict:
+    """Applies every July 1st increment after start_date up to today."""
+    today = today or datetime.date.today()
+    current_basic = start_basic
+    increments = []
+
+    for year in range(start_date.year, today.year + 1):
+        check_date = datetime.date(year, 7, 1)
+        if check_date > today:
+            break
+        if check_date > start_date:
+            cell = md.cell_of(level, current_basic)
+            if cell is not None:
+                nxt = md.basic_at(level, cell + 1)
+                if nxt is not None:
+                    current_basic = nxt
+                    increments.append({"date": check_date, "basic": current_basic, "cell": cell + 1})
+
+    return {"projected_basic": current_basic, "increments": increments}
+
+@traced("engine.historical_basic")
+def historical_basic(md, current_basic: int, level: str, years_back: int) -> dict:
+    """Basic pay `years_back` cells earlier in the same level (clamped at cell 1)."""
+    curr_cell = md.cell_of(level, current_basic)
+    if curr_cell is None:
+        return {"error": "Current Basic Pay not found in Matrix"}
+
+    past_cell_num = max(curr_cell - years_back, 1)
+    past_basic = md.basic_at(level, past_cell_num)
+    if past_basic is None:
+        return {"error": "Historical cell not found"}
+    return {"historical_basic": past_basic, "cell": past_cell_num}
+
+# -------------------------------------------------------------------
+# CAREER SIMULATIONS
+# -------------------------------------------------------------------
+
+def years_to_level_11(entry_qual) -> int:
+    # PhD: 4 years, M.Tech/M.Phil: 5 years, Others: 6 years
+    if entry_qual == "Ph.D.":
+        return 4
+    if entry_qual in ["M.E./M.Tech", "M.Phil"]:
+        return 5
+    return 6
+
+@traced("engine.pay_at_current_joining")
+def pay_at_current_joining(md, initial_doj, current_doj, entry_qual) -> dict:
+    """
+    Simulates promotions and increments from the first job to find the
+    Pay Level and Cell on the day of joining the current institute
+    (see logic_continuum.calculate_pay_at_current_joining).
+    A career starting before 2016 runs on the 5th / 6th CPC scales until
+    it is revised into the 7th CPC; Joining_Basic is always the 7th CPC
+    equivalent and Joining_Pay the pay as drawn.
+    """
+    current_level = "10"
+    current_basic = 57700
+
+    if not initial_doj or not current_doj or initial_doj >= current_doj:
+        return {
+            "Joining_Level": current_level,
+            "Joining_Basic": current_basic,
+            "Total_Past_Years": 0,
+            "Error": "Invalid Dates"
+        }
+
+    req_11 = years_to_level_11(entry_qual)
+    years_served = 0
+    anniversary = initial_doj.month - 1
+    pcs = md.pay_commissions()
+    first = month_index(initial_doj)
+    pc = pcs.commission_on(first)
+    if pc != 7:
+        current_basic = pcs.entry_pay(pc, current_level)
+    revision_m = pcs.next_revision(first)
+
+    # The 1st of every month after initial_doj, up to current_doj
+    for m in range(first + 1, month_index(current_doj) + 1):
+        # Pay revision on the first day of a new pay commission
+        if m >= revision_m:
+            pc, current_basic = _revise_to(pcs, pc, pcs.commission_on(m), current_level, current_basic)
+            revision_m = pcs.next_revision(m)
+
+        # Annual increment: July, or the anniversary month on the 5th CPC scales
+        if m % 12 == (anniversary if pc == 5 else JULY):
+            current_basic = _increment(md, pcs, pc, current_level, current_basic)
+
+        # Anniversary month
+        if m % 12 == anniversary:
+            years_served += 1
+            if current_level == "10" and years_served == req_11:
+                current_basic = _promotion_pay(md, pcs, pc, "10", "11", current_basic)
+                current_level = "11"
+            elif current_level == "11" and years_served == (req_11 + 5):
+                current_basic = _promotion_pay(md, pcs, pc, "11", "12", current_basic)
+                current_level = "12"
+
+    return {
+        "Joining_Level": current_level,
+        "Joining_Basic": _basic_7th(pcs, pc, current_level, current_basic),
+        "Joining_Pay": pcs.describe(pc, current_level, current_basic),
+        "Pay_Commission": pc,
+        "Total_Past_Years": years_served,
+        "Log": f"Simulated {years_served} years."
+    }
+
+@traced("engine.cumulative_promotions")
+def cumulative_promotions(md, faculty_data: dict, end_date=None, steps=None):
+    """
+    Month-by-month simulation from initial_doj collecting backlog CAS
+    promotions (see logic_cumulative.evaluate_cumulative_promotions).
+    Returns (events, final_level, final_basic).
+    If `steps` is a list, every simulated step is appended to it as
+    (step date, date after the step, level, basic); a promotion moves the
+    date back to its July 1st effective date (see src/pay_ledger.py).
+    Before 2016 the pay runs on the 5th / 6th CPC scales (increments on the
+    level anniversary on the 5th, in July on the 6th); basics in the steps,
+    events and the result are their 7th CPC equivalents. Due dates can be
+    earlier, but backlog arrears are only priced from the 7th CPC start
+    (backlog_start).
+    """
+    initial_doj = faculty_data['initial_doj']
+    end_date = end_date or datetime.date.today()
+    end_m, end_day = month_index(end_date), end_date.day
+
+    current_level = "10"
+    current_basic = 57700 # Entry pay for Level 10 (Cell 1)
+    pcs = md.pay_commissions()
+    pc = pcs.commission_on(month_index(initial_doj))
+    if pc != 7:
+        pay = pcs.entry_pay(pc, current_level) # as drawn; current_basic is its 7th CPC equivalent
+        current_basic = pcs.to_7th(pc, current_level, pay)
+    else:
+        pay = current_basic
+    revision_m = pcs.next_revision(month_index(initial_doj))
+    promotion_events = []
+    eq = faculty_data.get('entry_qualification', '')
+    req_years_11 = 4 if eq == "Ph.D." else (5 if eq in ["M.E./M.Tech", "M.Phil"] else 6)
+    phd_date = faculty_data.get('acquired_phd_date')
+    if isinstance(phd_date, str):
+        phd_date = datetime.date.fromisoformat(phd_date)
+
+    # Simulation date and level entry date as (month index, day); stepping a
+    # month keeps the day, clamped to the month's length (so it can drift down)
+    m, day = month_index(initial_doj), initial_doj.day
+    entry_m, entry_day = m, day
+
+    while m < end_m or (m == end_m and day <= end_day):
+        step_m, step_day = m, day
+        served = months_served(m, day, entry_m, entry_day)
+
+        # 0. Pay revision into a new pay commission (promotions never move the
+        # date back across one: they go back at most to the July of the year)
+        if m >= revision_m:
+            pc, pay = _revise_to(pcs, pc, pcs.commission_on(m), current_level, pay)
+            revision_m = pcs.next_revision(m)
+            current_basic = _basic_7th(pcs, pc, current_level, pay)
+
+        # 1. Annual increment: July, if 6 months served in the level; on the
+        # 5th CPC scales, each anniversary of entering the level
+        if pc == 5:
+            if m > entry_m and (m - entry_m) % 12 == 0:
+                pay = pcs.increment(5, current_level, pay)
+                current_basic = pcs.to_7th(5, current_level, pay)
+        elif m % 12 == JULY and day == 1:
+            if served >= 6:
+                pay = _increment(md, pcs, pc, current_level, pay)
+                current_basic = _basic_7th(pcs, pc, current_level, pay)
+
+        # 2. Promotions (effective July 1st of the completion year)
+        years_served_in_level = served // 12
+
+        if current_level == "10":
+            if years_served_in_level >= req_years_11:
+                eff_m, eff_day = july_of(m), 1
+                if (eff_m, eff_day) < (entry_m, entry_day):
+                    eff_m, eff_day = m, day # Fallback
+                pay = _promotion_pay(md, pcs, pc, "10", "11", pay)
+                new_basic = _basic_7th(pcs, pc, "11", pay)
+                promotion_events.append({
+                    "Promotion": "Level 10 -> 11",
+                    "Due Date": date_at(eff_m, eff_day),
+                    "Eligibility": "Served Required Years",
+                    "Fixed Basic": new_basic
+                })
+                current_level, current_basic = "11", new_basic
+                entry_m, entry_day = m, day = eff_m, eff_day
+
+        elif current_level == "11":
+            if years_served_in_level >= 5:
+                eff_m = july_of(m)
+                pay = _promotion_pay(md, pcs, pc, "11", "12", pay)
+                new_basic = _basic_7th(pcs, pc, "12", pay)
+                promotion_events.append({
+                    "Promotion": "Level 11 -> 12",
+                    "Due Date": month_date(eff_m),
+                    "Fixed Basic": new_basic
+                })
+                current_level, current_basic = "12", new_basic
+                entry_m, entry_day = m, day = eff_m, 1
+
+        elif current_level == "12":
+            if years_served_in_level >= 3:
+                # Strict PhD check (Feb 18 2026 rule): PhD must be held on the effective date
+                eff_m = july_of(m)
+                if phd_date and phd_date <= month_date(eff_m):
+                    pay = _promotion_pay(md, pcs, pc, "12", "13A1", pay)
+                    new_basic = _basic_7th(pcs, pc, "13A1", pay)
+                    promotion_events.append({
+                        "Promotion": "Level 12 -> 13A1",
+                        "Due Date": month_date(eff_m),
+                        "Note": "PhD Requirement Met",
+                        "Fixed Basic": new_basic
+                    })
+                    current_level, current_basic = "13A1", new_basic
+                    entry_m, entry_day = m, day = eff_m, 1
+
+        if steps is not None:
+            steps.append((date_at(step_m, step_day), date_at(m, day), current_level, current_basic))
+        m, day = add_months(m, day)
+
+    return promotion_events, current_level, current_basic
+
+# -------------------------------------------------------------------
+# ARREARS
+# -------------------------------------------------------------------
+
+def da_lookup(da_rates):
+    """
+    Compiles (effective_date, da_rate%) pairs into a lookup function.
+    For equal effective dates the later pair wins.
+    """
+    pairs = sorted(da_rates, key=lambda r: r[0]) # stable: keeps input order on ties
+    dates = [p[0] for p in pairs]
+    values = [p[1] for p in pairs]
+    def rate_on(on_date):
+        i = bisect.bisect_right(dates, on_date)
+        return values[i - 1] if i else 0.0
+    return rate_on
+
+def city_months(md, city_class, months):
+    """
+    Per-month HRA table rows and TA city types (indices into
+    master_data.TA_CITY_TYPES) for a numpy array of month indices.
+    `city_class` is one class ('X (Metro)') or a posting history of
+    (effective_date, city_class) pairs; like DA, the class in force on the
+    1st of the month applies, the first pair also covers earlier months and
+    for equal dates the later pair wins.
+
+    Posting histories are engine-only for now: profiles, the roster
+    pipeline and stored statements (src/ledger_store.py) carry one class.
+    """
+    from src.master_data import TA_CITY_TYPES
+
+    def codes(c):
+        return md.hra_index(md.city_code(c)), TA_CITY_TYPES.index(md.ta_city_type(c))
+
+    if city_class is None or isinstance(city_class, str):
+        hra_ix, ta_ix = codes(city_class)
+        return np.full(len(months), hra_ix, dtype=np.int64), np.full(len(months), ta_ix, dtype=np.int64)
+    pairs = sorted(city_class, key=lambda r: r[0]) # stable: keeps input order on ties
+    # First month whose 1st falls on or after each effective date
+    starts = np.array([month_index(d) + (d.day > 1) for d, _ in pairs], dtype=np.int64)
+    at = np.maximum(np.searchsorted(starts, months, side="right") - 1, 0)
+    table = np.array([codes(c) for _, c in pairs], dtype=np.int64).reshape(len(pairs), 2)
+    return table[at, 0], table[at, 1]
+
+def month_record(md, month, drawn_basic, due_basic, da_rate, c_code, drawn_ta=0, due_ta=0) -> dict:
+    """One ledger row: drawn vs due pay for a month at a DA fraction (no DA on TA)."""
+    hra = md.hra_rate(c_code, da_rate)
+    drawn_da = round(drawn_basic * da_rate)
+    drawn_hra = round(drawn_basic * hra)
+    drawn_gross = drawn_basic + drawn_da + drawn_hra + drawn_ta
+    due_da = round(due_basic * da_rate)
+    due_hra = round(due_basic * hra)
+    due_gross = due_basic + due_da + due_hra + due_ta
+    return {
+        "Month": month.strftime("%b-%Y"),
+        "Drawn Basic": drawn_basic,
+        "Due Basic": due_basic,
+        "DA Rate %": int(da_rate * 100),
+        "Diff Basic": due_basic - drawn_basic,
+        "Diff DA": due_da - drawn_da,
+        "Diff HRA": due_hra - drawn_hra,
+        "Diff TA": due_ta - drawn_ta,
+        "Total Arrears": due_gross - drawn_gross
+    }
+
+@traced("engine.monthly_arrears")
+def monthly_arrears(md, start_date, end_date, initial_drawn_basic, initial_due_basic,
+                    drawn_level, target_level, city_class, da_rates=None) -> ArrearsLedger:
+    """
+    Month-by-month drawn vs due ledger (see logic_arrears.calculate_monthly_arrears).
+    `city_class` is a class or a posting history (see city_months); TA comes
+    from the slab table per month, for the drawn level on one side and the
+    target level on the other. `da_rates` is an optional list of
+    (effective_date, da_rate%) overriding the master DA table. Returns a
+    columnar ArrearsLedger.
+    """
+    rate_on = da_lookup(da_rates) if da_rates is not None else md.da_rate_on
+    first = month_index(start_date)
+    n = max(month_index(end_date) - first + 1, 0)
+    ledger = ArrearsLedger(n)
+    drawn_basic = int(initial_drawn_basic)
+    due_basic = int(initial_due_basic)
+
+    da = [0.0] * n
+    for i in range(n):
+        m = first + i
+        # July increment (not in the start month itself)
+        if i and m % 12 == JULY:
+            drawn_basic = next_cell_exact(md, drawn_basic, drawn_level)
+            due_basic = next_cell_exact(md, due_basic, target_level)
+        ledger.month[i] = m
+        ledger.drawn_basic[i] = drawn_basic
+        ledger.due_basic[i] = due_basic
+        da[i] = rate_on(month_date(m)) / 100.0
+
+    da = np.array(da, dtype=float)
+    hra_ix, ta_ix = city_months(md, city_class, ledger.month)
+    ta = md.ta_table([str(drawn_level), str(target_level)])
+    return ledger.price(da, md.hra_rates(hra_ix, da), ta[0, ta_ix], ta[1, ta_ix])
+
+def event_target_level(event: dict) -> str:
+    """'Level 10 -> 11' -> '11'."""
+    return event['Promotion'].split("->")[-1].strip()
+
+def pending_events(md, promotion_events, drawn_level) -> list:
+    """
+    The events (sorted by due date) still owed to someone drawing pay in
+    `drawn_level`: those into a level above it. A promotion into the held
+    level or below has already been given effect.
+    """
+    events = sorted(promotion_events, key=lambda e: e['Due Date'])
+    levels = list(md.pay_matrix)
+    drawn_level = str(drawn_level)
+    if drawn_level not in levels:
+        return events
+    held = levels.index(drawn_level)
+    return [e for e in events
+            if event_target_level(e) not in levels or levels.index(event_target_level(e)) > held]
+
+def backlog_start(md, events) -> datetime.date:
+    """
+    First month of the backlog ledger over pending `events` (sorted): the
+    first due date, but not before the 7th CPC start. The ledger prices
+    matrix basics, so earlier months (5th / 6th CPC pay and DA) are not
+    claimed; promotions due before then are given effect in that month.
+    """
+    first = month_index(events[0]['Due Date'])
+    return month_date(max(first, md.pay_commissions().start_month(7)))
+
+@traced("engine.backlog_arrears")
+def backlog_arrears(md, promotion_events, end_date, initial_drawn_basic, drawn_level,
+                    city_class, da_rates=None) -> ArrearsLedger:
+    """
+    Arrears across every backlog promotion in one pass, from backlog_start.
+    The drawn side stays in `drawn_level` from `initial_drawn_basic` (the pay
+    actually drawn in that first month); the due side is re-fixed into the
+    next level at each event (events due by the first month all in it, a
+    later event on a July after that July's increment, as in the cumulative
+    simulation). The ledger also carries the due level,
+    which sets the due side's TA month by month. `city_class` is a class or
+    a posting history (see city_months). `promotion_events` is the list from
+    cumulative_promotions; events into `drawn_level` or below are skipped
+    (see pending_events).
+    """
+    events = pending_events(md, promotion_events, drawn_level)
+    levels = list(md.pay_matrix)
+    if not events:
+        return ArrearsLedger(0, levels)
+    rate_on = da_lookup(da_rates) if da_rates is not None else md.da_rate_on
+    due_months = [month_index(e['Due Date']) for e in events]
+    first = month_index(backlog_start(md, events))
+    n = max(month_index(end_date) - first + 1, 0)
+    ledger = ArrearsLedger(n, levels)
+    level_of = {lvl: i for i, lvl in enumerate(levels)}
+    drawn_basic = due_basic = int(initial_drawn_basic)
+    due_level = str(drawn_level)
+    pending = 0
+
+    da = [0.0] * n
+    for i in range(n):
+        m = first + i
+        # 1. July increment on both sides
+        if i and m % 12 == JULY:
+            drawn_basic = next_cell_exact(md, drawn_basic, drawn_level)
+            due_basic = next_cell_exact(md, due_basic, due_level)
+
+        # 2. Promotions falling in this month re-fix the due basic
+        while pending < len(events) and due_months[pending] <= m:
+            new_level = event_target_level(events[pending])
+            due_basic = promotion_fixation(md, due_basic, due_level, new_level)
+            due_level = new_level
+            pending += 1
+
+        ledger.month[i] = m
+        ledger.drawn_basic[i] = drawn_basic
+        ledger.due_basic[i] = due_basic
+        if due_level not in level_of: # off-matrix level name
+            level_of[due_level] = len(levels)
+            levels.append(due_level)
+        ledger.due_level[i] = level_of[due_level]
+        da[i] = rate_on(month_date(m)) / 100.0
+
+    da = np.array(da, dtype=float)
+    hra_ix, ta_ix = city_months(md, city_class, ledger.month)
+    due_ta = md.ta_table(levels)[ledger.due_level, ta_ix]
+    drawn_ta = md.ta_table([str(drawn_level)])[0, ta_ix]
+    return ledger.price(da, md.hra_rates(hra_ix, da), drawn_ta, due_ta)
@@ -0,0 +1,291 @@
+import csv
+import io
+import json
+import os
+import socket
+import threading
+import datetime
+from sqlalchemy import text
+from src.database import SessionLocal, BatchJob, UserProfile
+from src import querystats
+
+PROGRESS_EVERY = 25 # rows between progress writes / cancellation checks
+HEARTBEAT_SECONDS = 10 # how often a runner marks its running jobs alive
+STALE_AFTER_SECONDS = 60 # a running job without a heartbeat this long has lost its runner
+
+class JobCancelled(Exception):
+    pass
+
+# -------------------------------------------------------------------
+# JOB KINDS
+# -------------------------------------------------------------------
+
+def run_roster_evaluation(params: dict, progress):
+    """
+    Evaluates every saved profile matching the filters (institute_type,
+    current_level) and returns the summary table as CSV bytes.
+    """
+    from src.batch import evaluate_profile
+    from src.master_data import load_master_data
+    from src.pay_ledger import iter_profiles_with_ledgers
+
+    db = SessionLocal()
+    try:
+        master = load_master_data(db)
+        q = db.query(UserProfile)
+        if params.get('institute_type'):
+            q = q.filter(UserProfile.institute_type == params['institute_type'])
+        if params.get('current_level'):
+            q = q.filter(UserProfile.current_level == str(params['current_level']))
+
+        total = q.count()
+        progress(0, total)
+        rows = []
+        profiles = iter_profiles_with_ledgers(q.order_by(UserProfile.name_folded, UserProfile.id), master)
+        for i, (user, data, pay_ledger) in enumerate(profiles, start=1):
+            try:
+                rows.append(evaluate_profile(data, master, pay_ledger=pay_ledger))
+            except Exception as e:
+                rows.append({"name": data['name'], "error": str(e)})
+            if i % PROGRESS_EVERY == 0 or i == total:
+                progress(i, total)
+        return rows_to_csv(rows)
+    finally:
+        db.close()
+
+JOB_KINDS = {
+    "roster_evaluation": run_roster_evaluation,
+}
+
+def rows_to_csv(rows: list) -> bytes:
+    fields = []
+    for r in rows:
+        fields.extend(k for k in r if k not in fields)
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=fields)
+    writer.writeheader()
+    writer.writerows(rows)
+    return buf.getvalue().encode('utf-8')
+
+# -------------------------------------------------------------------
+# QUEUE API (used by the UI)
+# -------------------------------------------------------------------
+
+def submit_job(owner: str, kind: str, params: dict) -> int:
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    db = SessionLocal()
+    try:
+        job = BatchJob(owner=owner, kind=kind, params=json.dumps(params), status="queued",
+                       created_at=datetime.datetime.now())
+        db.add(job)
+        db.commit()
+        return job.id
+    finally:
+        db.close()
+
+def cancel_job(job_id: int):
+    """Queued jobs are cancelled at once; running jobs stop at their next progress check."""
+    db = SessionLocal()
+    try:
+        db.execute(text(
+            "UPDATE batch_job SET status = 'cancelled', finished_at = :now "
+            "WHERE id = :id AND status = 'queued'"
+        ), {"id": job_id, "now": datetime.datetime.now()})
+        db.execute(text(
+            "UPDATE batch_job SET cancel_requested = 1 WHERE id = :id AND status = 'running'"
+        ), {"id": job_id})
+        db.commit()
+    finally:
+        db.close()
+
+def list_jobs(owner: str, limit=20) -> list:
+    db = SessionLocal()
+    try:
+        jobs = db.query(BatchJob.id, BatchJob.kind, BatchJob.params, BatchJob.status, BatchJob.total,
+                        BatchJob.done, BatchJob.created_at, BatchJob.started_at, BatchJob.finished_at,
+                        BatchJob.error)\
+            .filter(BatchJob.owner == owner)\
+            .order_by(BatchJob.id.desc()).limit(limit).all()
+        return [dict(j._mapping) for j in jobs]
+    finally:
+        db.close()
+
+def queue_position(job_id: int) -> int:
+    """Number of queued jobs submitted before this one (all owners)."""
+    db = SessionLocal()
+    try:
+        return db.execute(text(
+            "SELECT COUNT(*) FROM batch_job WHERE status = 'queued' AND id < :id"
+        ), {"id": job_id}).scalar()
+    finally:
+        db.close()
+
+def get_job_result(job_id: int) -> bytes:
+    db = SessionLocal()
+    try:
+        return db.query(BatchJob.result).filter(BatchJob.id == job_id).scalar()
+    finally:
+        db.close()
+
+# -------------------------------------------------------------------
+# RUNNER
+# -------------------------------------------------------------------
+
+# Fair ordering: owners with the fewest running jobs first, then the owner
+# who least recently had a job started (round-robin), then FIFO.
+CLAIM_SQL = text("""
+    SELECT j.id FROM batch_job j
+    WHERE j.status = 'queued'
+    ORDER BY
+        (SELECT COUNT(*) FROM batch_job r WHERE r.owner = j.owner AND r.status = 'running'),
+        (SELECT MAX(s.started_at) FROM batch_job s WHERE s.owner = j.owner) NULLS FIRST,
+        j.created_at, j.id
+    LIMIT 1
+""")
+
+def _pid_alive(pid) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        pass # exists but not ours, or can't tell
+    return True
+
+class JobRunner:
+    """
+    Runs queued BatchJobs on a small pool of daemon threads, so long
+    roster runs never block a Streamlit script thread. State lives in
+    the batch_job table; the runner only claims and executes jobs.
+    A claimed job records its runner ('host:pid') and gets a heartbeat every
+    HEARTBEAT_SECONDS, so several processes (or runners) can share the
+    queue: only jobs whose runner is gone are put back in the queue.
+    """
+    def __init__(self, workers=2, poll_interval=2.0):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.runner_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._claim_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self._requeue_interrupted()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker_loop, name=f"cas-job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._heartbeat_loop, name="cas-job-heartbeat", daemon=True)
+        t.start()
+        self._threads.append(t)
+        return self
+
+    def wake(self):
+        """Lets an idle worker pick up a newly submitted job without waiting for the poll."""
+        self._wakeup.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(HEARTBEAT_SECONDS):
+            db = SessionLocal()
+            try:
+                db.execute(text("UPDATE batch_job SET heartbeat_at = :now WHERE status = 'running' AND runner = :runner"),
+                           {"now": datetime.datetime.now(), "runner": self.runner_id})
+                db.commit()
+            finally:
+                db.close()
+            self._requeue_interrupted()
+
+    def _runner_gone(self, runner, heartbeat_at, now) -> bool:
+        if runner == self.runner_id:
+            return False
+        host, _, pid = (runner or "").rpartition(":")
+        if host == socket.gethostname() and pid.isdigit() and not _pid_alive(int(pid)):
+            return True # a process on this machine that has exited
+        # Other machines, or no runner recorded (older rows): by heartbeat
+        return heartbeat_at is None or (now - heartbeat_at).total_seconds() > STALE_AFTER_SECONDS
+
+    def _requeue_interrupted(self):
+        # Jobs left 'running' by a runner that has gone away never finish
+        now = datetime.datetime.now()
+        db = SessionLocal()
+        try:
+            running = db.execute(text("SELECT id, runner, heartbeat_at FROM batch_job WHERE status = 'running'")).all()
+            for job_id, runner, heartbeat_at in running:
+                if isinstance(heartbeat_at, str):
+                    heartbeat_at = datetime.datetime.fromisoformat(heartbeat_at)
+                if self._runner_gone(runner, heartbeat_at, now):
+                    db.execute(text(
+                        "UPDATE batch_job SET status = 'queued', done = 0, runner = NULL "
+                        "WHERE id = :id AND status = 'running' AND runner IS :runner"
+                    ), {"id": job_id, "runner": runner})
+            db.commit()
+        finally:
+            db.close()
+
+    def _claim(self):
+        with self._claim_lock:
+            db = SessionLocal()
+            try:
+                job_id = db.execute(CLAIM_SQL).scalar()
+                if job_id is None:
+                    return None
+                claimed = db.execute(text(
+                    "UPDATE batch_job SET status = 'running', started_at = :now, runner = :runner, heartbeat_at = :now "
+                    "WHERE id = :id AND status = 'queued'"
+                ), {"id": job_id, "now": datetime.datetime.now(), "runner": self.runner_id}).rowcount
+                db.commit()
+                if not claimed:
+                    return None
+                job = db.get(BatchJob, job_id)
+                return job.id, job.kind, json.loads(job.params or "{}")
+            finally:
+                db.close()
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            claimed = self._claim()
+            if claimed is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._run(*claimed)
+
+    def _run(self, job_id, kind, params):
+        def progress(done, total):
+            db = SessionLocal()
+            try:
+                db.execute(text("UPDATE batch_job SET done = :done, total = :total, heartbeat_at = :now WHERE id = :id"),
+                           {"id": job_id, "done": done, "total": total, "now": datetime.datetime.now()})
+                db.commit()
+                cancelled = db.execute(text("SELECT cancel_requested FROM batch_job WHERE id = :id"),
+                                       {"id": job_id}).scalar()
+            finally:
+                db.close()
+            if cancelled or self._stop.is_set():
+                raise JobCancelled()
+
+        status, result, error = "done", None, None
+        try:
+            with querystats.track(f"job {kind}", job_id=job_id):
+                result = JOB_KINDS[kind](params, progress)
+        except JobCancelled:
+            status = "cancelled"
+        except Exception as e:
+            status, error = "failed", str(e)
+
+        db = SessionLocal()
+        try:
+            db.execute(text(
+                "UPDATE batch_job SET status = :status, result = :result, error = :error, "
+                "finished_at = :now WHERE id = :id AND runner = :runner"
+            ), {"id": job_id, "status": status, "result": result, "error": error, "now": datetime.datetime.now(),
+                "runner": self.runner_id})
+            db.commit()
+        finally:
+            db.close()
@@ -0,0 +1,261 @@
+"""
+Stored per-faculty arrears ledgers and incremental DA repricing.
+
+`rebuild_ledgers` runs the roster pipeline for every saved profile and
+stores its month ledgers (arrears_statement / arrears_ledger_month).
+When the DA table changes, `apply_da_change` reprices only the stored
+months on or after the earliest changed effective date (basics do not
+depend on DA), and returns a delta report of who is owed how much more.
+A statement holds one city class; city-class posting histories are only
+taken by the engine functions (see engine.city_months).
+
+Usage (from the repo root):
+    python -m src.ledger_store rebuild
+    python -m src.ledger_store da-update --out da_delta.csv   # after editing data/da_rates.csv
+"""
+import argparse
+import csv
+import datetime
+import logging
+import os
+import sys
+import time
+from sqlalchemy import select, insert, delete, update, bindparam
+from src.database import engine, UserProfile, MasterDARates, ArrearsStatement, ArrearsLedgerMonth
+
+REBUILD_BATCH_SIZE = 500
+
+logger = logging.getLogger("cas.ledgers")
+
+# -------------------------------------------------------------------
+# STORE
+# -------------------------------------------------------------------
+
+def _write_ledgers(conn, batch, master, now):
+    """batch: list of (user_id, city_class, ledgers dict from evaluate_profile)."""
+    for uid, city_class, _ in batch:
+        # apply_da_change reprices HRA with the statement's one class; a posting history would be lost
+        if city_class is not None and not isinstance(city_class, str):
+            raise ValueError(f"profile {uid}: stored statements take one city class, not a posting history")
+    st, lm = ArrearsStatement.__table__, ArrearsLedgerMonth.__table__
+    user_ids = [uid for uid, _, _ in batch]
+    conn.execute(delete(lm).where(lm.c.statement_id.in_(select(st.c.id).where(st.c.user_id.in_(user_ids)))))
+    conn.execute(delete(st).where(st.c.user_id.in_(user_ids)))
+
+    statements, months = [], []
+    for uid, city_class, ledgers in batch:
+        for kind, led in ledgers.items():
+            statements.append({
+                "user_id": uid, "kind": kind, "start_date": led['start_date'], "end_date": led['end_date'],
+                "city_class": city_class, "drawn_level": led['drawn_level'], "target_level": led['target_level'],
+                "total_arrears": led['ledger'].total_arrears(),
+                "da_version": master.da_version, "computed_at": now,
+            })
+            months.append(led['ledger'])
+    if not statements:
+        return 0
+
+    ids = conn.execute(insert(st).returning(st.c.id, sort_by_parameter_order=True), statements).scalars().all()
+    rows = []
+    for sid, ledger in zip(ids, months):
+        # The DA % the ledger was actually priced at, which apply_da_change compares against
+        for m, drawn, due, rate, total in zip(ledger.month_dates(), ledger.drawn_basic.tolist(),
+                                              ledger.due_basic.tolist(), ledger.da_percent.tolist(),
+                                              ledger.total.tolist()):
+            rows.append({"statement_id": sid, "month": m, "drawn_basic": drawn, "due_basic": due,
+                         "da_rate": rate, "total_arrears": total})
+    if rows:
+        conn.execute(insert(lm), rows)
+    return len(rows)
+
+def rebuild_ledgers(end_date=None, batch_size=REBUILD_BATCH_SIZE) -> dict:
+    """Recomputes and stores the arrears ledgers of every saved profile."""
+    from src.batch import evaluate_profile
+    from src.master_data import load_master_data
+    from src.database import SessionLocal
+    from src.pay_ledger import iter_profiles_with_ledgers
+
+    start = time.perf_counter()
+    now = datetime.datetime.now()
+    db = SessionLocal()
+    profiles = statements_months = errors = 0
+    try:
+        master = load_master_data(db)
+        batch = []
+
+        def flush():
+            nonlocal statements_months
+            with engine.begin() as conn:
+                statements_months += _write_ledgers(conn, batch, master, now)
+            batch.clear()
+
+        query = db.query(UserProfile).order_by(UserProfile.id)
+        for user, data, pay_ledger in iter_profiles_with_ledgers(query, master, batch_size):
+            ledgers = {}
+            try:
+                evaluate_profile(data, master, end_date=end_date, ledgers=ledgers, pay_ledger=pay_ledger)
+            except Exception:
+                logger.exception("ledger rebuild failed for profile %s (%s)", user.id, user.name)
+                errors += 1
+                continue
+            batch.append((user.id, data['city_class'], ledgers))
+            profiles += 1
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        db.close()
+    return {"profiles": profiles, "months": statements_months, "errors": errors,
+            "seconds": round(time.perf_counter() - start, 3)}
+
+# -------------------------------------------------------------------
+# DA CHANGES
+# -------------------------------------------------------------------
+
+def da_change_date(old_rates, new_rates):
+    """
+    Earliest date from which the DA step function differs between two lists
+    of (effective_date, da_rate%) pairs, or None if they price every month alike.
+    """
+    from src.engine import da_lookup
+    old_on, new_on = da_lookup(old_rates), da_lookup(new_rates)
+    for d in sorted({r[0] for r in old_rates} | {r[0] for r in new_rates}):
+        if old_on(d) != new_on(d):
+            return d
+    return None
+
+def read_da_csv(path) -> list:
+    """data/da_rates.csv rows as master_da_rates values."""
+    rows = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            rows.append({
+                "effective_date": datetime.date.fromisoformat(r['effective_date'].strip()),
+                "da_rate": float(r['da_rate']),
+                "pay_commission": int(r['pay_commission']),
+                "notes": r.get('notes') or None,
+            })
+    return rows
+
+def reload_da_rates(csv_path=None):
+    """
+    Replaces master_da_rates with the CSV contents.
+    Returns (old, new) lists of (effective_date, da_rate%) in table order.
+    """
+    csv_path = csv_path or os.path.join(os.getcwd(), "data", "da_rates.csv")
+    new_rows = read_da_csv(csv_path)
+    table = MasterDARates.__table__
+    with engine.begin() as conn:
+        old = [tuple(r) for r in conn.execute(
+            select(table.c.effective_date, table.c.da_rate).order_by(table.c.effective_date, table.c.pay_commission))]
+        conn.execute(delete(table))
+        conn.execute(insert(table), new_rows)
+    new = [(r['effective_date'], r['da_rate'])
+           for r in sorted(new_rows, key=lambda r: (r['effective_date'], r['pay_commission']))]
+    return old, new
+
+def apply_da_change(master, changed_from) -> list:
+    """
+    Reprices stored ledger months on or after `changed_from` with the DA
+    table of `master`, updates statement totals, and returns one delta row
+    per statement whose total changed (largest increase first).
+    """
+    from src.engine import month_record
+    st, lm = ArrearsStatement.__table__, ArrearsLedgerMonth.__table__
+    changed = {} # statement_id -> [months, delta]
+    updates = []
+    with engine.begin() as conn:
+        rows = conn.execute(
+            select(lm.c.id, lm.c.statement_id, lm.c.month, lm.c.drawn_basic, lm.c.due_basic,
+                   lm.c.da_rate, lm.c.total_arrears, st.c.city_class)
+            .join(st, st.c.id == lm.c.statement_id)
+            .where(lm.c.month >= changed_from)
+        )
+        for mid, sid, month, drawn, due, old_rate, old_total, city_class in rows:
+            rate = master.da_rate_on(month)
+            if rate == old_rate:
+                continue
+            # Only DA and HRA move with the rate (no DA on TA), so the TA part of the total is kept
+            c_code = master.city_code(city_class)
+            total = (old_total + month_record(master, month, drawn, due, rate / 100.0, c_code)['Total Arrears']
+                     - month_record(master, month, drawn, due, old_rate / 100.0, c_code)['Total Arrears'])
+            updates.append({"b_id": mid, "da_rate": rate, "total_arrears": total})
+            c = changed.setdefault(sid, [0, 0])
+            c[0] += 1
+            c[1] += total - old_total
+
+        if updates:
+            conn.execute(update(lm).where(lm.c.id == bindparam('b_id'))
+                         .values(da_rate=bindparam('da_rate'), total_arrears=bindparam('total_arrears')), updates)
+        if changed:
+            conn.execute(update(st).where(st.c.id == bindparam('b_id'))
+                         .values(total_arrears=st.c.total_arrears + bindparam('delta')),
+                         [{"b_id": sid, "delta": d} for sid, (_, d) in changed.items()])
+        conn.execute(update(st).values(da_version=master.da_version))
+
+        report = []
+        if changed:
+            for sid, uid, name, kind, total in conn.execute(
+                select(st.c.id, st.c.user_id, UserProfile.name, st.c.kind, st.c.total_arrears)
+                .join(UserProfile.__table__, UserProfile.__table__.c.id == st.c.user_id)
+                .where(st.c.id.in_(list(changed)))
+            ):
+                months, delta = changed[sid]
+                report.append({"user_id": uid, "name": name, "kind": kind, "months_repriced": months,
+                               "old_total": total - delta, "new_total": total, "delta": delta})
+    report.sort(key=lambda r: -r['delta'])
+    return report
+
+def update_da_from_csv(csv_path=None) -> dict:
+    """Loads the DA CSV into the master table and reprices the affected stored months."""
+    from src.database import SessionLocal
+    from src.master_data import load_master_data, get_master_data
+
+    start = time.perf_counter()
+    old, new = reload_da_rates(csv_path)
+    changed_from = da_change_date(old, new)
+    db = SessionLocal()
+    try:
+        master = load_master_data(db)
+    finally:
+        db.close()
+    get_master_data(refresh=True)
+    report = apply_da_change(master, changed_from) if changed_from else []
+    return {"changed_from": changed_from, "report": report, "seconds": round(time.perf_counter() - start, 3)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.ledger_store", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_rebuild = sub.add_parser("rebuild", help="recompute and store every profile's ledgers")
+    p_rebuild.add_argument("--end-date", type=datetime.date.fromisoformat, default=None)
+    p_da = sub.add_parser("da-update", help="load data/da_rates.csv and reprice affected months")
+    p_da.add_argument("--csv", default=None, help="DA CSV (default: data/da_rates.csv)")
+    p_da.add_argument("--out", default=None, help="write the delta report CSV here")
+    args = parser.parse_args(argv)
+
+    from src.database import init_db
+    init_db()
+    if args.cmd == "rebuild":
+        stats = rebuild_ledgers(end_date=args.end_date)
+        print(f"{stats['profiles']:,} profiles, {stats['months']:,} ledger months "
+              f"({stats['errors']} errors) in {stats['seconds']}s")
+        return 0
+
+    res = update_da_from_csv(args.csv)
+    if res['changed_from'] is None:
+        print(f"DA table unchanged; nothing to reprice ({res['seconds']}s)")
+        return 0
+    report = res['report']
+    print(f"DA changed from {res['changed_from']}: {len(report):,} statements repriced, "
+          f"total delta ₹{sum(r['delta'] for r in report):,} in {res['seconds']}s")
+    if args.out:
+        from src.jobs import rows_to_csv
+        with open(args.out, "wb") as f:
+            f.write(rows_to_csv(report))
+        print(f"Delta report -> {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
+from src.tracing import traced
 
+@traced("evaluate_cas_eligibility")
 def evaluate_cas_eligibility(faculty_data: dict, target_level: str):
     """
     Evaluates CAS Eligibility based on AICTE 2018 + Maharashtra Rules.
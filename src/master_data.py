@@ -0,0 +1,274 @@
+import bisect
+import hashlib
+import re
+from src.database import (MasterPayMatrix, MasterDARates, MasterTASlabs, MasterHRASlabs,
+                          MasterPayScales5th, MasterPayBands6th, MasterCASScales)
+
+HRA_DEFAULT_CITY = "Z" # HRA slab for city codes not in the table
+TA_CITY_TYPES = ("Metro", "Other")
+
+class MasterData:
+    """
+    In-memory snapshot of the master tables (pay matrix, DA rates, TA and
+    HRA slabs, 5th / 6th CPC scales).
+    `version` is a content hash, so caches keyed on it are invalidated
+    whenever the seeded data changes. `pay_version` hashes only what the
+    career simulations read (pay matrix, 5th / 6th CPC scales and the pay
+    commission start dates), `da_version` only the DA rates.
+    """
+    def __init__(self, pay_matrix_rows, da_rows, ta_rows, hra_rows,
+                 scale_5th_rows=(), band_6th_rows=(), cas_scale_rows=()):
+        # pay_matrix_rows: (pay_level, cell_number, basic_pay)
+        self.pay_matrix = {}
+        for level, cell, basic in sorted(pay_matrix_rows, key=lambda r: (str(r[0]), r[1])):
+            self.pay_matrix.setdefault(str(level), []).append((int(cell), int(basic)))
+
+        # da_rows: (effective_date, da_rate, pay_commission)
+        self.da_rates = sorted((tuple(r) for r in da_rows), key=lambda r: (r[0], r[2] or 0))
+        # ta_rows: (min_pay_level, city_type, fixed_amount)
+        self.ta_slabs = sorted((tuple(r) for r in ta_rows), key=lambda r: (r[1], -r[0]))
+        # hra_rows: (city_code, min_da_rate, hra_rate), both rates in %
+        self.hra_slabs = sorted((tuple(r) for r in hra_rows), key=lambda r: (r[0], r[1]))
+        # Pre-2016 pay (src/pay_commissions.py), in table order:
+        # scale_5th_rows: (designation, min_basic, increment_1, stage_1_end, increment_2, stage_2_end, increment_3, max_basic)
+        # band_6th_rows: (designation, pay_band_name, min_band, max_band, agp, entry_pay_total)
+        # cas_scale_rows: (pay_commission, designation, scale, min_basic, agp)
+        self.pay_scales_5th = [tuple(r) for r in scale_5th_rows]
+        self.pay_bands_6th = [tuple(r) for r in band_6th_rows]
+        self.cas_scales = [tuple(r) for r in cas_scale_rows]
+
+        digest = hashlib.sha1()
+        for part in (sorted(self.pay_matrix.items()), self.da_rates, self.ta_slabs, self.hra_slabs,
+                     self.pay_scales_5th, self.pay_bands_6th, self.cas_scales):
+            digest.update(repr(part).encode())
+        self.version = digest.hexdigest()[:12]
+        commission_starts = {}
+        for d, _, pc in self.da_rates:
+            commission_starts.setdefault(pc, d)
+        self.pay_version = hashlib.sha1(repr((sorted(self.pay_matrix.items()), self.pay_scales_5th, self.pay_bands_6th,
+                                              self.cas_scales, sorted(commission_starts.items()))).encode()).hexdigest()[:12]
+        self.da_version = hashlib.sha1(repr(self.da_rates).encode()).hexdigest()[:12]
+        self._da_df = None
+        self._pay_commissions = None
+
+        # Lookup tables for the pure engines (src/engine.py)
+        self._cell_of = {lvl: {basic: cell for cell, basic in reversed(cells)}
+                         for lvl, cells in self.pay_matrix.items()}
+        self._basic_at = {lvl: dict(cells) for lvl, cells in self.pay_matrix.items()}
+        self._by_basic = {lvl: sorted((basic, cell) for cell, basic in cells)
+                          for lvl, cells in self.pay_matrix.items()}
+        # Latest row per effective date wins, in (date, pay commission) order:
+        # 2004-04-01 takes the 11% row after the merger row, 2006-01-01 the 6th
+        # CPC reset, and 2016-01-01, 2016-07-01, 2017-01-01 and 2017-07-01 the
+        # 7th CPC rows over the 6th CPC "Extended" ones. (Before the engines,
+        # an unstable pandas sort picked either row on these dates.)
+        self._da_dates = [r[0] for r in self.da_rates]
+        self._da_values = [r[1] for r in self.da_rates]
+
+        # HRA as a (city code x DA band) table of fractions; band b covers DA
+        # fractions from _hra_bands[b] up to the next band. The extra last row
+        # (all zero) is for city codes without slabs of their own or a default.
+        self._hra_bands = sorted({r[1] / 100.0 for r in self.hra_slabs}) or [0.0]
+        codes = sorted({r[0] for r in self.hra_slabs})
+        self.hra_codes = {code: i for i, code in enumerate(codes)}
+        self._hra_table = [[0.0] * len(self._hra_bands) for _ in range(len(codes) + 1)]
+        for code, min_da, rate in self.hra_slabs: # min_da_rate ascending per city code
+            row = self._hra_table[self.hra_codes[code]]
+            for b in range(self._hra_bands.index(min_da / 100.0), len(row)):
+                row[b] = rate / 100.0
+        self._hra_default = self.hra_codes.get(HRA_DEFAULT_CITY, len(codes))
+        self._hra_arrays = None
+
+        # TA as a (pay level x city type) table, rows in pay matrix order;
+        # other level names are looked up on first use
+        self._ta = {}
+        for level in self.pay_matrix:
+            for c_type in TA_CITY_TYPES:
+                self._ta[(level, c_type)] = self._ta_slab(level, c_type)
+
+    def pay_options(self, level) -> list:
+        """Basic pay values of a level in ascending order."""
+        return sorted(basic for _, basic in self.pay_matrix.get(str(level), []))
+
+    # --- Pay matrix lookups ---------------------------------------------
+
+    def cell_of(self, level, basic):
+        """Cell number holding exactly `basic` in `level`, or None."""
+        return self._cell_of.get(str(level), {}).get(basic)
+
+    def basic_at(self, level, cell):
+        """Basic pay of `cell` in `level`, or None past the end of the level."""
+        return self._basic_at.get(str(level), {}).get(cell)
+
+    def cell_at_or_above(self, level, amount):
+        """(cell, basic) of the lowest basic >= amount in `level`, or None."""
+        rows = self._by_basic.get(str(level), [])
+        i = bisect.bisect_left(rows, (amount, -1))
+        return (rows[i][1], rows[i][0]) if i < len(rows) else None
+
+    def cell_at_or_below(self, level, amount):
+        """(cell, basic) of the highest basic <= amount in `level`, or None."""
+        rows = self._by_basic.get(str(level), [])
+        i = bisect.bisect_right(rows, (amount, float('inf')))
+        return (rows[i - 1][1], rows[i - 1][0]) if i > 0 else None
+
+    def first_cell(self, level):
+        """(cell, basic) of the lowest basic in `level`, or None."""
+        rows = self._by_basic.get(str(level), [])
+        return (rows[0][1], rows[0][0]) if rows else None
+
+    # --- DA ---------------------------------------------------------------
+
+    def da_rate_on(self, on_date) -> float:
+        """DA percentage in force on a date (0 before the first entry; see the tie rule in __init__)."""
+        i = bisect.bisect_right(self._da_dates, on_date)
+        return self._da_values[i - 1] if i else 0.0
+
+    # --- Allowances -------------------------------------------------------
+
+    @staticmethod
+    def city_code(city_class) -> str:
+        """'X (Metro)' -> 'X'."""
+        return city_class.split()[0] if city_class and city_class.strip() else ""
+
+    def hra_index(self, city_code) -> int:
+        """Row of a city code ('X'/'Y'/'Z') in the HRA table; unknown codes get HRA_DEFAULT_CITY's."""
+        return self.hra_codes.get(city_code, self._hra_default)
+
+    def hra_rate(self, city_code, da_rate) -> float:
+        """HRA fraction for a city code at a DA fraction."""
+        b = bisect.bisect_right(self._hra_bands, da_rate) - 1
+        return self._hra_table[self.hra_index(city_code)][max(b, 0)]
+
+    def hra_rates(self, code_index, da):
+        """
+        Vectorized hra_rate: HRA fractions for HRA table rows (hra_index) and
+        DA fractions, broadcast against each other like numpy arrays.
+        """
+        import numpy as np
+        if self._hra_arrays is None:
+            self._hra_arrays = (np.array(self._hra_bands), np.array(self._hra_table))
+        bands, table = self._hra_arrays
+        b = np.maximum(np.searchsorted(bands, da, side="right") - 1, 0)
+        return table[code_index, b]
+
+    @staticmethod
+    def ta_city_type(city_class) -> str:
+        """'X (Metro)' -> 'Metro', anything else -> 'Other'."""
+        return "Metro" if "X" in (city_class or "") else "Other"
+
+    def _ta_slab(self, pay_level, c_type) -> int:
+        # Parse level "13A1" -> 13
+        m = re.match(r"(\d+)", str(pay_level))
+        num_level = int(m.group(1)) if m else 0
+        for min_level, city_type, amount in self.ta_slabs: # min_pay_level descending per city type
+            if city_type == c_type and min_level <= num_level:
+                return amount
+        return 0
+
+    def _ta_lookup(self, pay_level, c_type) -> int:
+        key = (str(pay_level), c_type)
+        amount = self._ta.get(key)
+        if amount is None:
+            amount = self._ta[key] = self._ta_slab(*key)
+        return amount
+
+    def ta_amount(self, pay_level, city_class) -> int:
+        """Fixed TA for a pay level and city class ('X (Metro)' -> Metro, else Other)."""
+        return self._ta_lookup(pay_level, self.ta_city_type(city_class))
+
+    def ta_table(self, levels=None):
+        """
+        TA amounts as an int array of len(levels) x TA_CITY_TYPES (levels default
+        to the pay matrix's), for gathering by level and city type indices.
+        """
+        import numpy as np
+        levels = list(self.pay_matrix) if levels is None else levels
+        return np.array([[self._ta_lookup(lvl, t) for t in TA_CITY_TYPES]
+                         for lvl in levels], dtype=np.int64).reshape(len(levels), len(TA_CITY_TYPES))
+
+    def pay_commissions(self):
+        """The compiled 5th / 6th CPC engines (src/pay_commissions.py), built on first use."""
+        if self._pay_commissions is None:
+            from src.pay_commissions import PayCommissions
+            self._pay_commissions = PayCommissions(self)
+        return self._pay_commissions
+
+    def da_history_df(self):
+        """DA table in the shape calculate_monthly_arrears expects."""
+        if self._da_df is None:
+            import pandas as pd
+            self._da_df = pd.DataFrame(
+                [{'effective_date': r[0], 'da_rate': r[1]} for r in self.da_rates],
+                columns=['effective_date', 'da_rate']
+            )
+        return self._da_df
+
+class CellTable:
+    """
+    Pay matrix levels concatenated into one flat list of basics in cell order,
+    so vectorized engines move along a level with index arithmetic: the basic
+    k increments after flat index i is values[min(i + k, hi)]. An off-matrix
+    basic gets a one-cell segment of its own (it never moves, like
+    engine.next_cell_exact).
+    """
+    def __init__(self, md):
+        self.md = md
+        self.values = []
+        self.levels = {} # level -> (offset, length, {basic: position})
+
+    def _level(self, level):
+        if level not in self.levels:
+            cells = self.md.pay_matrix.get(level, [])
+            positions = {}
+            for i, (_, basic) in enumerate(cells):
+                positions.setdefault(basic, i)
+            self.levels[level] = (len(self.values), len(cells), positions)
+            self.values.extend(basic for _, basic in cells)
+        return self.levels[level]
+
+    def locate(self, level, basic):
+        """(flat index of the basic, first and last flat index of its segment)."""
+        offset, length, positions = self._level(str(level))
+        pos = positions.get(basic)
+        if pos is None:
+            self.values.append(basic)
+            i = len(self.values) - 1
+            return i, i, i
+        return offset + pos, offset, offset + length - 1
+
+_PROCESS_MASTER = None
+
+def get_master_data(db=None, refresh=False) -> MasterData:
+    """
+    Process-wide MasterData, loaded on first use. Used by the DB-session
+    adapters in logic_* so they don't re-query master tables per call.
+    """
+    global _PROCESS_MASTER
+    if _PROCESS_MASTER is None or refresh:
+        if db is None:
+            from src.database import SessionLocal
+            db = SessionLocal()
+            try:
+                _PROCESS_MASTER = load_master_data(db)
+            finally:
+                db.close()
+        else:
+            _PROCESS_MASTER = load_master_data(db)
+    return _PROCESS_MASTER
+
+def load_master_data(db) -> MasterData:
+    return MasterData(
+        db.query(MasterPayMatrix.pay_level, MasterPayMatrix.cell_number, MasterPayMatrix.basic_pay).all(),
+        db.query(MasterDARates.effective_date, MasterDARates.da_rate, MasterDARates.pay_commission).all(),
+        db.query(MasterTASlabs.min_pay_level, MasterTASlabs.city_type, MasterTASlabs.fixed_amount).all(),
+        db.query(MasterHRASlabs.city_code, MasterHRASlabs.min_da_rate, MasterHRASlabs.hra_rate).all(),
+        db.query(MasterPayScales5th.designation, MasterPayScales5th.min_basic, MasterPayScales5th.increment_1,
+                 MasterPayScales5th.stage_1_end, MasterPayScales5th.increment_2, MasterPayScales5th.stage_2_end,
+                 MasterPayScales5th.increment_3, MasterPayScales5th.max_basic).order_by(MasterPayScales5th.id).all(),
+        db.query(MasterPayBands6th.designation, MasterPayBands6th.pay_band_name, MasterPayBands6th.min_band,
+                 MasterPayBands6th.max_band, MasterPayBands6th.agp,
+                 MasterPayBands6th.entry_pay_total).order_by(MasterPayBands6th.id).all(),
+        db.query(MasterCASScales.pay_commission, MasterCASScales.designation, MasterCASScales.scale,
+                 MasterCASScales.min_basic, MasterCASScales.agp).order_by(MasterCASScales.id).all(),
+    )
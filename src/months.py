@@ -0,0 +1,116 @@
+"""
+Integer month calendar.
+
+The engines walk careers and ledgers one month at a time. Instead of
+stepping dates (relativedelta(months=1), the timedelta(days=32) trick) a
+month is an integer index -- months since Jan-1970, the ordinal of a pandas
+monthly Period -- so stepping is `m + 1`, July is `m % 12 == 6` and a month
+difference is a subtraction. Dates, month-ends and "Jul-2019" labels for
+the months of TABLE_YEARS come from precomputed tables; months outside it
+are computed on the fly.
+
+Stdlib only, so importing it is cheap.
+"""
+import datetime
+
+EPOCH_YEAR = 1970
+MONTH_FORMAT = "%b-%Y"
+JULY = 6 # m % 12 of a July
+TABLE_YEARS = (1950, 2100) # inclusive
+
+_ABBR = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def _is_leap(y) -> bool:
+    return y % 4 == 0 and (y % 100 != 0 or y % 400 == 0)
+
+# -------------------------------------------------------------------
+# LOOKUP TABLES
+# -------------------------------------------------------------------
+
+TABLE_FIRST = (TABLE_YEARS[0] - EPOCH_YEAR) * 12 # month index of FIRSTS[0]
+FIRSTS, ENDS, DAYS, LABELS = [], [], [], []
+for _y in range(TABLE_YEARS[0], TABLE_YEARS[1] + 1):
+    for _mo in range(12):
+        _d = 29 if _mo == 1 and _is_leap(_y) else _DAYS[_mo]
+        FIRSTS.append(datetime.date(_y, _mo + 1, 1))
+        ENDS.append(datetime.date(_y, _mo + 1, _d))
+        DAYS.append(_d)
+        LABELS.append(f"{_ABBR[_mo]}-{_y}")
+TABLE_SIZE = len(FIRSTS)
+IS_JULY = [i % 12 == JULY for i in range(TABLE_SIZE)] # TABLE_FIRST is a January
+
+# -------------------------------------------------------------------
+# MONTH INDICES
+# -------------------------------------------------------------------
+
+def month_index(d) -> int:
+    """Months since Jan-1970 of a date."""
+    return (d.year - EPOCH_YEAR) * 12 + d.month - 1
+
+def month_date(m) -> datetime.date:
+    """1st of the month of a month index."""
+    i = m - TABLE_FIRST
+    if 0 <= i < TABLE_SIZE:
+        return FIRSTS[i]
+    y, mo = divmod(int(m), 12)
+    return datetime.date(EPOCH_YEAR + y, mo + 1, 1)
+
+def month_end(m) -> datetime.date:
+    """Last day of the month of a month index."""
+    i = m - TABLE_FIRST
+    if 0 <= i < TABLE_SIZE:
+        return ENDS[i]
+    d = month_date(m)
+    return d.replace(day=month_days(m))
+
+def month_days(m) -> int:
+    """Days in the month of a month index."""
+    i = m - TABLE_FIRST
+    if 0 <= i < TABLE_SIZE:
+        return DAYS[i]
+    y, mo = divmod(int(m), 12)
+    return 29 if mo == 1 and _is_leap(EPOCH_YEAR + y) else _DAYS[mo]
+
+def month_label(m, fmt=MONTH_FORMAT) -> str:
+    """'Jul-2019' for a month index (or any strftime format)."""
+    i = m - TABLE_FIRST
+    if fmt == MONTH_FORMAT and 0 <= i < TABLE_SIZE:
+        return LABELS[i]
+    return month_date(m).strftime(fmt)
+
+def date_at(m, day) -> datetime.date:
+    """The date for day `day` of month index m."""
+    return month_date(m).replace(day=day)
+
+def july_of(m) -> int:
+    """Month index of July in the year of month index m."""
+    return m - m % 12 + JULY
+
+def julys_through(m):
+    """Julys among month indices <= m, up to a constant (works on ints and numpy arrays)."""
+    return (m + 12 - JULY) // 12
+
+def julys_between(start_date, end_date) -> int:
+    """Number of July 1st increments in (start_date, end_date]."""
+    if end_date <= start_date:
+        return 0
+    return julys_through(month_index(end_date)) - julys_through(month_index(start_date))
+
+def add_months(m, day, n=1):
+    """
+    (month index, day) moved n months on, with the day clamped to the
+    month's length like `date + relativedelta(months=n)`.
+    """
+    m += n
+    return m, min(day, month_days(m))
+
+def months_served(m, day, since_m, since_day) -> int:
+    """
+    Whole months from (since_m, since_day) to (m, day), the later date, as
+    relativedelta(later, earlier).months + .years * 12 counts them.
+    """
+    n = m - since_m
+    if n > 0 and day < min(since_day, month_days(m)):
+        n -= 1
+    return n
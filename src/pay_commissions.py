@@ -0,0 +1,178 @@
+"""
+5th and 6th Pay Commission pay engines.
+
+Careers that began before 2016 were paid on the 5th CPC incremental scales
+(to 2005; earlier careers are taken to start on them too) and then on the
+6th CPC pay bands plus Academic Grade Pay (2006-2015), before being fixed
+into the 7th CPC matrix. `PayCommissions` compiles the master tables
+(data/pay_scales_5th.csv, pay_bands_6th.csv, cas_scales.csv) into per-stage
+lookup tables, so an increment, a CAS promotion or a revision into the next
+pay commission is a list lookup or a little integer arithmetic, like a 7th
+CPC cell step. The 7th CPC equivalent of a pre-revised pay (its concordance
+into the matrix) is cached.
+
+The CAS stages are the 7th CPC levels: the n-th 5th CPC and the n-th 6th
+CPC row of cas_scales.csv are the stage of CAS_LEVELS[n] (Lecturer / AGP
+6000 is Level 10, ..., Professor / AGP 10000 is Level 14). Pay is the basic
+on the 5th CPC and the pay in the band (without AGP) on the 6th CPC. The
+pay commission in force follows the pay_commission column of the DA table.
+"""
+import bisect
+from src.months import month_index
+
+CAS_LEVELS = ["10", "11", "12", "13A1", "14"]
+
+# Fitment factors and the 6th CPC increment, in percent
+FITMENT_6TH = 186 # 5th CPC basic -> pay in band, rounded up to 10
+FITMENT_7TH = 267 # 6th CPC pay in band + AGP -> 7th CPC pay (UGC), then the next matrix cell
+INCREMENT_6TH = 3 # of pay in band + AGP, rounded up to 10
+NO_REVISION = 1 << 30 # a month index no simulation reaches
+
+def _percent_up_10(amount, percent) -> int:
+    """amount * percent / 100, rounded up to the next 10."""
+    return -(-amount * percent // 1000) * 10
+
+def scale_stages(min_basic, increment_1, stage_1_end, increment_2=0, stage_2_end=0, increment_3=0, max_basic=None) -> list:
+    """Every basic of a 5th CPC scale, e.g. 16400-450-20900-500-22400."""
+    max_basic = max_basic or max(stage_1_end, stage_2_end)
+    stages = [min_basic]
+    for inc, end in ((increment_1, stage_1_end), (increment_2, stage_2_end), (increment_3, max_basic)):
+        if not inc:
+            continue
+        while stages[-1] + inc <= min(end or max_basic, max_basic):
+            stages.append(stages[-1] + inc)
+    return stages
+
+def _parse_scale(scale):
+    """'16400-450-20900-500-22400' -> scale_stages arguments; '15600-39100' -> band limits."""
+    return [int(p) for p in scale.split("-")]
+
+def _norm(designation):
+    return designation.replace(".", "").strip().casefold()
+
+class PayCommissions:
+    """
+    Compiled 5th / 6th CPC tables over a MasterData (see md.pay_commissions()).
+    Without both tables every date is taken to be on the 7th CPC.
+    """
+    def __init__(self, md):
+        self.md = md
+        scales = {_norm(r[0]): r[1:] for r in md.pay_scales_5th}
+        bands = {}
+        for designation, band_name, min_band, max_band, agp, entry_total in md.pay_bands_6th:
+            bands.setdefault(agp, (band_name, min_band, max_band, agp, entry_total - agp))
+
+        # Per CAS stage: 5th CPC basics (+ basic -> position) and the 6th CPC band
+        self.stages_5th, self._position_5th, self.bands_6th = {}, {}, {}
+        rows = {5: [], 6: []}
+        for pc, designation, scale, min_basic, agp in md.cas_scales:
+            if pc in rows:
+                rows[pc].append((designation, scale, min_basic, agp))
+        for level, (designation, scale, _, _) in zip(CAS_LEVELS, rows[5]):
+            stages = scale_stages(*(scales.get(_norm(designation)) or _parse_scale(scale)))
+            self.stages_5th[level] = stages
+            self._position_5th[level] = {basic: i for i, basic in enumerate(stages)}
+        for level, (designation, scale, min_basic, agp) in zip(CAS_LEVELS, rows[6]):
+            if agp in bands:
+                self.bands_6th[level] = bands[agp]
+            else:
+                lo, hi = _parse_scale(scale)[:2]
+                self.bands_6th[level] = ("", lo, hi, agp, lo)
+
+        # First month of each pay commission, from the DA table
+        self.enabled = bool(self.stages_5th and self.bands_6th)
+        starts = {}
+        for d, _, pc in md.da_rates: # date order
+            if pc and pc not in starts:
+                starts[int(pc)] = month_index(d)
+        switches = sorted((m, pc) for pc, m in starts.items())
+        self._switch_months = [m for m, _ in switches]
+        self._switch_pcs = [pc for _, pc in switches]
+        self._to_7th = {}
+
+    def commission_on(self, m) -> int:
+        """Pay commission in force in month index m (the first one before its start)."""
+        if not self.enabled or not self._switch_pcs:
+            return 7
+        i = bisect.bisect_right(self._switch_months, m)
+        return self._switch_pcs[max(i - 1, 0)]
+
+    def next_revision(self, m) -> int:
+        """Month index of the next pay commission's start after month index m (NO_REVISION if none)."""
+        if not self.enabled:
+            return NO_REVISION
+        i = bisect.bisect_right(self._switch_months, m)
+        return self._switch_months[i] if i < len(self._switch_months) else NO_REVISION
+
+    def start_month(self, pc) -> int:
+        """Month index a pay commission starts in, from the DA table (0 if it has no rows for it)."""
+        for m, p in zip(self._switch_months, self._switch_pcs):
+            if p == pc:
+                return m
+        return 0
+
+    # --- Steps --------------------------------------------------------------
+
+    def entry_pay(self, pc, level) -> int:
+        """Starting pay of a stage: the scale minimum, or the 6th CPC entry pay in the band."""
+        if pc == 5:
+            return self.stages_5th[level][0]
+        return self.bands_6th[level][4]
+
+    def increment(self, pc, level, pay) -> int:
+        """One annual increment: the next stage of the scale, or 3% of pay + AGP in the band."""
+        if pc == 5:
+            stages = self.stages_5th[level]
+            i = self._position_5th[level].get(pay)
+            if i is None: # off-scale: from the stage below
+                i = bisect.bisect_right(stages, pay) - 1
+                if i < 0:
+                    return pay
+            return stages[i + 1] if i + 1 < len(stages) else pay
+        _, _, max_band, agp, _ = self.bands_6th[level]
+        return min(pay + _percent_up_10(pay + agp, INCREMENT_6TH), max_band)
+
+    def promote(self, pc, level, new_level, pay) -> int:
+        """
+        CAS promotion fixation: on the 5th CPC a notional increment, then the
+        next stage of the new scale; on the 6th CPC one increment in the band
+        and the new AGP, at least the new band's minimum.
+        """
+        if pc == 5:
+            notional = self.increment(5, level, pay)
+            stages = self.stages_5th[new_level]
+            i = bisect.bisect_left(stages, notional)
+            return stages[min(i, len(stages) - 1)]
+        _, min_band, max_band, _, _ = self.bands_6th[new_level]
+        return min(max(self.increment(6, level, pay), min_band), max_band)
+
+    def revise(self, pc, level, pay) -> int:
+        """Pay fixed into the next pay commission (5th -> 6th, 6th -> 7th) on its first day."""
+        if pc == 5:
+            return max(_percent_up_10(pay, FITMENT_6TH), self.bands_6th[level][4])
+        return self.to_7th(6, level, pay)
+
+    def to_7th(self, pc, level, pay) -> int:
+        """7th CPC matrix basic a pre-revised pay maps to (cached)."""
+        key = (pc, level, pay)
+        basic = self._to_7th.get(key)
+        if basic is None:
+            if pc == 5:
+                basic = self.to_7th(6, level, self.revise(5, level, pay))
+            else:
+                total = pay + self.bands_6th[level][3]
+                cell = self.md.cell_at_or_above(level, -(-total * FITMENT_7TH // 100))
+                cells = self.md.pay_matrix.get(level)
+                basic = cell[1] if cell else (cells[-1][1] if cells else pay)
+            self._to_7th[key] = basic
+        return basic
+
+    def describe(self, pc, level, pay) -> str:
+        """'₹8,000 (5th CPC 8000-13500)', '₹15,600 + AGP ₹6,000 (6th CPC PB-3)', '₹57,700 (7th CPC Level 10)'."""
+        if pc == 5:
+            stages = self.stages_5th[level]
+            return f"₹{pay:,} (5th CPC {stages[0]}-{stages[-1]})"
+        if pc == 6:
+            band_name, _, _, agp, _ = self.bands_6th[level]
+            return f"₹{pay:,} + AGP ₹{agp:,} (6th CPC {band_name or 'pay band'})"
+        return f"₹{pay:,} (7th CPC Level {level})"
@@ -0,0 +1,363 @@
+"""
+Materialized monthly pay ledger per profile.
+
+The simulated career from initial_doj (engine.cumulative_promotions) kept
+as compact monthly arrays -- level index, cell, basic, DA rate -- packed
+into BLOBs of profile_pay_ledger, one row per profile. A ledger is rebuilt
+when its profile is saved (only if the simulation inputs or the pay
+structure changed; a DA change only re-reads the DA column) and in bulk
+with `rebuild`, so the backlog questions -- the roster pipeline's
+cumulative stage, the dashboard's cumulative simulation and backlog
+arrears (stored_cumulative) -- and pay-at-a-date lookups read the ledger
+instead of re-running the simulation. Fixation, projection and
+the single-promotion arrears start from the pay the profile entered, not
+the simulated career, so they don't read it.
+
+A ledger runs up to `as_of`, LEDGER_YEARS_AHEAD past the build date. A
+promotion is only found some months after the July 1st it is backdated to,
+so `cumulative(end_date)` declines (returns None) for end dates between
+the two, and callers fall back to the simulation.
+
+Usage (from the repo root):
+    python -m src.pay_ledger rebuild            # profiles whose ledger is missing or stale
+    python -m src.pay_ledger show 42 --from 2016-01-01 --to 2016-12-31
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+import sys
+import time
+from sqlalchemy import select, delete, insert
+from src import engine
+from src.database import engine as db_engine, UserProfile, ProfilePayLedger
+from src.months import month_index, month_date
+from src.tracing import traced
+
+LEDGER_YEARS_AHEAD = 5
+REBUILD_BATCH_SIZE = 500
+DA_SCALE = 100 # da_rate is stored in hundredths of a percent
+
+logger = logging.getLogger("cas.ledgers")
+
+# Packed column -> numpy dtype
+DTYPES = {"level_idx": "<i1", "cell": "<i2", "basic": "<i4", "da_rate": "<i4", "step_day": "<i1"}
+
+# The simulation's pay before its first step
+ENTRY_LEVEL, ENTRY_BASIC = "10", 57700
+
+def default_as_of(today=None) -> datetime.date:
+    today = today or datetime.date.today()
+    return datetime.date(today.year + LEDGER_YEARS_AHEAD, 12, 31)
+
+def _sim_data(data: dict) -> dict:
+    return dict(data, initial_doj=data.get('initial_doj') or data.get('date_of_joining'))
+
+def inputs_key(data: dict, master) -> str:
+    """
+    Hash of everything the career simulation reads: the profile's inputs and
+    the pay structure (master.pay_version). DA rates are not part of it; a
+    DA change only re-reads the DA column (PayLedger.refresh_da).
+    """
+    d = _sim_data(data)
+    parts = [str(d.get(k) or "") for k in ('initial_doj', 'entry_qualification', 'acquired_phd_date')]
+    return hashlib.sha1("|".join(parts + [master.pay_version]).encode()).hexdigest()[:16]
+
+# -------------------------------------------------------------------
+# LEDGER
+# -------------------------------------------------------------------
+
+class PayLedger:
+    """
+    Monthly career arrays; element i is month `start + i` (a month index,
+    see src/months.py). `events` holds (detected date, event dict) pairs
+    in the shape cumulative_promotions returns.
+    """
+    def __init__(self, start, arrays, events, levels, as_of, inputs_key=None):
+        self.start = start
+        self.level_idx = arrays['level_idx']
+        self.cell = arrays['cell']
+        self.basic = arrays['basic']
+        self.da_rate = arrays['da_rate']
+        self.step_day = arrays['step_day']
+        self.events = events
+        self.levels = levels
+        self.as_of = as_of
+        self.inputs_key = inputs_key
+
+    def __len__(self):
+        return len(self.basic)
+
+    def _pos(self, on_date):
+        if self.start is None:
+            return None
+        i = month_index(on_date) - self.start
+        return i if 0 <= i < len(self) else None
+
+    def at(self, on_date) -> dict:
+        """Level, cell, basic and DA % in the month of `on_date`, or None outside the ledger."""
+        i = self._pos(on_date)
+        if i is None:
+            return None
+        return {"level": self.levels[self.level_idx[i]], "cell": int(self.cell[i]),
+                "basic": int(self.basic[i]), "da_rate": self.da_rate[i] / DA_SCALE}
+
+    def slice(self, start_date, end_date) -> dict:
+        """The months from start_date to end_date (clipped to the ledger) as arrays, without copies."""
+        if self.start is None:
+            lo = hi = 0
+        else:
+            lo = min(max(month_index(start_date) - self.start, 0), len(self))
+            hi = min(max(month_index(end_date) - self.start + 1, lo), len(self))
+        first = (self.start or 0) + lo
+        return {"months": [month_date(first + i) for i in range(hi - lo)],
+                "level_idx": self.level_idx[lo:hi], "cell": self.cell[lo:hi], "basic": self.basic[lo:hi],
+                "da_rate": self.da_rate[lo:hi], "levels": self.levels}
+
+    def cumulative(self, end_date):
+        """
+        (events, final_level, final_basic) as cumulative_promotions(md, data, end_date)
+        would return them, or None when the ledger can't tell (see module docstring).
+        """
+        if end_date > self.as_of:
+            return None
+        events = []
+        for detected, event in self.events:
+            if detected <= end_date:
+                events.append(dict(event))
+            elif event['Due Date'] <= end_date:
+                return None # backdated over end_date by a step after it
+        if events and events[-1]['Due Date'] > end_date:
+            # Found before its July 1st: the simulation already holds the fixed pay
+            return events, engine.event_target_level(events[-1]), events[-1]['Fixed Basic']
+        i = None if self.start is None else month_index(end_date) - self.start
+        if i is not None and 0 <= i < len(self) and self.step_day[i] > end_date.day:
+            i -= 1 # this month's step falls after end_date
+        if i is None or i < 0:
+            return events, ENTRY_LEVEL, ENTRY_BASIC
+        return events, self.levels[self.level_idx[i]], int(self.basic[i])
+
+    def refresh_da(self, master):
+        """Re-reads the DA column from the master's DA table (after a DA change)."""
+        import numpy as np
+        self.da_rate = np.array([round(master.da_rate_on(month_date(self.start + i)) * DA_SCALE)
+                                 for i in range(len(self))], dtype=DTYPES['da_rate'])
+
+@traced("pay_ledger.build")
+def build_ledger(md, data: dict, as_of=None) -> PayLedger:
+    """Runs the career simulation once up to as_of and materializes it month by month."""
+    import numpy as np
+
+    as_of = as_of or default_as_of()
+    steps = []
+    events, _, _ = engine.cumulative_promotions(md, _sim_data(data), as_of, steps=steps)
+    levels = list(md.pay_matrix)
+    level_of = {lvl: i for i, lvl in enumerate(levels)}
+
+    # Last write per month wins: a promotion re-runs the months since its July 1st.
+    # One found before its July 1st skips ahead; the skipped months keep the old pay.
+    state = {}
+    detected, prev_level = [], ENTRY_LEVEL
+    for step_date, sim_date, level, basic in steps:
+        state[month_index(sim_date)] = (sim_date.day, level, basic)
+        if level != prev_level:
+            detected.append(step_date)
+            prev_level = level
+
+    start = min(state) if state else None
+    n = (max(state) - start + 1) if state else 0
+    cols = {k: np.zeros(n, dtype=dt) for k, dt in DTYPES.items()}
+    carry = (1, ENTRY_LEVEL, ENTRY_BASIC)
+    for i in range(n):
+        day, level, basic = carry = state.get(start + i, (1,) + carry[1:])
+        cols['level_idx'][i] = level_of[level]
+        cols['cell'][i] = md.cell_of(level, basic) or 0
+        cols['basic'][i] = basic
+        cols['step_day'][i] = day
+    ledger = PayLedger(start, cols, list(zip(detected, events)), levels, as_of)
+    if n:
+        ledger.refresh_da(md)
+    return ledger
+
+# -------------------------------------------------------------------
+# STORE
+# -------------------------------------------------------------------
+
+def _event_json(detected, event) -> dict:
+    return {"detected": detected.isoformat(),
+            "event": {k: (v.isoformat() if isinstance(v, datetime.date) else v) for k, v in event.items()}}
+
+def _event_from_json(e):
+    event = dict(e['event'], **{"Due Date": datetime.date.fromisoformat(e['event']['Due Date'])})
+    return datetime.date.fromisoformat(e['detected']), event
+
+def ledger_row(user_id, ledger, key, master, now) -> dict:
+    return {
+        "user_id": user_id,
+        "start_month": month_date(ledger.start) if ledger.start is not None else None,
+        "months": len(ledger),
+        "as_of": ledger.as_of,
+        **{k: getattr(ledger, k).astype(dt, copy=False).tobytes() for k, dt in DTYPES.items()},
+        "events": json.dumps([_event_json(d, e) for d, e in ledger.events]),
+        "inputs_key": key,
+        "da_version": master.da_version,
+        "computed_at": now,
+    }
+
+def ledger_from_row(row, master) -> PayLedger:
+    """PayLedger over the row's BLOBs (read-only numpy views, no copies)."""
+    import numpy as np
+    arrays = {k: np.frombuffer(getattr(row, k), dtype=dt) for k, dt in DTYPES.items()}
+    ledger = PayLedger(month_index(row.start_month) if row.start_month else None, arrays,
+                       [_event_from_json(e) for e in json.loads(row.events)], list(master.pay_matrix), row.as_of,
+                       row.inputs_key)
+    if row.da_version != master.da_version and len(ledger):
+        ledger.refresh_da(master)
+    return ledger
+
+def is_current(row, key, today=None) -> bool:
+    return row is not None and row.inputs_key == key and row.as_of >= (today or datetime.date.today())
+
+def _store(conn, rows):
+    table = ProfilePayLedger.__table__
+    conn.execute(delete(table).where(table.c.user_id.in_([r['user_id'] for r in rows])))
+    conn.execute(insert(table), rows)
+
+def refresh_pay_ledger(user_id, data: dict, master, today=None) -> bool:
+    """Rebuilds one profile's ledger if its inputs changed or it ran out; True if rebuilt."""
+    key = inputs_key(data, master)
+    table = ProfilePayLedger.__table__
+    with db_engine.begin() as conn:
+        row = conn.execute(select(table.c.inputs_key, table.c.as_of).where(table.c.user_id == user_id)).first()
+        if is_current(row, key, today):
+            return False
+        ledger = build_ledger(master, data, default_as_of(today))
+        _store(conn, [ledger_row(user_id, ledger, key, master, datetime.datetime.now())])
+    return True
+
+def load_pay_ledgers(user_ids, master, today=None) -> dict:
+    """{user_id: PayLedger} for the current stored ledgers among user_ids (one query)."""
+    if not user_ids:
+        return {}
+    table = ProfilePayLedger.__table__
+    today = today or datetime.date.today()
+    with db_engine.connect() as conn:
+        rows = conn.execute(select(table).where(table.c.user_id.in_(list(user_ids)), table.c.as_of >= today)).all()
+    return {r.user_id: ledger_from_row(r, master) for r in rows}
+
+def stored_cumulative(user_id, data: dict, master, end_date=None):
+    """
+    cumulative_promotions(master, data, end_date) from the profile's stored
+    ledger, or None when there is no current ledger for these inputs or it
+    can't tell (callers then run the simulation).
+    """
+    end_date = end_date or datetime.date.today()
+    ledger = load_pay_ledgers([user_id], master).get(user_id)
+    if ledger is None or ledger.inputs_key != inputs_key(data, master):
+        return None
+    return ledger.cumulative(end_date)
+
+def iter_profiles_with_ledgers(query, master, batch_size=REBUILD_BATCH_SIZE):
+    """
+    Yields (user, faculty_data, PayLedger or None) over a UserProfile query,
+    loading the stored ledgers one batch at a time. A ledger whose inputs
+    don't match the profile is dropped.
+    """
+    from src.profile_store import profile_to_dict
+    batch = []
+
+    def flush():
+        ledgers = load_pay_ledgers([u.id for u, _ in batch], master)
+        for user, data in batch:
+            ledger = ledgers.get(user.id)
+            if ledger is not None and ledger.inputs_key != inputs_key(data, master):
+                ledger = None
+            yield user, data, ledger
+        batch.clear()
+
+    for user in query.yield_per(batch_size):
+        batch.append((user, profile_to_dict(user)))
+        if len(batch) >= batch_size:
+            yield from flush()
+    if batch:
+        yield from flush()
+
+def rebuild_pay_ledgers(force=False, batch_size=REBUILD_BATCH_SIZE, today=None) -> dict:
+    """Builds the ledgers of every profile whose ledger is missing or stale (all of them with force)."""
+    from src.database import SessionLocal
+    from src.master_data import load_master_data
+    from src.profile_store import profile_to_dict
+
+    start = time.perf_counter()
+    now = datetime.datetime.now()
+    table = ProfilePayLedger.__table__
+    db = SessionLocal()
+    built = skipped = errors = 0
+    try:
+        master = load_master_data(db)
+        as_of = default_as_of(today)
+        stored = {} if force else {
+            uid: (key, until) for uid, key, until in db.execute(select(table.c.user_id, table.c.inputs_key, table.c.as_of))}
+        rows = []
+        for user in db.query(UserProfile).order_by(UserProfile.id).yield_per(batch_size):
+            data = profile_to_dict(user)
+            key = inputs_key(data, master)
+            prev = stored.get(user.id)
+            if prev and prev[0] == key and prev[1] >= (today or datetime.date.today()):
+                skipped += 1
+                continue
+            try:
+                rows.append(ledger_row(user.id, build_ledger(master, data, as_of), key, master, now))
+            except Exception:
+                logger.exception("pay ledger build failed for profile %s (%s)", user.id, user.name)
+                errors += 1
+                continue
+            built += 1
+            if len(rows) >= batch_size:
+                with db_engine.begin() as conn:
+                    _store(conn, rows)
+                rows = []
+        if rows:
+            with db_engine.begin() as conn:
+                _store(conn, rows)
+    finally:
+        db.close()
+    return {"built": built, "skipped": skipped, "errors": errors, "seconds": round(time.perf_counter() - start, 3)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.pay_ledger", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_rebuild = sub.add_parser("rebuild", help="build missing or stale ledgers")
+    p_rebuild.add_argument("--force", action="store_true", help="rebuild every ledger")
+    p_show = sub.add_parser("show", help="print a profile's ledger months")
+    p_show.add_argument("user_id", type=int)
+    p_show.add_argument("--from", dest="start", type=datetime.date.fromisoformat, default=datetime.date(1900, 1, 1))
+    p_show.add_argument("--to", dest="end", type=datetime.date.fromisoformat, default=None)
+    args = parser.parse_args(argv)
+
+    from src.database import init_db
+    from src.master_data import get_master_data
+    init_db()
+    if args.cmd == "rebuild":
+        stats = rebuild_pay_ledgers(force=args.force)
+        print(f"{stats['built']:,} ledgers built, {stats['skipped']:,} current ({stats['errors']} errors) "
+              f"in {stats['seconds']}s")
+        return 0
+
+    master = get_master_data()
+    ledger = load_pay_ledgers([args.user_id], master).get(args.user_id)
+    if ledger is None:
+        print(f"No current pay ledger for profile {args.user_id} (run: python -m src.pay_ledger rebuild)")
+        return 1
+    part = ledger.slice(args.start, args.end or datetime.date.today())
+    for i, month in enumerate(part['months']):
+        print(f"{month:%b-%Y}  Level {part['levels'][part['level_idx'][i]]:<5} Cell {part['cell'][i]:>2}  "
+              f"Basic {part['basic'][i]:>7,}  DA {part['da_rate'][i] / DA_SCALE:g}%")
+    for detected, e in ledger.events:
+        print(f"{e['Promotion']}: due {e['Due Date']}, fixed at {e['Fixed Basic']:,} (found {detected})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
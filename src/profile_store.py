@@ -0,0 +1,279 @@
+import csv
+import io
+import os
+import time
+import datetime
+from sqlalchemy import insert, update, delete, select, bindparam
+from src.database import engine, UserProfile, ServiceHistory, fold_name, CITY_CLASS_LABELS
+
+DATE_FIELDS = ['date_of_joining', 'initial_doj', 'acquired_mtech_date', 'acquired_phd_date',
+               'promoted_level_11_date', 'promoted_level_12_date']
+BOOL_FIELDS = ['has_prior_service', 'past_service_approved', 'has_past_promotions']
+
+# faculty_data keys that map 1:1 onto user_profile columns
+PROFILE_FIELDS = DATE_FIELDS[1:] + BOOL_FIELDS + ['entry_qualification', 'current_level',
+                                                 'current_basic', 'past_service_years']
+
+IMPORT_BATCH_SIZE = 2000
+
+# -------------------------------------------------------------------
+# ROW BUILDERS (shared by the form save and the bulk importer)
+# -------------------------------------------------------------------
+
+def profile_row(data: dict) -> dict:
+    """Maps a faculty_data dict onto user_profile column values."""
+    row = {
+        "name": data['name'],
+        "name_folded": fold_name(data['name']),
+        "institute_type": data['institute_type'],
+        # Map UI City Class to DB format ("X (Metro)" -> "X")
+        "city_class": data['city_class'].split()[0],
+        "joining_date": data['date_of_joining'],
+        "qualifications": data.get('entry_qualification'),
+    }
+    for k in PROFILE_FIELDS:
+        row[k] = data.get(k)
+    row['current_level'] = str(data['current_level'])
+    row['current_basic'] = int(data['current_basic'])
+    row['past_service_years'] = int(data.get('past_service_years') or 0)
+    for k in BOOL_FIELDS:
+        row[k] = bool(data.get(k))
+    return row
+
+def profile_to_dict(user) -> dict:
+    """Rebuilds a faculty_data dict from a UserProfile row (ORM object or Row)."""
+    data = {k: getattr(user, k) for k in PROFILE_FIELDS}
+    data.update({
+        "name": user.name,
+        "institute_type": user.institute_type,
+        "city_class": CITY_CLASS_LABELS.get(user.city_class, user.city_class),
+        "date_of_joining": user.joining_date,
+    })
+    data['initial_doj'] = data['initial_doj'] or user.joining_date
+    data['current_level'] = data['current_level'] or "10"
+    data['current_basic'] = data['current_basic'] or 57700
+    data['past_service_years'] = data['past_service_years'] or 0
+    return data
+
+def history_row(user_id: int, data: dict) -> dict:
+    """Current-status ServiceHistory row for a profile."""
+    return {
+        "user_id": user_id,
+        "designation": "Current Designation", # Placeholder as field wasn't in new form
+        "from_date": datetime.date.today(), # Placeholder
+        "to_date": None,
+        "pay_level": str(data['current_level']),
+        "basic_pay": int(data['current_basic']),
+    }
+
+# -------------------------------------------------------------------
+# SINGLE PROFILE UPSERT
+# -------------------------------------------------------------------
+
+def upsert_profile(db, data: dict) -> int:
+    """
+    Inserts or updates a profile (matched by name) and replaces its
+    current-status history in a single transaction. Returns the profile id.
+    """
+    try:
+        row = profile_row(data)
+        user_id = db.execute(
+            select(UserProfile.id)
+            .where(UserProfile.name_folded == row['name_folded'], UserProfile.name == row['name'])
+            .limit(1)
+        ).scalar()
+
+        if user_id is None:
+            user_id = db.execute(insert(UserProfile).values(**row).returning(UserProfile.id)).scalar_one()
+        else:
+            db.execute(update(UserProfile).where(UserProfile.id == user_id).values(**row))
+
+        db.execute(delete(ServiceHistory).where(ServiceHistory.user_id == user_id))
+        db.execute(insert(ServiceHistory).values(**history_row(user_id, data)))
+        db.commit()
+        return user_id
+    except Exception:
+        db.rollback()
+        raise
+
+# -------------------------------------------------------------------
+# BULK ROSTER IMPORT
+# -------------------------------------------------------------------
+
+def _to_date(val):
+    if val is None or val == "":
+        return None
+    if isinstance(val, datetime.datetime):
+        return val.date()
+    if isinstance(val, datetime.date):
+        return val
+    return datetime.date.fromisoformat(str(val).strip()[:10])
+
+def _to_bool(val):
+    if isinstance(val, str):
+        return val.strip().lower() in ("1", "true", "yes", "y")
+    return bool(val)
+
+def normalize_roster_row(raw: dict) -> dict:
+    """
+    Converts one roster record (CSV strings or XLSX cells) into a faculty_data
+    dict. Raises ValueError for a record that can't be a profile.
+    """
+    data = {str(k).strip(): (v.strip() if isinstance(v, str) else v) for k, v in raw.items() if k}
+    if not data.get('name'):
+        raise ValueError("name is required")
+    data['name'] = str(data['name'])
+    if not data.get('date_of_joining'):
+        raise ValueError("date_of_joining is required")
+    for k in DATE_FIELDS:
+        data[k] = _to_date(data.get(k))
+    for k in BOOL_FIELDS:
+        data[k] = _to_bool(data.get(k))
+    if not data.get('initial_doj'):
+        data['initial_doj'] = data['date_of_joining']
+    data['current_level'] = str(data.get('current_level') or "10")
+    data['current_basic'] = int(float(data.get('current_basic') or 57700))
+    data['past_service_years'] = int(float(data.get('past_service_years') or 0))
+    # Blank cells count as missing
+    data['city_class'] = data.get('city_class') or "Z (Rural)"
+    data['institute_type'] = data.get('institute_type') or "Government"
+    return data
+
+def iter_roster_records(source, file_name=None):
+    """
+    Streams raw roster records as (row number, dict) from a CSV or XLSX file
+    path / file object; the header is row 1. XLSX is opened in openpyxl
+    read-only mode so rows are never all in memory.
+    """
+    file_name = file_name or getattr(source, 'name', None) or str(source)
+    ext = os.path.splitext(file_name)[1].lower()
+
+    if ext in ('.xlsx', '.xlsm'):
+        from openpyxl import load_workbook
+        wb = load_workbook(source, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = [str(h).strip() if h is not None else None for h in next(rows)]
+            for n, values in enumerate(rows, start=2):
+                if values and any(v is not None for v in values):
+                    yield n, dict(zip(header, values))
+        finally:
+            wb.close()
+    else:
+        if isinstance(source, (str, os.PathLike)):
+            fh = open(source, newline='', encoding='utf-8-sig')
+        else:
+            fh = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+        try:
+            reader = csv.DictReader(fh)
+            for raw in reader:
+                yield reader.line_num, raw
+        finally:
+            fh.close()
+
+def iter_roster(source, file_name=None, errors=None):
+    """
+    Streams roster records as faculty_data dicts. A record that fails
+    normalize_roster_row raises ValueError naming its row, or, if `errors` is
+    a list, is skipped and noted there as {"row", "name", "error"}.
+    """
+    for n, raw in iter_roster_records(source, file_name):
+        try:
+            yield normalize_roster_row(raw)
+        except (ValueError, TypeError) as e:
+            if errors is None:
+                raise ValueError(f"Row {n}: {e}") from e
+            errors.append({"row": n, "name": raw.get('name'), "error": str(e)})
+
+def write_batch(conn, batch: list):
+    """
+    Upserts a batch of faculty_data dicts (matched by name) and their
+    current-status history on an open connection. Returns (inserted, updated).
+    Last occurrence wins when a roster repeats a name within the batch.
+    """
+    by_name = {d['name']: d for d in batch}
+    rows = [profile_row(d) for d in by_name.values()]
+
+    existing = {}
+    for uid, name in conn.execute(
+        select(UserProfile.id, UserProfile.name)
+        .where(UserProfile.name_folded.in_({r['name_folded'] for r in rows}))
+        .order_by(UserProfile.id)
+    ):
+        existing.setdefault(name, uid)
+
+    to_update = [dict(r, b_id=existing[r['name']]) for r in rows if r['name'] in existing]
+    to_insert = [r for r in rows if r['name'] not in existing]
+
+    if to_update:
+        conn.execute(
+            update(UserProfile.__table__)
+            .where(UserProfile.__table__.c.id == bindparam('b_id'))
+            .values({k: bindparam(k) for k in rows[0]}),
+            to_update
+        )
+
+    ids = dict(existing)
+    if to_insert:
+        new_ids = conn.execute(
+            insert(UserProfile.__table__).returning(UserProfile.__table__.c.id, sort_by_parameter_order=True),
+            to_insert
+        ).scalars().all()
+        ids.update(zip((r['name'] for r in to_insert), new_ids))
+
+    user_ids = [ids[name] for name in by_name]
+    conn.execute(delete(ServiceHistory.__table__).where(ServiceHistory.__table__.c.user_id.in_(user_ids)))
+    conn.execute(
+        insert(ServiceHistory.__table__),
+        [history_row(ids[name], d) for name, d in by_name.items()]
+    )
+    return len(to_insert), len(to_update)
+
+def import_roster(source, file_name=None, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Bulk loads a roster file into user_profile / service_history.
+    Each batch is written in one transaction with executemany statements.
+    Rows that fail validation are skipped and listed under "errors" (see
+    iter_roster), so one bad row doesn't stop the rest of the import.
+    Returns counts and throughput.
+    """
+    start = time.perf_counter()
+    total = inserted = updated = 0
+    batch, errors = [], []
+
+    def flush():
+        nonlocal inserted, updated
+        with engine.begin() as conn:
+            ins, upd = write_batch(conn, batch)
+        inserted += ins
+        updated += upd
+        batch.clear()
+
+    for data in iter_roster(source, file_name, errors=errors):
+        batch.append(data)
+        total += 1
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": total,
+        "inserted": inserted,
+        "updated": updated,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(total / elapsed) if elapsed > 0 else total,
+    }
+
+if __name__ == "__main__":
+    import sys
+    from src.database import init_db
+    init_db()
+    for path in sys.argv[1:]:
+        stats = import_roster(path)
+        print(f"{path}: {stats['rows']} rows ({stats['inserted']} new, {stats['updated']} updated) "
+              f"in {stats['seconds']}s -> {stats['rows_per_sec']:,} rows/s")
+        for err in stats['errors']:
+            print(f"  row {err['row']} ({err['name'] or 'no name'}): {err['error']}")
@@ -0,0 +1,108 @@
+"""
+SQL query counting and timing per computation.
+
+Wrap a unit of work in `track(label)`; every statement executed while it
+is open (in the same thread/context) is counted and timed against it, and
+against any enclosing scopes. On exit the scope is emitted as a structured
+log record on the "cas.sql" logger and appended to the active collector
+(see `collect`), which the dashboard's debug panel reads.
+
+Statements repeated within one scope are reported, so N+1 patterns (one
+lookup per July, per faculty, ...) stand out.
+"""
+import contextvars
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("cas.sql")
+
+REPEATED_TOP = 3
+STATEMENT_CHARS = 240
+
+_scopes = contextvars.ContextVar("querystats_scopes", default=())
+_collector = contextvars.ContextVar("querystats_collector", default=None)
+
+class QueryScope:
+    def __init__(self, label, fields):
+        self.label = label
+        self.fields = fields
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements = {} # statement -> [count, seconds]
+
+    def add(self, statement, seconds):
+        self.queries += 1
+        self.seconds += seconds
+        s = self.statements.setdefault(statement, [0, 0.0])
+        s[0] += 1
+        s[1] += seconds
+
+    def record(self, wall_seconds) -> dict:
+        repeated = sorted(((c, t, stmt) for stmt, (c, t) in self.statements.items() if c > 1), reverse=True)
+        return {
+            "scope": self.label,
+            **self.fields,
+            "queries": self.queries,
+            "distinct": len(self.statements),
+            "sql_ms": round(self.seconds * 1000, 3),
+            "wall_ms": round(wall_seconds * 1000, 3),
+            "repeated": [{"count": c, "sql_ms": round(t * 1000, 3), "statement": " ".join(stmt.split())[:STATEMENT_CHARS]}
+                         for c, t, stmt in repeated[:REPEATED_TOP]],
+        }
+
+@contextmanager
+def track(label, **fields):
+    """
+    Attributes the queries run inside the block to `label`; yields the scope.
+    Also usable as a function decorator.
+    """
+    scope = QueryScope(label, fields)
+    outer = _scopes.get()
+    token = _scopes.set(outer + (scope,))
+    start = time.perf_counter()
+    try:
+        yield scope
+    finally:
+        wall = time.perf_counter() - start
+        _scopes.reset(token)
+        record = scope.record(wall)
+        record['depth'] = len(outer)
+        logger.info(json.dumps(record), extra={"querystats": record})
+        collector = _collector.get()
+        if collector is not None:
+            collector.append(record)
+
+def collect() -> list:
+    """Starts a fresh list of scope records for the current context (one per dashboard run)."""
+    records = []
+    _collector.set(records)
+    return records
+
+# -------------------------------------------------------------------
+# SQLALCHEMY HOOKS
+# Registered on the app engine when this module is first imported; no
+# statement is timed unless a scope is open.
+# -------------------------------------------------------------------
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _scopes.get():
+        context._querystats_start = time.perf_counter()
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_querystats_start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    for scope in _scopes.get():
+        scope.add(statement, elapsed)
+
+def install(engine):
+    from sqlalchemy import event
+    if not event.contains(engine, "before_cursor_execute", before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+from src.database import engine as _app_engine
+install(_app_engine)
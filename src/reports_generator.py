@@ -1,6 +1,8 @@
 from fpdf import FPDF
 from datetime import date
 import pandas as pd
+from src.months import month_label
+from src.tracing import traced
 
 class PDFReport(FPDF):
     def header(self):
@@ -15,6 +17,7 @@ class PDFReport(FPDF):
         self.set_font('Arial', 'I', 8)
         self.cell(0, 10, f'Page {self.page_no()}/{{nb}}', 0, 0, 'C')
 
+@traced("generate_arrears_pdf")
 def generate_arrears_pdf(profile_data: dict, df: pd.DataFrame, due_date: date, target_level: str):
     pdf = PDFReport()
     pdf.alias_nb_pages()
@@ -50,6 +53,9 @@ def generate_arrears_pdf(profile_data: dict, df: pd.DataFrame, due_date: date, t
     # Summary Metrics
     total_arrears = df['Total Arrears'].sum()
     months = len(df)
+    # Month labels are formatted here, from the ledger's month indices
+    month_labels = [month_label(p.ordinal) for p in df['Month']] if isinstance(df['Month'].dtype, pd.PeriodDtype) \
+        else [str(m) for m in df['Month']]
     
     pdf.set_font('Arial', 'B', 12)
     pdf.cell(0, 8, 'Summary', 0, 1, 'L')
@@ -60,7 +66,8 @@ def generate_arrears_pdf(profile_data: dict, df: pd.DataFrame, due_date: date, t
     
     pdf.set_font('Arial', '', 10)
     pdf.cell(50, 6, f"Period:", 0, 0)
-    pdf.cell(0, 6, f"{months} Months ({df.iloc[0]['Month']} to {df.iloc[-1]['Month']})", 0, 1)
+    if months:
+        pdf.cell(0, 6, f"{months} Months ({month_labels[0]} to {month_labels[-1]})", 0, 1)
     
     pdf.ln(10)
     
@@ -68,23 +75,19 @@ def generate_arrears_pdf(profile_data: dict, df: pd.DataFrame, due_date: date, t
     pdf.set_font('Arial', 'B', 10)
     
     # Columns to show
-    cols = ["Month", "Drawn Basic", "Due Basic", "Diff Basic", "Diff DA", "Diff HRA", "Total Arrears"]
-    col_widths = [25, 25, 25, 25, 25, 25, 30]
+    cols = ["Month", "Drawn Basic", "Due Basic", "Diff Basic", "Diff DA", "Diff HRA", "Diff TA", "Total Arrears"]
+    col_widths = [22, 23, 23, 22, 22, 22, 20, 26]
     
     # Header Row
     for i, col in enumerate(cols):
         pdf.cell(col_widths[i], 8, col, 1, 0, 'C')
     pdf.ln()
     
-    # Data Rows
+    # Data Rows (formatted column by column)
     pdf.set_font('Arial', '', 9)
-    for _, row in df.iterrows():
-        for i, col in enumerate(cols):
-            val = row[col]
-            if isinstance(val, (int, float)):
-                txt = f"{val:,.0f}"
-            else:
-                txt = str(val)
+    columns = [month_labels] + [[f"{v:,.0f}" for v in df[col].tolist()] for col in cols[1:]]
+    for row in zip(*columns):
+        for i, txt in enumerate(row):
             pdf.cell(col_widths[i], 7, txt, 1, 0, 'C')
         pdf.ln()
 
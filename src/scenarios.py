@@ -0,0 +1,120 @@
+"""
+What-if arrears sweeps.
+
+Disputes often turn on "what if the promotion was due July 2016 rather
+than July 2017" or "13A1 rather than 12". `arrears_sweep` totals the
+arrears of many (start date, target level, drawn basic) scenarios at once:
+the month grid, the DA/HRA vectors and the pay-matrix tables are built
+once, and every scenario is one row of a scenarios x months array instead
+of one monthly_arrears run each. Totals match engine.monthly_arrears.
+"""
+import datetime
+from src import engine
+from src.master_data import CellTable
+from src.months import JULY, month_index, month_date, julys_between
+from src.tracing import traced
+
+# -------------------------------------------------------------------
+# SCENARIOS
+# -------------------------------------------------------------------
+
+def drawn_basic_on(md, current_basic: int, level: str, start_date, today=None) -> int:
+    """
+    Basic drawn on start_date, rolling back one cell per July increment up to
+    today (the dashboard's suggested drawn basic). Off-matrix basics are kept.
+    """
+    today = today or datetime.date.today()
+    years_back = julys_between(start_date, today)
+    if not years_back:
+        return int(current_basic)
+    res = engine.historical_basic(md, int(current_basic), str(level), years_back)
+    return res.get('historical_basic', int(current_basic))
+
+def scenario_grid(md, start_dates, target_levels, drawn_level, current_basic, today=None) -> list:
+    """Every (start date, target level) pair, with the drawn basic rolled back to each start date."""
+    scenarios = []
+    for start_date in start_dates:
+        drawn = drawn_basic_on(md, current_basic, drawn_level, start_date, today)
+        for target in target_levels:
+            scenarios.append({"start_date": start_date, "target_level": str(target), "drawn_basic": drawn})
+    return scenarios
+
+# -------------------------------------------------------------------
+# SWEEP
+# -------------------------------------------------------------------
+
+@traced("scenarios.arrears_sweep")
+def arrears_sweep(md, scenarios, end_date, drawn_level, city_class, da_rates=None) -> list:
+    """
+    Arrears totals for a list of scenario dicts with `start_date`,
+    `target_level` and `drawn_basic` (and optionally `due_basic`, which
+    otherwise is the promotion fixation of the drawn basic into the target
+    level). Drawn level, city class (or posting history, see
+    engine.city_months) and end date are shared. Returns one result dict
+    per scenario, in order.
+    """
+    import numpy as np
+
+    if not scenarios:
+        return []
+    rate_on = engine.da_lookup(da_rates) if da_rates is not None else md.da_rate_on
+
+    # Shared month grid, per-month DA / HRA fractions and TA city types
+    starts = [month_index(s['start_date']) for s in scenarios]
+    first, last = min(starts), month_index(end_date)
+    months = np.arange(first, max(last, max(starts)) + 1) # also covers starts after end_date
+    month_dates = [month_date(m) for m in months.tolist()]
+    da = np.array([rate_on(d) / 100.0 for d in month_dates])
+    hra_ix, ta_ix = engine.city_months(md, city_class, months)
+    hra = md.hra_rates(hra_ix, da)
+    julys = np.cumsum(months % 12 == JULY) # Julys in (first - 1, m]
+
+    # Per-scenario start, basics and their places in the flat pay table
+    tables = CellTable(md)
+    n = len(scenarios)
+    start = np.empty(n, dtype=np.int64)
+    drawn_at, drawn_top = np.empty(n, dtype=np.int64), np.empty(n, dtype=np.int64)
+    due_at, due_top = np.empty(n, dtype=np.int64), np.empty(n, dtype=np.int64)
+    due_basics = []
+    for i, s in enumerate(scenarios):
+        drawn = int(s['drawn_basic'])
+        due = s.get('due_basic')
+        due = int(due) if due else engine.promotion_fixation(md, drawn, str(drawn_level), str(s['target_level']))
+        due_basics.append(due)
+        start[i] = starts[i] - first
+        drawn_at[i], _, drawn_top[i] = tables.locate(drawn_level, drawn)
+        due_at[i], _, due_top[i] = tables.locate(s['target_level'], due)
+    flat = np.array(tables.values, dtype=np.int64)
+
+    # Increments since each scenario's start month (none in the start month itself)
+    grid = np.arange(len(months))[None, :]
+    active = (grid >= start[:, None]) & (grid <= last - first)
+    steps = np.where(active, julys[None, :] - julys[start][:, None], 0)
+    drawn_basic = flat[np.minimum(drawn_at[:, None] + steps, drawn_top[:, None])]
+    due_basic = flat[np.minimum(due_at[:, None] + steps, due_top[:, None])]
+
+    # TA per month of the target level less that of the drawn level
+    ta = md.ta_table([str(drawn_level)] + [str(s['target_level']) for s in scenarios])
+    diff_ta = ta[1:][:, ta_ix] - ta[0, ta_ix][None, :]
+
+    # Same rounding as month_record (round half to even)
+    arrears = ((due_basic - drawn_basic)
+               + (np.rint(due_basic * da) - np.rint(drawn_basic * da)).astype(np.int64)
+               + (np.rint(due_basic * hra) - np.rint(drawn_basic * hra)).astype(np.int64)
+               + diff_ta)
+    totals = np.where(active, arrears, 0).sum(axis=1)
+    counts = active.sum(axis=1)
+
+    results = []
+    for i, s in enumerate(scenarios):
+        results.append({
+            "start_date": s['start_date'],
+            "target_level": str(s['target_level']),
+            "drawn_basic": int(s['drawn_basic']),
+            "due_basic": due_basics[i],
+            "months": int(counts[i]),
+            "final_drawn_basic": int(drawn_basic[i, last - first]) if counts[i] else int(s['drawn_basic']),
+            "final_due_basic": int(due_basic[i, last - first]) if counts[i] else due_basics[i],
+            "total_arrears": int(totals[i]),
+        })
+    return results
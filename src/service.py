@@ -0,0 +1,196 @@
+"""
+Local JSON HTTP service exposing the engines to other internal tools.
+
+    python -m src.service --host 127.0.0.1 --port 8765
+
+POST endpoints (JSON body -> JSON response):
+    /eligibility        {"faculty": {...}, "target_level": "12"}
+    /fixation           {"current_basic": 68900, "current_level": "11", "target_level": "12"}
+    /projection         {"start_basic": 79800, "level": "12", "start_date": "2019-07-01"}
+    /arrears            {"start_date", "end_date", "initial_drawn_basic", "initial_due_basic",
+                         "drawn_level", "target_level", "city_class"}
+    /batch/eligibility  {"faculty": [{...}, ...]}
+    /batch/evaluate     {"faculty": [{...}, ...]}  full pipeline per faculty (as in src.cli)
+GET endpoints:
+    /health             master-data version, uptime and per-endpoint latency stats
+
+Faculty objects use the profile field names (date_of_joining, entry_qualification,
+current_level, ...). Every response carries `elapsed_ms` and an X-Elapsed-Ms header.
+"""
+import argparse
+import datetime
+import json
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src import engine
+from src.database import init_db, SessionLocal
+from src.master_data import load_master_data
+
+RESULT_CACHE_SIZE = 4096
+
+class EngineService:
+    """Holds the warm master data and a result cache shared by all request threads."""
+    def __init__(self):
+        init_db()
+        db = SessionLocal()
+        try:
+            self.master = load_master_data(db)
+        finally:
+            db.close()
+        self.started = time.time()
+        self._stats_lock = threading.Lock()
+        self.stats = {}
+        # Cached engine calls; master version is part of every key
+        self._fixation = lru_cache(maxsize=RESULT_CACHE_SIZE)(self._fixation_uncached)
+        self._projection = lru_cache(maxsize=RESULT_CACHE_SIZE)(self._projection_uncached)
+
+    def record(self, endpoint, elapsed_ms):
+        with self._stats_lock:
+            s = self.stats.setdefault(endpoint, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            s['count'] += 1
+            s['total_ms'] += elapsed_ms
+            s['max_ms'] = max(s['max_ms'], elapsed_ms)
+
+    # --- Engines -------------------------------------------------------
+
+    def eligibility(self, faculty, target_level=None):
+        from src.batch import next_level
+        from src.logic_eligibility import evaluate_cas_eligibility
+        data = parse_faculty(faculty)
+        return evaluate_cas_eligibility(data, target_level or next_level(data['current_level']))
+
+    def _fixation_uncached(self, current_basic, current_level, target_level, version):
+        return engine.fixation(self.master, current_basic, current_level, target_level)
+
+    def fixation(self, current_basic, current_level, target_level):
+        return self._fixation(int(current_basic), str(current_level), str(target_level), self.master.version)
+
+    def _projection_uncached(self, start_basic, level, start_date, version, today):
+        return engine.projected_pay(self.master, start_basic, level, start_date, today)
+
+    def projection(self, start_basic, level, start_date):
+        return self._projection(int(start_basic), str(level), parse_date(start_date),
+                                self.master.version, datetime.date.today())
+
+    def arrears(self, start_date, end_date, initial_drawn_basic, initial_due_basic,
+                drawn_level, target_level, city_class):
+        ledger = engine.monthly_arrears(
+            self.master,
+            start_date=parse_date(start_date),
+            end_date=parse_date(end_date),
+            initial_drawn_basic=int(initial_drawn_basic),
+            initial_due_basic=int(initial_due_basic),
+            drawn_level=str(drawn_level),
+            target_level=str(target_level),
+            city_class=city_class
+        )
+        return {"total_arrears": ledger.total_arrears(), "months": ledger.records()}
+
+    def batch_eligibility(self, faculty):
+        return [self._safe(self.eligibility, f) for f in faculty]
+
+    def batch_evaluate(self, faculty):
+        from src.batch import evaluate_profile
+        return [self._safe(lambda f: evaluate_profile(parse_faculty(f), self.master), f)
+                for f in faculty]
+
+    @staticmethod
+    def _safe(fn, item):
+        try:
+            return fn(item)
+        except Exception as e:
+            return {"error": str(e)}
+
+ROUTES = {
+    "/eligibility": lambda svc, body: svc.eligibility(body['faculty'], body.get('target_level')),
+    "/fixation": lambda svc, body: svc.fixation(body['current_basic'], body['current_level'], body['target_level']),
+    "/projection": lambda svc, body: svc.projection(body['start_basic'], body['level'], body['start_date']),
+    "/arrears": lambda svc, body: svc.arrears(**body),
+    "/batch/eligibility": lambda svc, body: svc.batch_eligibility(body['faculty']),
+    "/batch/evaluate": lambda svc, body: svc.batch_evaluate(body['faculty']),
+}
+
+def parse_date(val):
+    return val if isinstance(val, datetime.date) else datetime.date.fromisoformat(str(val)[:10])
+
+def parse_faculty(faculty: dict) -> dict:
+    from src.profile_store import normalize_roster_row
+    return normalize_roster_row(dict(faculty))
+
+def _json_default(obj):
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return obj.isoformat()
+    if hasattr(obj, 'item'): # numpy scalars from DataFrame records
+        return obj.item()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+class EngineRequestHandler(BaseHTTPRequestHandler):
+    service = None # set by make_server
+
+    def _send(self, status, payload, elapsed_ms):
+        body = json.dumps(payload, default=_json_default).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Elapsed-Ms", f"{elapsed_ms:.2f}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        start = time.perf_counter()
+        if self.path != "/health":
+            return self._send(404, {"error": f"Unknown endpoint {self.path}"}, 0.0)
+        svc = self.service
+        with svc._stats_lock:
+            stats = {k: {"count": v['count'], "mean_ms": round(v['total_ms'] / v['count'], 2),
+                         "max_ms": round(v['max_ms'], 2)} for k, v in svc.stats.items()}
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._send(200, {"status": "ok", "master_version": svc.master.version,
+                         "uptime_s": round(time.time() - svc.started, 1), "endpoints": stats,
+                         "elapsed_ms": round(elapsed_ms, 2)}, elapsed_ms)
+
+    def do_POST(self):
+        start = time.perf_counter()
+        route = ROUTES.get(self.path)
+        if route is None:
+            return self._send(404, {"error": f"Unknown endpoint {self.path}"}, 0.0)
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            result, status = route(self.service, body), 200
+        except (KeyError, TypeError, ValueError) as e:
+            result, status = {"error": f"Bad request: {e}"}, 400
+        except Exception as e:
+            result, status = {"error": str(e)}, 500
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.service.record(self.path, elapsed_ms)
+        self._send(status, {"result": result, "elapsed_ms": round(elapsed_ms, 2)}, elapsed_ms)
+
+    def log_message(self, fmt, *args):
+        pass # latency is reported in responses and /health instead
+
+def make_server(host="127.0.0.1", port=8765):
+    handler = type("BoundEngineRequestHandler", (EngineRequestHandler,), {"service": EngineService()})
+    return ThreadingHTTPServer((host, port), handler)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.service", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port)
+    print(f"CAS engine service on http://{args.host}:{args.port} (master data {server.RequestHandlerClass.service.master.version})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Seeded synthetic faculty roster for load and scale testing.
+
+Profiles use the faculty_data field names (like the bulk importer), with
+careers that are consistent with the pay matrix: promotion dates follow
+the CAS residency rules, and current_basic is a real cell of current_level
+advanced by the July increments since the last promotion.
+
+    python -m src.synthetic 100000 --seed 7 --insert          # bulk insert into cas_app.db
+    python -m src.synthetic 100000 --seed 7 --out roster.csv  # or .parquet
+"""
+import argparse
+import importlib.util
+import datetime
+import random
+import sys
+import time
+from src.months import julys_between
+
+INSTITUTE_TYPES = [("Government", 0.45), ("Aided-BoG", 0.35), ("Unaided", 0.20)]
+CITY_CLASSES = [("X (Metro)", 0.30), ("Y (Urban)", 0.40), ("Z (Rural)", 0.30)]
+ENTRY_QUALIFICATIONS = [("M.E./M.Tech", 0.55), ("Ph.D.", 0.15), ("B.E./B.Tech", 0.20), ("M.Phil", 0.10)]
+FIRST_DOJ = datetime.date(1990, 1, 1)
+LAST_DOJ = datetime.date(2026, 6, 30)
+NAME_PREFIX = "Synthetic"
+
+def _pick(rng, weighted):
+    r = rng.random()
+    for value, weight in weighted:
+        r -= weight
+        if r < 0:
+            return value
+    return weighted[-1][0]
+
+def _random_date(rng, lo, hi):
+    return lo + datetime.timedelta(days=rng.randint(0, max((hi - lo).days, 0)))
+
+def _first_july_after(d):
+    july = datetime.date(d.year, 7, 1)
+    return july if july > d else datetime.date(d.year + 1, 7, 1)
+
+def _basic_after_increments(master, level, increments):
+    cells = master.pay_matrix.get(level) or [(1, 57700)]
+    return cells[min(increments, len(cells) - 1)][1]
+
+def synthetic_profile(rng, i, master, today):
+    """One faculty_data dict; `i` only feeds the (unique) name."""
+    # Both joining dates on or before `today` (an early --as-of included)
+    initial_doj = min(_random_date(rng, FIRST_DOJ, min(LAST_DOJ, today)), today)
+    # Most faculty are still at their first institute
+    if rng.random() < 0.7:
+        doj = initial_doj
+    else:
+        doj = _random_date(rng, initial_doj, min(initial_doj + datetime.timedelta(days=15 * 365), LAST_DOJ))
+    doj = min(doj, today)
+
+    entry_qual = _pick(rng, ENTRY_QUALIFICATIONS)
+    phd_date = None
+    if entry_qual == "Ph.D.":
+        phd_date = initial_doj - datetime.timedelta(days=rng.randint(30, 1500))
+    elif rng.random() < 0.45:
+        phd_date = _random_date(rng, initial_doj, initial_doj + datetime.timedelta(days=12 * 365))
+    mtech_date = None
+    if entry_qual == "B.E./B.Tech" and rng.random() < 0.3:
+        mtech_date = _random_date(rng, initial_doj, initial_doj + datetime.timedelta(days=6 * 365))
+
+    # Career: CAS residency per level, promotions effective on July 1st
+    years_to_11 = 4 if entry_qual == "Ph.D." else (5 if entry_qual in ["M.E./M.Tech", "M.Phil"] else 6)
+    level, since = "10", initial_doj
+    promo_11 = promo_12 = None
+    due_11 = _first_july_after(initial_doj.replace(year=initial_doj.year + years_to_11, day=1))
+    if due_11 <= today and rng.random() < 0.85:
+        promo_11 = due_11
+        level, since = "11", due_11
+        due_12 = datetime.date(due_11.year + 5, 7, 1)
+        if due_12 <= today and rng.random() < 0.8:
+            promo_12 = due_12
+            level, since = "12", due_12
+            due_13 = datetime.date(due_12.year + 3, 7, 1)
+            if due_13 <= today and phd_date and phd_date <= due_13 and rng.random() < 0.6:
+                level, since = "13A1", due_13
+
+    current_basic = _basic_after_increments(master, level, julys_between(since, today))
+    past_years = (doj - initial_doj).days // 365
+
+    return {
+        "name": f"{NAME_PREFIX} {i:07d}",
+        "institute_type": _pick(rng, INSTITUTE_TYPES),
+        "city_class": _pick(rng, CITY_CLASSES),
+        "date_of_joining": doj,
+        "initial_doj": initial_doj,
+        "entry_qualification": entry_qual,
+        "acquired_mtech_date": mtech_date,
+        "acquired_phd_date": phd_date,
+        "promoted_level_11_date": promo_11,
+        "promoted_level_12_date": promo_12,
+        "current_level": level,
+        "current_basic": current_basic,
+        "past_service_years": past_years,
+        "has_prior_service": past_years > 0,
+        "past_service_approved": past_years > 0 and rng.random() < 0.8,
+        # Some careers are recorded without their CAS history (backlog cases)
+        "has_past_promotions": promo_11 is not None and rng.random() < 0.75,
+    }
+
+def generate_profiles(n, seed=0, master=None, today=None, start=0):
+    """
+    Yields n synthetic faculty_data dicts. The same (n, seed, start, today)
+    always gives the same roster; `start` offsets the names so rosters can
+    be generated in slices. Careers are simulated up to `today`.
+    """
+    if master is None:
+        from src.master_data import get_master_data
+        master = get_master_data()
+    today = today or datetime.date.today()
+    rng = random.Random(f"{seed}:{start}")
+    for i in range(start, start + n):
+        yield synthetic_profile(rng, i, master, today)
+
+def generate_dataframe(n, seed=0, master=None, today=None):
+    """Synthetic roster as a DataFrame (columns named like the roster import)."""
+    import pandas as pd
+    return pd.DataFrame(list(generate_profiles(n, seed, master, today)))
+
+def insert_profiles(n, seed=0, batch_size=None, master=None, today=None):
+    """
+    Bulk inserts n synthetic profiles through the roster importer's batch
+    writer (re-running with the same seed updates the same rows).
+    Returns counts and throughput like import_roster.
+    """
+    from src.database import engine
+    from src.profile_store import IMPORT_BATCH_SIZE, write_batch
+
+    batch_size = batch_size or IMPORT_BATCH_SIZE
+    start = time.perf_counter()
+    inserted = updated = 0
+    batch = []
+
+    def flush():
+        nonlocal inserted, updated
+        with engine.begin() as conn:
+            ins, upd = write_batch(conn, batch)
+        inserted += ins
+        updated += upd
+        batch.clear()
+
+    for data in generate_profiles(n, seed, master, today):
+        batch.append(data)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": n,
+        "inserted": inserted,
+        "updated": updated,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(n / elapsed) if elapsed > 0 else n,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.synthetic", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("count", type=int, help="number of profiles")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--as-of", type=datetime.date.fromisoformat, default=None,
+                        help="simulate careers up to this date (default: today)")
+    parser.add_argument("--insert", action="store_true", help="bulk insert into the profile tables")
+    parser.add_argument("--out", help="write a roster file (.csv or .parquet)")
+    args = parser.parse_args(argv)
+    if not args.insert and not args.out:
+        parser.error("nothing to do: pass --insert and/or --out")
+    if args.out and args.out.endswith(".parquet") and importlib.util.find_spec("pyarrow") is None:
+        parser.error("a .parquet roster needs pyarrow, which is not installed (pip install pyarrow)")
+
+    from src.database import init_db
+    init_db()
+
+    if args.out:
+        df = generate_dataframe(args.count, args.seed, today=args.as_of)
+        if args.out.endswith(".parquet"):
+            df.to_parquet(args.out, index=False)
+        else:
+            df.to_csv(args.out, index=False)
+        print(f"{len(df):,} profiles -> {args.out}")
+    if args.insert:
+        stats = insert_profiles(args.count, args.seed, today=args.as_of)
+        print(f"{stats['rows']:,} profiles ({stats['inserted']} new, {stats['updated']} updated) "
+              f"in {stats['seconds']}s -> {stats['rows_per_sec']:,} rows/s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Lightweight nested timing spans with Chrome trace export.
+
+Spans are only recorded while a trace is active in the current
+thread/context; otherwise `span()` returns a shared no-op object and
+`@traced` costs one context-variable lookup per call.
+
+    from src import tracing
+    with tracing.tracing() as trace:
+        with tracing.span("arrears", months=120):
+            ...
+    trace.save("trace.json")   # open in chrome://tracing or ui.perfetto.dev
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_active = contextvars.ContextVar("tracing_active", default=None)
+
+class Trace:
+    """Collected spans as Chrome trace "complete" (ph=X) events."""
+    def __init__(self, origin_ns=None):
+        # Worker processes pass the parent's origin so timestamps line up
+        self.events = []
+        self.origin_ns = origin_ns if origin_ns is not None else time.perf_counter_ns()
+
+    def to_chrome(self) -> dict:
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def dumps(self) -> str:
+        return json.dumps(self.to_chrome(), default=str)
+
+    def save(self, path):
+        with open(path, "w") as f:
+            f.write(self.dumps())
+
+    def extend(self, events):
+        """Adds events recorded elsewhere (e.g. by worker processes)."""
+        self.events.extend(events)
+
+    def summary(self) -> list:
+        """Total ms and count per span name, slowest first."""
+        totals = {}
+        for e in self.events:
+            t = totals.setdefault(e['name'], [0, 0.0])
+            t[0] += 1
+            t[1] += e['dur'] / 1000.0
+        return [{"span": name, "count": c, "total_ms": round(ms, 3)}
+                for name, (c, ms) in sorted(totals.items(), key=lambda kv: -kv[1][1])]
+
+class _Span:
+    __slots__ = ("trace", "name", "args", "start")
+
+    def __init__(self, trace, name, args):
+        self.trace = trace
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        event = {
+            "name": self.name, "cat": "cas", "ph": "X",
+            "ts": (self.start - self.trace.origin_ns) / 1000.0,
+            "dur": (end - self.start) / 1000.0,
+            "pid": os.getpid(), "tid": threading.get_ident(),
+        }
+        if self.args or exc_type:
+            event["args"] = dict(self.args, error=exc_type.__name__) if exc_type else self.args
+        self.trace.events.append(event)
+        return False
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP = _NoopSpan()
+
+def span(name, **args):
+    """Times the enclosed block as one span of the active trace (no-op without one)."""
+    trace = _active.get()
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name, args)
+
+def traced(name=None):
+    """Decorator: every call of the function is a span named `name` (default: qualified name)."""
+    def decorate(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            trace = _active.get()
+            if trace is None:
+                return fn(*a, **kw)
+            with _Span(trace, label, {}):
+                return fn(*a, **kw)
+        return wrapper
+    return decorate
+
+def start() -> Trace:
+    """Starts a new trace for the rest of the current context (e.g. one dashboard run)."""
+    trace = Trace()
+    _active.set(trace)
+    return trace
+
+@contextmanager
+def tracing(trace=None):
+    """Records spans into `trace` (or a new Trace) for the duration of the block."""
+    trace = trace or Trace()
+    token = _active.set(trace)
+    try:
+        yield trace
+    finally:
+        _active.reset(token)
+
+def active():
+    return _active.get()
@@ -0,0 +1,24 @@
+import os
+import shutil
+import sys
+import tempfile
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# A scratch database for the whole session, set before src.database is first imported
+DB_DIR = tempfile.mkdtemp(prefix="cas-tests-")
+os.environ["CAS_DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'cas_app.db')}"
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(DB_DIR, ignore_errors=True)
+
+@pytest.fixture(scope="session")
+def master():
+    """MasterData seeded from data/*.csv into the scratch database (seed_data reads data/ from the cwd)."""
+    os.chdir(ROOT)
+    from src.database import init_db
+    from src.master_data import get_master_data
+    init_db()
+    return get_master_data(refresh=True)
@@ -0,0 +1,112 @@
+"""
+Regenerates tests/data/engine_regression.json: inputs and the outputs of
+the pre-refactor logic_* functions (before src/engine.py existed), which
+test_engine_regression.py pins the engines against.
+
+Usage (from the repo root, so cas_app.db resolves):
+    git worktree add /tmp/pre-engine 8289fdd
+    python tests/gen_engine_regression.py /tmp/pre-engine
+
+The old functions run "up to today"; today is pinned to AS_OF. On DA table
+dates with two rows the old pandas sort picked either row, so the old
+arrears get the DA table with only the row the engines use (the last one
+in (date, pay commission) order). Careers start in 2016 or later: earlier
+ones run on the 5th / 6th CPC scales now, on purpose.
+"""
+import datetime
+import json
+import os
+import random
+import sys
+
+AS_OF = datetime.date(2026, 10, 19)
+SEED = 36
+OUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "engine_regression.json")
+QUALS = ["Ph.D.", "M.Phil", "M.E./M.Tech", "NET/SET", ""]
+
+class PinnedDate(datetime.date):
+    @classmethod
+    def today(cls):
+        return AS_OF
+
+def _json(obj):
+    if isinstance(obj, datetime.date):
+        return obj.isoformat()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    raise TypeError(type(obj).__name__)
+
+def _date(rng, lo, hi):
+    return lo + datetime.timedelta(days=rng.randint(0, (hi - lo).days))
+
+def main(old_tree):
+    sys.path.insert(0, os.path.abspath(old_tree))
+    import types
+    import pandas as pd
+    from src import logic_fixation, logic_continuum, logic_cumulative, logic_arrears
+    from src.database import SessionLocal, MasterPayMatrix, MasterDARates
+
+    logic_fixation.date = PinnedDate
+    logic_cumulative.datetime = types.SimpleNamespace(date=PinnedDate, timedelta=datetime.timedelta)
+
+    rng = random.Random(SEED)
+    db = SessionLocal()
+    try:
+        matrix = {}
+        for r in db.query(MasterPayMatrix).order_by(MasterPayMatrix.pay_level, MasterPayMatrix.cell_number):
+            matrix.setdefault(r.pay_level, []).append(r.basic_pay)
+        levels = ["10", "11", "12", "13A1", "14", "15"]
+        da_rows = sorted(((r.effective_date, r.pay_commission or 0, r.da_rate) for r in db.query(MasterDARates)),
+                         key=lambda r: (r[0], r[1]))
+        last = {d: rate for d, _, rate in da_rows}
+        da_df = pd.DataFrame({"effective_date": list(last), "da_rate": list(last.values())})
+
+        cases = {"fixation": [], "projected_pay": [], "historical_basic": [], "continuum": [],
+                 "cumulative": [], "arrears": []}
+        for _ in range(150):
+            lvl = rng.choice(levels[:-1])
+            basic = rng.choice(matrix[lvl])
+            target = levels[levels.index(lvl) + 1]
+            cases["fixation"].append({"args": [basic, lvl, target],
+                                      "expected": logic_fixation.calculate_fixation(basic, lvl, target, db)})
+        for _ in range(100):
+            lvl = rng.choice(levels)
+            basic = rng.choice(matrix[lvl])
+            start = _date(rng, datetime.date(2016, 1, 1), AS_OF)
+            cases["projected_pay"].append({"args": [basic, lvl, start],
+                                           "expected": logic_fixation.calculate_projected_pay(basic, lvl, start, db)})
+            years = rng.randint(0, 12)
+            cases["historical_basic"].append({"args": [basic, lvl, years],
+                                              "expected": logic_fixation.calculate_historical_basic(basic, lvl, years, db)})
+        for _ in range(100):
+            first = _date(rng, datetime.date(2016, 1, 1), datetime.date(2024, 12, 31))
+            joined = _date(rng, first, AS_OF)
+            qual = rng.choice(QUALS)
+            cases["continuum"].append({"args": [first, joined, qual],
+                                       "expected": logic_continuum.calculate_pay_at_current_joining(first, joined, qual, db)})
+            phd = rng.choice([None, _date(rng, first, AS_OF)])
+            data = {"initial_doj": first, "entry_qualification": qual, "acquired_phd_date": phd}
+            cases["cumulative"].append({"args": [data],
+                                        "expected": list(logic_cumulative.evaluate_cumulative_promotions(data, db))})
+        for _ in range(30):
+            lvl = rng.choice(levels[:-1])
+            target = levels[levels.index(lvl) + 1]
+            drawn = rng.choice(matrix[lvl])
+            due = logic_fixation.calculate_fixation(drawn, lvl, target, db)['new_basic']
+            start = _date(rng, datetime.date(2016, 1, 1), datetime.date(2025, 12, 31)).replace(day=1)
+            end = _date(rng, start, AS_OF)
+            city = rng.choice(["X (Metro)", "Y (Urban)", "Z (Rural)"])
+            df = logic_arrears.calculate_monthly_arrears(start, end, drawn, due, lvl, target, city, da_df, 0)
+            months = [[row['Diff Basic'], row['Diff DA'], row['Diff HRA'], row['Total Arrears']]
+                      for row in df.to_dict('records')]
+            cases["arrears"].append({"args": [start, end, drawn, due, lvl, target, city], "expected": months})
+    finally:
+        db.close()
+
+    os.makedirs(os.path.dirname(OUT), exist_ok=True)
+    with open(OUT, "w") as f:
+        json.dump({"as_of": AS_OF, "cases": cases}, f, default=_json, separators=(",", ":"))
+    print(f"{sum(len(v) for v in cases.values())} cases -> {OUT}")
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -0,0 +1,64 @@
+import datetime
+import pytest
+from src import engine
+from src.batch import backlog_ledger, evaluate_profile
+
+END = datetime.date(2024, 3, 31)
+
+def _event(src, dst, due, fixed):
+    return {"Promotion": f"Level {src} -> {dst}", "Due Date": due, "Fixed Basic": fixed}
+
+def test_event_into_held_level_owes_nothing(master):
+    # Already drawing Level 11: a simulated 10 -> 11 promotion is not a backlog
+    events = [_event("10", "11", datetime.date(2020, 7, 1), 68900)]
+    ledger = engine.backlog_arrears(master, events, END, 68900, "11", "Y (Urban)")
+    assert len(ledger) == 0
+    assert ledger.total_arrears() == 0
+
+def test_ledger_starts_at_first_pending_event(master):
+    events = [_event("10", "11", datetime.date(2016, 7, 1), 68900),
+              _event("11", "12", datetime.date(2021, 7, 1), 79800)]
+    ledger = engine.backlog_arrears(master, events, END, 77600, "11", "Y (Urban)")
+    assert ledger.month_dates()[0] == datetime.date(2021, 7, 1)
+    single = engine.monthly_arrears(master, datetime.date(2021, 7, 1), END, 77600,
+                                    engine.promotion_fixation(master, 77600, "11", "12"),
+                                    "11", "12", "Y (Urban)")
+    assert ledger.total_arrears() == single.total_arrears()
+
+def test_backlog_ledger_skips_given_promotions(master):
+    data = {"current_level": "11", "current_basic": 71000, "city_class": "Y (Urban)"}
+    events = [_event("10", "11", datetime.date(2020, 7, 1), 68900)]
+    assert backlog_ledger(data, master, events, END).total_arrears() == 0
+
+PRE_2016 = [_event("10", "11", datetime.date(2007, 7, 1), 68900),
+            _event("11", "12", datetime.date(2012, 7, 1), 82200)]
+
+def test_pre_2016_events_start_at_7th_cpc(master):
+    # Months before 2016 are 5th / 6th CPC pay and DA; both promotions take effect in Jan-2016
+    ledger = engine.backlog_arrears(master, PRE_2016, END, 61200, "10", "X (Metro)")
+    assert ledger.month_dates()[0] == datetime.date(2016, 1, 1)
+    due = engine.promotion_fixation(master, engine.promotion_fixation(master, 61200, "10", "11"), "11", "12")
+    single = engine.monthly_arrears(master, datetime.date(2016, 1, 1), END, 61200, due, "10", "12", "X (Metro)")
+    assert ledger.due_basic.tolist() == single.due_basic.tolist()
+    assert ledger.total_arrears() == single.total_arrears()
+
+def test_backlog_ledger_rolls_back_to_end_date(master):
+    # 8 Julys from Jan-2016 to Mar-2024: the last month draws the current basic
+    data = {"current_level": "10", "current_basic": 73000, "city_class": "X (Metro)"}
+    ledger = backlog_ledger(data, master, PRE_2016, END)
+    assert ledger.drawn_basic[0] == 57700
+    assert ledger.drawn_basic[-1] == 73000
+
+@pytest.mark.parametrize("basic, message", [(77600, "not a Level 10"), (70900, "too low")])
+def test_backlog_ledger_rejects_unknown_drawn_pay(master, basic, message):
+    data = {"current_level": "10", "current_basic": basic, "city_class": "X (Metro)"}
+    with pytest.raises(ValueError, match=message):
+        backlog_ledger(data, master, PRE_2016, END)
+
+def test_evaluate_profile_reports_backlog_error(master):
+    data = {"name": "Faculty A", "initial_doj": datetime.date(2003, 1, 1), "date_of_joining": datetime.date(2003, 1, 1),
+            "entry_qualification": "Ph.D.", "current_level": "10", "current_basic": 77600,
+            "city_class": "X (Metro)", "has_past_promotions": False, "past_service_years": 0}
+    row = evaluate_profile(data, master, end_date=END)
+    assert row['backlog_promotions'] > 0
+    assert "not a Level 10" in row['backlog_error'] and "backlog_arrears" not in row
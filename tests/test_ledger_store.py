@@ -0,0 +1,46 @@
+import datetime
+import logging
+import types
+import pytest
+from sqlalchemy import create_engine, select
+from src.database import ArrearsStatement, ArrearsLedgerMonth
+from src import engine, ledger_store
+
+def test_stored_da_rate_is_the_rate_the_ledger_was_priced_at(master):
+    # 58% truncates to 57 in the display column; the store must keep 58
+    da_rates = [(datetime.date(2016, 1, 1), 58.0)]
+    ledger = engine.monthly_arrears(master, datetime.date(2020, 1, 1), datetime.date(2020, 12, 31),
+                                    master.pay_options("11")[0], master.pay_options("12")[0],
+                                    "11", "12", "X (Metro)", da_rates=da_rates)
+    assert ledger.da_rate.tolist() == [57] * 12
+    led = {"ledger": ledger, "start_date": datetime.date(2020, 1, 1), "end_date": datetime.date(2020, 12, 31),
+           "drawn_level": "11", "target_level": "12"}
+
+    db = create_engine("sqlite://")
+    ArrearsStatement.__table__.create(db)
+    ArrearsLedgerMonth.__table__.create(db)
+    with db.begin() as conn:
+        assert ledger_store._write_ledgers(conn, [(1, "X (Metro)", {"single": led})], master,
+                                           datetime.datetime.now()) == 12
+        rates = conn.execute(select(ArrearsLedgerMonth.__table__.c.da_rate)).scalars().all()
+    assert rates == [58.0] * 12
+
+def test_posting_history_is_not_stored(master):
+    postings = [(datetime.date(2016, 1, 1), "X (Metro)"), (datetime.date(2020, 7, 1), "Z (Rural)")]
+    with pytest.raises(ValueError, match="posting history"):
+        ledger_store._write_ledgers(None, [(1, postings, {})], master, datetime.datetime.now())
+
+def test_rebuild_logs_failed_profiles(master, monkeypatch, caplog):
+    import src.batch
+    import src.pay_ledger
+
+    def fail(*args, **kwargs):
+        raise ValueError("no matrix cell")
+
+    user = types.SimpleNamespace(id=7, name="Faculty X")
+    monkeypatch.setattr(src.pay_ledger, "iter_profiles_with_ledgers", lambda *a: iter([(user, {}, None)]))
+    monkeypatch.setattr(src.batch, "evaluate_profile", fail)
+    with caplog.at_level(logging.ERROR, logger="cas.ledgers"):
+        stats = ledger_store.rebuild_ledgers()
+    assert stats['errors'] == 1 and stats['profiles'] == 0
+    assert "profile 7" in caplog.text and "no matrix cell" in caplog.text
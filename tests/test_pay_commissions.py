@@ -0,0 +1,73 @@
+import datetime
+import types
+from src import engine
+from src.months import month_index
+from src.pay_commissions import CAS_LEVELS, PayCommissions
+
+def test_commission_periods(master):
+    pcs = master.pay_commissions()
+    on = lambda d: pcs.commission_on(month_index(d))
+    assert [on(datetime.date(2005, 12, 1)), on(datetime.date(2006, 1, 1)),
+            on(datetime.date(2015, 12, 1)), on(datetime.date(2016, 1, 1))] == [5, 6, 6, 7]
+    assert pcs.start_month(7) == month_index(datetime.date(2016, 1, 1))
+
+def test_cas_stages_follow_cas_scales_row_order(master):
+    pcs = master.pay_commissions()
+    rows = {pc: [r for r in master.cas_scales if r[0] == pc] for pc in (5, 6)}
+    for n, level in enumerate(CAS_LEVELS):
+        assert pcs.stages_5th[level][0] == rows[5][n][3]
+        assert pcs.bands_6th[level][3] == rows[6][n][4]
+    # 4th rows: Assistant Professor 12000-420-18300 and Associate Professor, AGP 9000
+    assert pcs.stages_5th["13A1"][:2] == [12000, 12420] and pcs.stages_5th["13A1"][-1] == 18300
+    assert pcs.bands_6th["13A1"][3:] == (9000, 40200)
+
+def test_reordered_cas_scales_remap_the_stages(master):
+    fives = [r for r in master.cas_scales if r[0] == 5]
+    sixes = [r for r in master.cas_scales if r[0] == 6]
+    md = types.SimpleNamespace(pay_scales_5th=master.pay_scales_5th, pay_bands_6th=master.pay_bands_6th,
+                               da_rates=master.da_rates, cas_scales=[fives[1], fives[0]] + fives[2:] + sixes)
+    pcs = PayCommissions(md)
+    assert pcs.entry_pay(5, "10") == 10000 and pcs.entry_pay(5, "11") == 8000
+
+def test_steps(master):
+    pcs = master.pay_commissions()
+    assert pcs.entry_pay(5, "10") == 8000
+    assert pcs.entry_pay(6, "10") == 15600
+    assert pcs.increment(5, "10", 8000) == 8275
+    assert pcs.increment(5, "10", 8100) == 8275 # off-scale: from the stage below
+    assert pcs.increment(5, "10", 13500) == 13500 # top of the scale
+    assert pcs.increment(6, "10", 17950) == 18670 # 3% of 23950, rounded up to 10
+    assert pcs.increment(6, "10", 39000) == 39100 # band maximum
+    assert pcs.promote(5, "10", "11", 9650) == 10000
+    assert pcs.promote(6, "10", "11", 18670) == 19420
+
+def test_revision_5th_to_6th_to_7th(master):
+    pcs = master.pay_commissions()
+    # 9650 x 1.86 = 17949 -> 17950; (17950 + 6000) x 2.67 = 63946.5 -> next Level 10 cell
+    assert pcs.revise(5, "10", 9650) == 17950
+    assert pcs.revise(6, "10", 17950) == 64900
+    assert engine._revise_to(pcs, 5, 7, "10", 9650) == (7, 64900)
+    assert pcs.to_7th(5, "10", 9650) == 64900
+    # Below the 6th CPC entry pay: fixed at the entry pay
+    assert pcs.revise(5, "10", 8000) == 15600
+
+def test_career_across_both_revisions(master):
+    pc_6 = engine.pay_at_current_joining(master, datetime.date(2004, 7, 1), datetime.date(2006, 6, 1), "Ph.D.")
+    # 8000, increment to 8275 in July 2005, revised to the 15600 entry pay in 2006
+    assert pc_6['Pay_Commission'] == 6
+    assert pc_6['Joining_Pay'].startswith("₹15,600 + AGP ₹6,000")
+    assert pc_6['Joining_Basic'] == 57700
+
+    before = engine.pay_at_current_joining(master, datetime.date(2004, 7, 1), datetime.date(2015, 12, 1), "Ph.D.")
+    after = engine.pay_at_current_joining(master, datetime.date(2004, 7, 1), datetime.date(2016, 1, 1), "Ph.D.")
+    assert (before['Pay_Commission'], after['Pay_Commission']) == (6, 7)
+    assert after['Joining_Basic'] == before['Joining_Basic'] # the concordance is the 2016 fixation
+    assert after['Joining_Basic'] in master.pay_options(after['Joining_Level'])
+
+def test_pre_2016_events_are_matrix_basics(master):
+    data = {"initial_doj": datetime.date(2003, 1, 1), "entry_qualification": "Ph.D.", "acquired_phd_date": None}
+    events, _, _ = engine.cumulative_promotions(master, data, datetime.date(2024, 3, 31))
+    assert events[0]['Due Date'] < datetime.date(2016, 1, 1)
+    for e in events:
+        assert e['Fixed Basic'] in master.pay_options(engine.event_target_level(e))
+    assert engine.backlog_start(master, events) == datetime.date(2016, 1, 1)
@@ -0,0 +1,68 @@
+import datetime
+import pytest
+from src import engine
+from src.database import SessionLocal, UserProfile
+from src.profile_store import normalize_roster_row, upsert_profile, profile_to_dict
+from src import pay_ledger
+
+TODAY = datetime.date(2026, 10, 19)
+
+# A pre-2016 career (5th / 6th CPC steps), a recent one, one with a late Ph.D.
+PROFILES = [
+    {"name": "Ledger A", "date_of_joining": "2003-01-01", "entry_qualification": "Ph.D."},
+    {"name": "Ledger B", "date_of_joining": "2016-03-15", "entry_qualification": "M.E./M.Tech"},
+    {"name": "Ledger C", "date_of_joining": "2009-09-01", "entry_qualification": "NET/SET",
+     "acquired_phd_date": "2021-02-01"},
+]
+
+END_DATES = [datetime.date(y, m, d) for y in range(2003, 2027) for m, d in ((1, 1), (6, 30), (7, 1), (11, 15))]
+
+@pytest.fixture(scope="module")
+def stored(master):
+    """{user_id: faculty_data} saved with their pay ledgers, read back through the ORM."""
+    db = SessionLocal()
+    try:
+        ids = [upsert_profile(db, normalize_roster_row(raw)) for raw in PROFILES]
+        out = {uid: profile_to_dict(db.get(UserProfile, uid)) for uid in ids}
+    finally:
+        db.close()
+    for uid, data in out.items():
+        assert pay_ledger.refresh_pay_ledger(uid, data, master, TODAY)
+    return out
+
+def test_blob_round_trip(master, stored):
+    loaded = pay_ledger.load_pay_ledgers(list(stored), master, TODAY)
+    for uid, data in stored.items():
+        built = pay_ledger.build_ledger(master, data, pay_ledger.default_as_of(TODAY))
+        led = loaded[uid]
+        assert (led.start, led.as_of, led.events) == (built.start, built.as_of, built.events)
+        for k in pay_ledger.DTYPES:
+            assert getattr(led, k).tolist() == getattr(built, k).tolist()
+
+def test_stored_cumulative_matches_simulation(master, stored):
+    declined = compared = 0
+    for uid, data in stored.items():
+        for end in END_DATES:
+            got = pay_ledger.stored_cumulative(uid, data, master, end)
+            if got is None:
+                declined += 1
+                continue
+            compared += 1
+            assert got == engine.cumulative_promotions(master, data, end), (data["name"], end)
+    # End dates between a backdated July 1st and the step that found the promotion
+    assert declined and compared > 2 * len(END_DATES)
+
+def test_stored_cumulative_declines_changed_inputs(master, stored):
+    uid, data = next(iter(stored.items()))
+    changed = dict(data, acquired_phd_date=datetime.date(2010, 1, 1), entry_qualification="M.Phil")
+    assert pay_ledger.stored_cumulative(uid, changed, master, TODAY) is None
+
+def test_at_reads_the_simulated_month(master, stored):
+    uid, data = next(iter(stored.items()))
+    led = pay_ledger.load_pay_ledgers([uid], master, TODAY)[uid]
+    steps = []
+    engine.cumulative_promotions(master, data, datetime.date(2024, 3, 1), steps=steps)
+    level, basic = steps[-1][2:]
+    assert led.at(datetime.date(2024, 3, 1))['level'] == level
+    assert led.at(datetime.date(2024, 3, 1))['basic'] == basic
+    assert led.at(datetime.date(2024, 3, 1))['da_rate'] == master.da_rate_on(datetime.date(2024, 3, 1))
@@ -0,0 +1,32 @@
+import io
+import pytest
+from src.profile_store import normalize_roster_row, iter_roster, profile_row
+
+ROSTER = b"""name,date_of_joining,city_class,current_level,current_basic,institute_type
+Faculty A,2018-07-01,,11,71000,
+,2019-01-01,X (Metro),10,57700,Government
+Faculty B,,Y (Urban),10,57700,Government
+Faculty C,2017-01-01,Y (Urban),10,abc,Government
+"""
+
+def test_blank_cells_take_defaults():
+    data = normalize_roster_row({"name": "Faculty A", "date_of_joining": "2018-07-01",
+                                 "city_class": "", "institute_type": " "})
+    assert data['city_class'] == "Z (Rural)"
+    assert data['institute_type'] == "Government"
+    assert profile_row(data)['city_class'] == "Z"
+
+@pytest.mark.parametrize("raw", [{"name": "", "date_of_joining": "2018-07-01"}, {"name": "Faculty B"}])
+def test_missing_required_fields(raw):
+    with pytest.raises(ValueError):
+        normalize_roster_row(raw)
+
+def test_bad_rows_collected_per_row():
+    errors = []
+    rows = list(iter_roster(io.BytesIO(ROSTER), "roster.csv", errors=errors))
+    assert [r['name'] for r in rows] == ["Faculty A"]
+    assert [e['row'] for e in errors] == [3, 4, 5]
+
+def test_bad_row_raises_without_error_list():
+    with pytest.raises(ValueError, match="Row 3"):
+        list(iter_roster(io.BytesIO(ROSTER), "roster.csv"))
@@ -0,0 +1,100 @@
+import streamlit as st
+from src.database import init_db, SessionLocal
+from src.master_data import load_master_data
+from src import querystats
+
+# -------------------------------------------------------------------
+# MASTER DATA (one copy per server process)
+# -------------------------------------------------------------------
+
+@st.cache_resource
+def ensure_db():
+    """Creates/migrates/seeds the database once per process instead of on every rerun."""
+    init_db()
+    return True
+
+@st.cache_resource
+def get_master_data():
+    ensure_db()
+    with querystats.track("master data"):
+        db = SessionLocal()
+        try:
+            return load_master_data(db)
+        finally:
+            db.close()
+
+def master_version() -> str:
+    return get_master_data().version
+
+def refresh_master_data():
+    """Drops the cached master data; dependent st.cache_data entries miss on the new version."""
+    get_master_data.clear()
+    from src.master_data import get_master_data as process_master_data
+    process_master_data(refresh=True)
+
+def pay_options(level) -> list:
+    return get_master_data().pay_options(level)
+
+# -------------------------------------------------------------------
+# ENGINE CALLS
+# Each wrapper calls the pure engine (src/engine.py) on the cached master
+# data, so no DB session is opened. Each takes only hashable plain inputs
+# plus the master-data version, so a rerun with unchanged inputs is a cache
+# hit. Engines that run "up to today" also take today's date as part of the key.
+# -------------------------------------------------------------------
+
+@st.cache_data(show_spinner=False)
+def continuum(initial_doj, current_doj, entry_qual, version):
+    from src.engine import pay_at_current_joining
+    with querystats.track("continuum"):
+        return pay_at_current_joining(get_master_data(), initial_doj, current_doj, entry_qual)
+
+@st.cache_data(show_spinner=False)
+def eligibility(faculty_data: dict, target_level: str):
+    from src.logic_eligibility import evaluate_cas_eligibility
+    return evaluate_cas_eligibility(faculty_data, target_level)
+
+@st.cache_data(show_spinner=False)
+def fixation(current_basic, current_level, target_level, version):
+    from src.engine import fixation
+    with querystats.track("fixation"):
+        return fixation(get_master_data(), current_basic, current_level, target_level)
+
+@st.cache_data(show_spinner=False)
+def projection(start_basic, level, start_date, version, today):
+    from src.engine import projected_pay
+    with querystats.track("projection"):
+        return projected_pay(get_master_data(), start_basic, level, start_date, today)
+
+@st.cache_data(show_spinner=False)
+def cumulative(faculty_data: dict, version, today, profile_id=None):
+    """From the saved profile's stored pay ledger when it can answer, else simulated."""
+    from src.engine import cumulative_promotions
+    with querystats.track("cumulative"):
+        if profile_id is not None:
+            from src.pay_ledger import stored_cumulative
+            stored = stored_cumulative(profile_id, faculty_data, get_master_data(), today)
+            if stored is not None:
+                return stored
+        return cumulative_promotions(get_master_data(), faculty_data, today)
+
+@st.cache_data(show_spinner=False)
+def historical_basic(current_basic, level, years_back, version):
+    from src.engine import historical_basic
+    with querystats.track("historical basic"):
+        return historical_basic(get_master_data(), current_basic, level, years_back)
+
+@st.cache_data(show_spinner=False)
+def backlog_arrears(faculty_data: dict, version, today, profile_id=None):
+    from src.batch import backlog_ledger
+    events, _, _ = cumulative(faculty_data, version, today, profile_id)
+    return backlog_ledger(faculty_data, get_master_data(), events, today)
+
+@st.cache_data(show_spinner=False)
+def arrears_sweep(start_dates: tuple, target_levels: tuple, drawn_level, current_basic, city_class,
+                  end_date, version, today):
+    from src.scenarios import scenario_grid, arrears_sweep
+    master = get_master_data()
+    with querystats.track("what-if sweep", scenarios=len(start_dates) * len(target_levels)):
+        scenarios = scenario_grid(master, start_dates, target_levels, drawn_level, current_basic, today)
+        return arrears_sweep(master, scenarios, end_date, drawn_level, city_class)
@@ -0,0 +1,32 @@
+import streamlit as st
+
+def show(query_log: list, trace=None):
+    """
+    Sidebar debug panel (open the app with ?debug=1): SQL queries of this
+    run, grouped by the computation that issued them (see src/querystats.py),
+    and the run's timing spans (see src/tracing.py).
+    """
+    if trace is not None:
+        show_trace(trace)
+    with st.sidebar.expander("🐞 SQL Queries (this run)", expanded=True):
+        if not query_log:
+            st.caption("No tracked queries on this run (cached results issue none).")
+            return
+        # Nested scopes include their inner scopes' queries, so total the outermost only
+        st.metric("Queries", sum(r['queries'] for r in query_log if r['depth'] == 0))
+        st.table([{"Computation": "· " * r['depth'] + r['scope'], "Queries": r['queries'], "Distinct": r['distinct'],
+                   "SQL ms": r['sql_ms'], "Wall ms": r['wall_ms']} for r in query_log])
+        for r in query_log:
+            for rep in r['repeated']:
+                st.caption(f"**{r['scope']}**: {rep['count']}× ({rep['sql_ms']} ms)")
+                st.code(rep['statement'], language="sql")
+
+def show_trace(trace):
+    with st.sidebar.expander("⏱️ Timing Spans (this run)", expanded=True):
+        if not trace.events:
+            st.caption("No spans recorded on this run.")
+            return
+        st.table(trace.summary())
+        # Built now, since the trace object is replaced on the next run
+        st.download_button("Download Chrome trace (JSON)", trace.dumps(),
+                           file_name="cas_trace.json", mime="application/json")
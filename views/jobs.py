@@ -0,0 +1,72 @@
+import uuid
+import streamlit as st
+from views import cache
+from src.jobs import JobRunner, submit_job, cancel_job, list_jobs, queue_position, get_job_result
+
+JOB_WORKERS = 2
+
+@st.cache_resource
+def get_runner():
+    """One background runner per server process, shared by all sessions."""
+    cache.ensure_db()
+    return JobRunner(workers=JOB_WORKERS).start()
+
+def get_owner() -> str:
+    if 'job_owner' not in st.session_state:
+        st.session_state['job_owner'] = f"session-{uuid.uuid4().hex[:8]}"
+    return st.session_state['job_owner']
+
+def show():
+    st.header("Batch Jobs 🗂️")
+    st.caption("Institution-wide runs execute in the background; this page only polls their progress.")
+    runner = get_runner()
+
+    with st.form("batch_job_form"):
+        owner = st.text_input("Submitted by", value=get_owner(),
+                              help="Jobs from different submitters are interleaved fairly.")
+        c1, c2 = st.columns(2)
+        it_filter = c1.selectbox("Institute Type", ["All", "Government", "Aided-BoG", "Unaided"])
+        lvl_filter = c2.selectbox("Current Level", ["All", "10", "11", "12", "13A1", "14"])
+        if st.form_submit_button("▶️ Run Eligibility, Fixation & Arrears for Saved Profiles"):
+            st.session_state['job_owner'] = owner.strip() or get_owner()
+            job_id = submit_job(st.session_state['job_owner'], "roster_evaluation", {
+                "institute_type": None if it_filter == "All" else it_filter,
+                "current_level": None if lvl_filter == "All" else lvl_filter,
+            })
+            runner.wake()
+            st.success(f"Job #{job_id} queued.")
+
+    render_job_list()
+
+@st.fragment(run_every=2)
+def render_job_list():
+    jobs = list_jobs(get_owner())
+    if not jobs:
+        st.info("No jobs submitted yet.")
+        return
+
+    for job in jobs:
+        with st.container(border=True):
+            c1, c2 = st.columns([3, 1])
+            c1.markdown(f"**Job #{job['id']}** · {job['kind']} · submitted {job['created_at']:%d-%b %H:%M}")
+
+            if job['status'] == "queued":
+                c1.caption(f"Queued ({queue_position(job['id'])} ahead)")
+            elif job['status'] == "running":
+                frac = job['done'] / job['total'] if job['total'] else 0.0
+                c1.progress(frac, text=f"{job['done']:,} / {job['total']:,} profiles")
+            elif job['status'] == "done":
+                secs = (job['finished_at'] - job['started_at']).total_seconds()
+                c1.caption(f"✅ Done: {job['total']:,} profiles in {secs:.1f}s")
+                c2.download_button("📥 Results CSV", data=lambda job_id=job['id']: get_job_result(job_id),
+                                   file_name=f"batch_job_{job['id']}.csv", mime="text/csv",
+                                   key=f"job_dl_{job['id']}")
+            elif job['status'] == "failed":
+                c1.error(f"Failed: {job['error']}")
+            else:
+                c1.caption(f"Cancelled after {job['done']:,} profiles")
+
+            if job['status'] in ("queued", "running"):
+                if c2.button("✖ Cancel", key=f"job_cancel_{job['id']}"):
+                    cancel_job(job['id'])
+                    st.rerun(scope="fragment")
@@ -1,129 +1,82 @@
 import streamlit as st
 import datetime
-from src.database import SessionLocal, UserProfile, ServiceHistory
+from src.database import SessionLocal, UserProfile, fold_name
+from src.profile_store import upsert_profile, import_roster, profile_to_dict
+from src import querystats
+from views import cache
 
+PROFILE_PAGE_SIZE = 25
+
+@querystats.track("profile save")
 def save_to_db(data):
     """
     Helper to save faculty_data to SQLite for persistence.
     """
     db = SessionLocal()
     try:
-        # Check if user exists (simplistic check by name)
-        user = db.query(UserProfile).filter(UserProfile.name == data['name']).first()
-        if not user:
-            user = UserProfile()
-            db.add(user)
-        
-        user.name = data['name']
-        user.institute_type = data['institute_type']
-        # Map UI City Class to DB format ("X (Metro)" -> "X")
-        user.city_class = data['city_class'].split()[0] 
-        user.joining_date = data['date_of_joining']
-        
-        # STORE FULL DATA JSON in qualifications to enable full restore
-        import json
-        # Convert date objects to string for JSON serialization
-        json_data = data.copy()
-        for k, v in json_data.items():
-            if isinstance(v, (datetime.date, datetime.datetime)):
-                json_data[k] = v.isoformat()
-        
-        user.qualifications = json.dumps(json_data)
-        
-        db.commit()
-        db.refresh(user)
-        
-        # Clear old history
-        db.query(ServiceHistory).filter(ServiceHistory.user_id == user.id).delete()
-        
-        # Add Current Status
-        curr = ServiceHistory(
-            user_id=user.id,
-            designation="Current Designation", # Placeholder as field wasn't in new form
-            from_date=datetime.date.today(), # Placeholder
-            to_date=None,
-            pay_level=str(data['current_level']),
-            basic_pay=int(data['current_basic'])
-        )
-        db.add(curr)
-        db.commit()
+        user_id = upsert_profile(db, data)
     except Exception as e:
         st.error(f"DB Save Error: {e}")
+        return
     finally:
         db.close()
+    st.session_state['profile_id'] = user_id
+
+    # Keep the stored pay ledger in step (a no-op unless the career inputs changed)
+    from src.pay_ledger import refresh_pay_ledger
+    try:
+        refresh_pay_ledger(user_id, data, cache.get_master_data())
+    except Exception as e:
+        st.warning(f"Pay ledger not updated: {e}")
 
-def get_all_profiles():
+@querystats.track("profile search")
+def search_profiles(prefix="", institute_type=None, current_level=None, after=None, limit=PROFILE_PAGE_SIZE):
+    """
+    Returns one page of the profile directory as (rows, next_cursor).
+    Prefix match runs on the indexed, case-folded name column and pages
+    by keyset on (name_folded, id), so the cost of a page does not grow
+    with the roster size or the page number.
+    """
     db = SessionLocal()
-    profiles = []
+    rows, next_cursor = [], None
     try:
-        users = db.query(UserProfile.name).all()
-        profiles = [u[0] for u in users]
+        q = db.query(UserProfile.id, UserProfile.name, UserProfile.institute_type, UserProfile.current_level)
+
+        folded = fold_name(prefix)
+        if folded:
+            # Range scan instead of LIKE so SQLite can use ix_user_profile_name_folded
+            q = q.filter(UserProfile.name_folded >= folded, UserProfile.name_folded < folded + "\uffff")
+        if institute_type:
+            q = q.filter(UserProfile.institute_type == institute_type)
+        if current_level:
+            q = q.filter(UserProfile.current_level == str(current_level))
+        if after:
+            after_name, after_id = after
+            q = q.filter(
+                (UserProfile.name_folded > after_name) |
+                ((UserProfile.name_folded == after_name) & (UserProfile.id > after_id))
+            )
+
+        # Fetch one extra row to know whether another page exists
+        res = q.order_by(UserProfile.name_folded, UserProfile.id).limit(limit + 1).all()
+        rows = [{"id": r[0], "name": r[1], "institute_type": r[2], "current_level": r[3]} for r in res[:limit]]
+        if len(res) > limit:
+            last = rows[-1]
+            next_cursor = (fold_name(last['name']), last['id'])
     except Exception as e:
         st.error(f"DB Load Error: {e}")
     finally:
         db.close()
-    return profiles
+    return rows, next_cursor
 
-def load_profile_data(name):
+@querystats.track("profile load")
+def load_profile_data(profile_id):
     db = SessionLocal()
     data = None
     try:
-        user = db.query(UserProfile).filter(UserProfile.name == name).first()
+        user = db.query(UserProfile).filter(UserProfile.id == profile_id).first()
         if user:
-            # Reconstruct faculty_data dict from UserProfile + ServiceHistory
-            # Note: The current DB schema doesn't store ALL fields perfectly (e.g. past_service_years, qualification dates)
-            # as separate columns in UserProfile. They might be lost if we didn't update UserProfile model.
-            # WAIT: src/database.py UserProfile only has: name, joining_date, institute_type, city_class, qualifications.
-            # It DOES NOT have past_service_years, promoted dates, etc.
-            # REQUIRED: We need to update UserProfile model OR store specific data in a JSON column if allowed.
-            # Given constraints, we can try to infer or we MUST update the DB schema.
-            # User asked "Where do we store profiles?".
-            # Let's start by just loading what we have, but to fully restore the form we need those fields.
-            # I will use the 'qualifications' column to store a JSON string of the full extra data for now, 
-            # or better, update the DB structure. 
-            # Since I cannot easily run migration migrations in this env without alembic, 
-            # I will piggyback on 'qualifications' as a JSON storage for extended attributes if possible, 
-            # OR just update the schema using sqlite alter command logic if I can.
-            # actually, 'qualifications' is String. I can dump the whole dict there for restoration purposes.
-            
-            import json
-            try:
-                # Try to parse qualifications as JSON if we stored it that way
-                extra_data = json.loads(user.qualifications)
-                # If it's just a string like "M.Tech", this will fail or be just string
-                if isinstance(extra_data, dict):
-                    data = extra_data
-                    # Overwrite key fields from columns to ensure consistency
-                    data['name'] = user.name
-                    data['date_of_joining'] = user.joining_date
-                    data['institute_type'] = user.institute_type
-                    # city_class might allow "X" vs "X (Metro)" mismatch, handle it
-                    # stored "X", UI needs "X (Metro)"
-                    # We need a mapper logic or just store UI string in JSON
-            except:
-                 # Legacy or simple string
-                 data = {
-                     "name": user.name,
-                     "institute_type": user.institute_type,
-                     "city_class": user.city_class, # might need mapping
-                     "date_of_joining": user.joining_date,
-                     "entry_qualification": user.qualifications, # Fallback
-                     # Defaults for missing
-                     "past_service_years": 0,
-                     "acquired_mtech_date": None,
-                     "acquired_phd_date": None,
-                     "promoted_level_11_date": None,
-                     "promoted_level_12_date": None,
-                     "current_level": "10",
-                     "current_basic": 57700
-                 }
-                 
-            # Fetch current status from ServiceHistory
-            last_hist = db.query(ServiceHistory).filter(ServiceHistory.user_id == user.id).order_by(ServiceHistory.id.desc()).first()
-            if last_hist:
-                data['current_level'] = last_hist.pay_level
-                data['current_basic'] = last_hist.basic_pay
-                
+            data = profile_to_dict(user)
     except Exception as e:
         st.error(f"Error Loading Profile: {e}")
     finally:
@@ -135,37 +88,74 @@ def render_profile_form():
     
     # LOAD SECTION
     with st.expander("📂 Profile Management", expanded=False):
-        profiles = get_all_profiles()
-        
+        f1, f2, f3 = st.columns([2, 1, 1])
+        search = f1.text_input("Search by name", key="profile_search", placeholder="Type the start of a name...")
+        it_filter = f2.selectbox("Institute Type", ["All", "Government", "Aided-BoG", "Unaided"], key="profile_filter_it")
+        lvl_filter = f3.selectbox("Current Level", ["All", "10", "11", "12", "13A1", "14"], key="profile_filter_lvl")
+
+        # Restart paging whenever the search or filters change
+        filter_key = (fold_name(search), it_filter, lvl_filter)
+        if st.session_state.get('profile_filter_key') != filter_key:
+            st.session_state['profile_filter_key'] = filter_key
+            st.session_state['profile_cursors'] = [None]
+        cursors = st.session_state['profile_cursors']
+
+        profiles, next_cursor = search_profiles(
+            prefix=search,
+            institute_type=None if it_filter == "All" else it_filter,
+            current_level=None if lvl_filter == "All" else lvl_filter,
+            after=cursors[-1]
+        )
+
         c1, c2 = st.columns([3, 1])
         with c1:
             if profiles:
-                selected_profile = st.selectbox("Select Existing Profile", profiles, label_visibility="collapsed")
+                selected_profile = st.selectbox(
+                    "Select Existing Profile", profiles,
+                    format_func=lambda p: f"{p['name']} ({p['institute_type']}, Level {p['current_level'] or '-'})",
+                    label_visibility="collapsed"
+                )
             else:
                 st.info("No profiles found.")
-        
+
         with c2:
              if st.button("➕ New Profile"):
                  st.session_state['faculty_data'] = {}
+                 st.session_state.pop('profile_id', None)
                  st.rerun()
 
+        p1, p2, p3 = st.columns([1, 2, 1])
+        if p1.button("◀ Previous", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+        p2.caption(f"Page {len(cursors)}")
+        if p3.button("Next ▶", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
+
         if profiles:
             if st.button("Load Selected Profile"):
-                loaded_data = load_profile_data(selected_profile)
+                loaded_data = load_profile_data(selected_profile['id'])
                 if loaded_data:
-                    # Convert date strings back to objects if needed (from JSON load)
-                    for k in ['date_of_joining', 'acquired_mtech_date', 'acquired_phd_date', 
-                              'promoted_level_11_date', 'promoted_level_12_date']:
-                        if k in loaded_data and isinstance(loaded_data[k], str):
-                            try:
-                                loaded_data[k] = datetime.date.fromisoformat(loaded_data[k])
-                            except:
-                                loaded_data[k] = None
-                                
                     st.session_state['faculty_data'] = loaded_data
-                    st.success(f"Loaded profile: {selected_profile}")
+                    st.session_state['profile_id'] = selected_profile['id'] # its stored pay ledger
+                    st.success(f"Loaded profile: {selected_profile['name']}")
                     st.rerun()
 
+        st.divider()
+        roster = st.file_uploader("Bulk Import Roster (CSV / XLSX)", type=["csv", "xlsx"],
+                                  help="One row per faculty, with columns named like the profile fields (name, date_of_joining, current_level, ...).")
+        if roster is not None and st.button("Import Roster"):
+            try:
+                stats = import_roster(roster, file_name=roster.name)
+                st.success(f"Imported {stats['rows']:,} rows ({stats['inserted']:,} new, {stats['updated']:,} updated) "
+                           f"in {stats['seconds']}s ({stats['rows_per_sec']:,} rows/s).")
+                if stats['errors']:
+                    st.warning(f"Skipped {len(stats['errors']):,} invalid rows.")
+                    st.dataframe(stats['errors'])
+            except Exception as e:
+                st.error(f"Roster Import Error: {e}")
+
     # Get values from session state if available
     defaults = st.session_state.get('faculty_data', {})
     
@@ -241,20 +231,8 @@ def render_profile_form():
         l_idx = l_opts.index(str(defaults.get('current_level'))) if str(defaults.get('current_level')) in l_opts else 0
         current_level = st.selectbox("Current Pay Level", l_opts, index=l_idx)
         
-        # Fetch Basic Pay Options from DB
-        from src.database import MasterPayMatrix
-        db = SessionLocal()
-        pay_options = []
-        try:
-            # Query basic pay for selected level, ordered by cell (or basic pay)
-            res = db.query(MasterPayMatrix.basic_pay)\
-                    .filter(MasterPayMatrix.pay_level == current_level)\
-                    .order_by(MasterPayMatrix.basic_pay).all()
-            pay_options = [r[0] for r in res]
-        except Exception as e:
-            st.error(f"DB Error: {e}")
-        finally:
-            db.close()
+        # Basic Pay Options from the cached master data (no query per rerun)
+        pay_options = cache.pay_options(current_level)
             
         if not pay_options:
              # Fallback if DB empty or level not found
@@ -1,39 +1,55 @@
 import streamlit as st
-import pandas as pd
+from collections import OrderedDict
 from datetime import date
-from src.database import SessionLocal, MasterDARates, MasterTASlabs, MasterPayMatrix
-from src.logic_arrears import calculate_monthly_arrears
-from src.logic_fixation import calculate_fixation
-from sqlalchemy import desc
-
-def get_da_history_df(db):
-    rates = db.query(MasterDARates).all()
-    return pd.DataFrame([{
-        'effective_date': r.effective_date,
-        'da_rate': r.da_rate
-    } for r in rates])
-
-def get_ta_slab_amount(pay_level, city_class, db):
-    # Parse level "13A1" -> 13
-    import re
-    m = re.match(r"(\d+)", str(pay_level))
-    num_level = int(m.group(1)) if m else 0
-    
-    # Map City Class 'X (Metro)' -> 'Metro'
-    c_type = "Metro" if "X" in city_class else "Other"
-    
-    slab = db.query(MasterTASlabs)\
-        .filter(MasterTASlabs.min_pay_level <= num_level)\
-        .filter(MasterTASlabs.city_type == c_type)\
-        .order_by(desc(MasterTASlabs.min_pay_level))\
-        .first()
-    return slab.fixed_amount if slab else 0
-
-def get_pay_options(level, db):
-    res = db.query(MasterPayMatrix.basic_pay)\
-            .filter(MasterPayMatrix.pay_level == level)\
-            .order_by(MasterPayMatrix.basic_pay).all()
-    return [r[0] for r in res]
+from views import cache
+
+def get_da_history_df(db=None):
+    return cache.get_master_data().da_history_df()
+
+def get_pay_options(level, db=None):
+    return cache.pay_options(level)
+
+# -------------------------------------------------------------------
+# PER-SESSION RESULT STORE
+# -------------------------------------------------------------------
+
+ARREARS_RESULTS_LIMIT = 5 # Most recent calculations kept per session
+
+def remember_result(key, entry):
+    store = st.session_state.setdefault('arrears_results', OrderedDict())
+    store[key] = entry
+    store.move_to_end(key)
+    while len(store) > ARREARS_RESULTS_LIMIT:
+        store.popitem(last=False)
+
+def get_result(key):
+    store = st.session_state.get('arrears_results', {})
+    if key in store:
+        store.move_to_end(key)
+        return store[key]
+    return None
+
+def lazy_download(entry, kind, build):
+    """
+    Callable for st.download_button: builds the file on first click and
+    keeps the bytes on the stored result for later clicks. The click runs
+    outside the script, so a failed build can't show an error there: it is
+    kept as entry[kind + '_error'] (see download_error) and the download
+    gets the error text instead of raising.
+    """
+    def get_bytes():
+        if kind not in entry:
+            try:
+                entry[kind] = build()
+            except Exception as e:
+                entry[kind + '_error'] = str(e)
+                return f"Could not build the file: {e}".encode('utf-8')
+        return entry[kind]
+    return get_bytes
+
+def download_error(entry, kind):
+    """The error of a failed lazy_download build, if any."""
+    return entry.get(kind + '_error')
 
 def show():
     st.header("Arrears Calculator 💰")
@@ -75,8 +91,7 @@ def show():
         c3, c4 = st.columns(2)
         
         # Drawn Basic Inputs - Dynamic Dropdown
-        db = SessionLocal()
-        pay_opts = get_pay_options(drawn_level, db)
+        pay_opts = get_pay_options(drawn_level)
         
         # LOGIC CHANGE: AUTO-CALCULATE HISTORICAL DRAWN BASIC
         # If start_date is in past, try to find what the basic was THEN.
@@ -105,12 +120,11 @@ def show():
                          years_back += 1
                  
                  if years_back > 0:
-                     from src.logic_fixation import calculate_historical_basic
-                     hist_res = calculate_historical_basic(
-                         current_basic=int(prof.get('current_basic', 0)),
-                         level=drawn_level,
-                         years_back=years_back,
-                         db=db
+                     hist_res = cache.historical_basic(
+                         int(prof.get('current_basic', 0)),
+                         drawn_level,
+                         years_back,
+                         cache.master_version()
                      )
                      if "historical_basic" in hist_res:
                          suggested_historical_basic = hist_res['historical_basic']
@@ -135,64 +149,134 @@ def show():
         # Calculate suggested fix as Due
         fix_val = 0
         try:
-            fix_res = calculate_fixation(initial_drawn_basic, drawn_level, target_level, db)
+            fix_res = cache.fixation(initial_drawn_basic, drawn_level, target_level, cache.master_version())
             if "new_basic" in fix_res: fix_val = fix_res['new_basic']
         except: pass
         
         initial_due_basic = c4.number_input("Basic Pay DUE at Start Date", value=fix_val, step=100)
-        db.close()
+
+    # Results are kept per session keyed on the inputs, so the reruns
+    # triggered by the download buttons redisplay them without recomputing.
+    result_key = (start_date, end_date, int(initial_drawn_basic), int(initial_due_basic),
+                  drawn_level, target_level, prof['city_class'], cache.master_version())
 
     if st.button("Calculate Arrears"):
-        db = SessionLocal()
+        # Engine (and pandas) load on first use, not at app startup
+        from src.logic_arrears import calculate_monthly_arrears
+        from src import querystats
+
         try:
             # Prepare Inputs
-            da_df = get_da_history_df(db)
-            ta_amt = get_ta_slab_amount(target_level, prof['city_class'], db)
+            da_df = get_da_history_df()
             
             # Execute Engine
-            df = calculate_monthly_arrears(
-                start_date=start_date,
-                end_date=end_date,
-                initial_drawn_basic=initial_drawn_basic,
-                initial_due_basic=initial_due_basic,
-                drawn_level=drawn_level,   # Pass Explicitly
-                target_level=target_level, # Pass Explicitly
-                city_class=prof['city_class'],
-                da_history_df=da_df,
-                ta_slab=ta_amt
-            )
-            
-            # Summary
-            total = df['Total Arrears'].sum()
-            st.metric("Total Arrears Payable", f"₹ {total:,.0f}")
-            
-            st.dataframe(df)
-            
-            # Downloads
-            csv = df.to_csv(index=False).encode('utf-8')
-            col_d1, col_d2 = st.columns(2)
-            
+            with querystats.track("arrears"):
+                df = calculate_monthly_arrears(
+                    start_date=start_date,
+                    end_date=end_date,
+                    initial_drawn_basic=initial_drawn_basic,
+                    initial_due_basic=initial_due_basic,
+                    drawn_level=drawn_level,   # Pass Explicitly
+                    target_level=target_level, # Pass Explicitly
+                    city_class=prof['city_class'],
+                    da_history_df=da_df
+                )
+            remember_result(result_key, {
+                "df": df,
+                "profile": prof.copy(),
+                "due_date": start_date,
+                "target_level": target_level,
+            })
+        except Exception as e:
+            st.error(f"Error: {e}")
+
+    entry = get_result(result_key)
+    if entry:
+        df = entry['df']
+
+        # Summary
+        total = df['Total Arrears'].sum()
+        st.metric("Total Arrears Payable", f"₹ {total:,.0f}")
+        
+        # Months are kept as month indices; labels are made only for display
+        from src.arrears_ledger import display_frame
+        st.dataframe(display_frame(df))
+        
+        # Downloads (bytes are built when the button is clicked, then reused)
+        col_d1, col_d2 = st.columns(2)
+        
+        if download_error(entry, 'csv'):
+            col_d1.error(f"CSV Error: {download_error(entry, 'csv')}")
+        else:
             col_d1.download_button(
                 "📥 Download CSV",
-                csv,
+                lazy_download(entry, 'csv', lambda: display_frame(df).to_csv(index=False).encode('utf-8')),
                 f"arrears_{prof['name']}.csv",
                 "text/csv"
             )
-            
-            # Download PDF
+        
+        # Download PDF
+        def build_pdf():
+            from src.reports_generator import generate_arrears_pdf
+            # Pass correct start_date as due date
+            return generate_arrears_pdf(entry['profile'], df, entry['due_date'], entry['target_level'])
+
+        if download_error(entry, 'pdf'):
+            col_d2.error(f"PDF Error: {download_error(entry, 'pdf')}")
+        else:
             try:
-                from src.reports_generator import generate_arrears_pdf
-                pdf_bytes = generate_arrears_pdf(prof, df, start_date, target_level) # Pass correct start_date as due date
                 col_d2.download_button(
                     "📄 Download PDF Report",
-                    data=pdf_bytes,
+                    data=lazy_download(entry, 'pdf', build_pdf),
                     file_name=f"Arrears_Statement_{prof['name']}.pdf",
                     mime="application/pdf"
                 )
             except Exception as e:
                 col_d2.error(f"PDF Error: {e}")
-            
-        except Exception as e:
-            st.error(f"Error: {e}")
-        finally:
-            db.close()
+
+    show_whatif(prof, start_date, end_date, drawn_level, target_level, levels)
+
+# -------------------------------------------------------------------
+# WHAT-IF COMPARISON
+# -------------------------------------------------------------------
+
+WHATIF_YEARS = 5 # July due dates offered on either side of the start date
+
+def show_whatif(prof, start_date, end_date, drawn_level, target_level, levels):
+    """Arrears totals for alternative due dates x target levels, from one sweep."""
+    with st.expander("What-if Comparison"):
+        st.caption("Total arrears up to the end date for other due dates and target levels. "
+                   "The drawn basic is rolled back from the profile's current basic to each due date.")
+
+        date_opts = sorted({start_date} | {date(y, 7, 1) for y in range(start_date.year - WHATIF_YEARS,
+                                                                         start_date.year + WHATIF_YEARS + 1)
+                                           if date(y, 7, 1) <= end_date})
+        default_dates = [d for d in date_opts if d == start_date or (d.month == 7 and d.day == 1
+                                                                      and abs(d.year - start_date.year) <= 1)]
+        c1, c2 = st.columns(2)
+        due_dates = c1.multiselect("Due Dates", date_opts, default=default_dates,
+                                   format_func=lambda d: d.strftime("%d %b %Y"))
+        target_levels = c2.multiselect("Target Levels", levels, default=[target_level])
+        if not due_dates or not target_levels:
+            st.info("Pick at least one due date and one target level.")
+            return
+
+        rows = cache.arrears_sweep(tuple(sorted(due_dates)), tuple(target_levels), drawn_level,
+                                   int(prof.get('current_basic', 0)), prof['city_class'], end_date,
+                                   cache.master_version(), date.today())
+        import pandas as pd
+        df = pd.DataFrame(rows)
+        df['Due Date'] = df['start_date'].map(lambda d: d.strftime("%d %b %Y"))
+
+        # Due dates down, target levels across
+        table = df.pivot(index='start_date', columns='target_level', values='total_arrears')
+        table = table[[lvl for lvl in target_levels if lvl in table.columns]]
+        table.index = [d.strftime("%d %b %Y") for d in table.index]
+        st.dataframe(table, column_config={lvl: st.column_config.NumberColumn(f"Level {lvl}", format="₹ %d")
+                                           for lvl in table.columns})
+        st.bar_chart(df, x='Due Date', y='total_arrears', color='target_level', stack=False,
+                     x_label="Due Date", y_label="Total Arrears (₹)")
+
+        if st.toggle("Scenario details"):
+            st.dataframe(df[['Due Date', 'target_level', 'drawn_basic', 'due_basic', 'months',
+                             'final_drawn_basic', 'final_due_basic', 'total_arrears']], hide_index=True)